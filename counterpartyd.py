@@ -12,6 +12,7 @@ import calendar
 import configparser
 import traceback
 import threading
+import multiprocessing
 from threading import Thread
 import binascii
 from fractions import Fraction
@@ -24,7 +25,7 @@ from prettytable import PrettyTable
 import bitcoin as bitcoinlib
 import bitcoin.rpc as bitcoinlib_rpc
 
-from lib import config, api, util, exceptions, bitcoin, blocks, blockchain, check, backend, database
+from lib import config, api, util, exceptions, bitcoin, blocks, blockchain, check, backend, database, queryplan, notify
 if os.name == 'nt':
     from lib import util_windows
 
@@ -133,7 +134,7 @@ def set_options (data_dir=None, backend_rpc_connect=None,
                  rpc_password=None, rpc_allow_cors=None, log_file=None,
                  config_file=None, database_file=None, testnet=False,
                  testcoin=False, force=False, broadcast_tx_mainnet=None,
-                 backend_poll_interval=None):
+                 backend_poll_interval=None, rpc_pool_size=None, notify_port=None):
 
     if force:
         config.FORCE = force
@@ -334,6 +335,33 @@ def set_options (data_dir=None, backend_rpc_connect=None,
     else:
         config.RPC_ALLOW_CORS = True
 
+    # RPC database connections
+    if rpc_pool_size:
+        config.RPC_POOL_SIZE = rpc_pool_size
+    elif has_config and 'rpc-pool-size' in configfile['Default'] and configfile['Default']['rpc-pool-size']:
+        config.RPC_POOL_SIZE = int(configfile['Default']['rpc-pool-size'])
+    else:
+        config.RPC_POOL_SIZE = 8
+
+    # Notifications from the backend (UDP, on localhost)
+    if notify_port:
+        config.NOTIFY_PORT = notify_port
+    elif has_config and 'notify-port' in configfile['Default'] and configfile['Default']['notify-port']:
+        config.NOTIFY_PORT = configfile['Default']['notify-port']
+    else:
+        if config.TESTNET:
+            config.NOTIFY_PORT = config.DEFAULT_NOTIFY_PORT_TESTNET
+        else:
+            config.NOTIFY_PORT = config.DEFAULT_NOTIFY_PORT
+        if config.TESTCOIN:
+            config.NOTIFY_PORT += 1
+    try:
+        config.NOTIFY_PORT = int(config.NOTIFY_PORT)
+        if not (config.NOTIFY_PORT > 1 and config.NOTIFY_PORT < 65535):
+            raise ConfigurationError('invalid notification port number')
+    except:
+        raise Exception("Please specific a valid port number notify-port configuration parameter")
+
     ##############
     # OTHER SETTINGS
 
@@ -446,6 +474,7 @@ if __name__ == '__main__':
     parser.add_argument('--backend-rpc-ssl', action='store_true', help='use SSL to connect to backend (default: false)')
     parser.add_argument('--backend-rpc-ssl-verify', action='store_true', help='verify SSL certificate of backend; disallow use of self‐signed certificates (default: false)')
     parser.add_argument('--backend-poll-interval', type=float, help='poll interval, in seconds (default: 2.0)')
+    parser.add_argument('--notify-port', type=int, help='local UDP port on which the server listens for `notify` commands')
 
     parser.add_argument('--blockchain-service-name', help='the blockchain service name to connect to')
     parser.add_argument('--blockchain-service-connect', help='the blockchain service server URL base to connect to, if not default')
@@ -455,6 +484,7 @@ if __name__ == '__main__':
     parser.add_argument('--rpc-user', help='required username to use the {} JSON-RPC API (via HTTP basic auth)'.format(config.XCP_CLIENT))
     parser.add_argument('--rpc-password', help='required password (for rpc-user) to use the {} JSON-RPC API (via HTTP basic auth)'.format(config.XCP_CLIENT))
     parser.add_argument('--rpc-allow-cors', action='store_true', default=True, help='Allow ajax cross domain request')
+    parser.add_argument('--rpc-pool-size', type=int, help='number of API requests served at once, each with a read‐only database connection (default: 8)')
 
     subparsers = parser.add_subparsers(dest='action', help='the action to be taken')
 
@@ -573,13 +603,25 @@ if __name__ == '__main__':
 
     parser_reparse = subparsers.add_parser('reparse', help='reparse all transactions in the database')
     parser_reparse.add_argument('--force', action='store_true', help='skip backend check, version check, process lock (NOT FOR USE ON PRODUCTION SYSTEMS)')
+    parser_reparse.add_argument('--verify', action='store_true', help='only check the database against its consensus hashes, without modifying it')
+    parser_reparse.add_argument('--jobs', type=int, default=multiprocessing.cpu_count(), help='number of processes verifying blocks in parallel (with --verify)')
 
     parser_rollback = subparsers.add_parser('rollback', help='rollback database')
     parser_rollback.add_argument('block_index', type=int, help='the index of the last known good block')
     parser_rollback.add_argument('--force', action='store_true', help='skip backend check, version check, process lock (NOT FOR USE ON PRODUCTION SYSTEMS)')
 
+    parser_check_integrity = subparsers.add_parser('check-integrity', help='check the integrity of the database (slow)')
+
+    parser_audit_queries = subparsers.add_parser('audit-queries', help='report the API calls whose query plans read whole tables')
+    parser_audit_queries.add_argument('--corpus', help='file of JSON-RPC requests to audit instead of the built-in ones')
+
+    parser_notify = subparsers.add_parser('notify', help='tell the server about a new block or transaction (for `-blocknotify` and `-walletnotify`)')
+    parser_notify.add_argument('kind', choices=notify.KINDS, help='what is new')
+    parser_notify.add_argument('value', help='the hash of the block or transaction')
+
     parser_kickstart = subparsers.add_parser('kickstart', help='rapidly bring database up to the present')
     parser_kickstart.add_argument('--bitcoind-dir', help='Bitcoin Core data directory')
+    parser_kickstart.add_argument('--jobs', type=int, default=multiprocessing.cpu_count(), help='number of processes decoding blocks in parallel')
     parser_kickstart.add_argument('--force', action='store_true', help='skip backend check, version check, singleton check (NOT FOR USE ON PRODUCTION SYSTEMS)')
 
     args = parser.parse_args()
@@ -608,7 +650,13 @@ if __name__ == '__main__':
                 rpc_password=args.rpc_password, rpc_allow_cors=args.rpc_allow_cors,
                 log_file=args.log_file, config_file=args.config_file,
                 database_file=args.database_file, testnet=args.testnet,
-                testcoin=args.testcoin, force=args.force, backend_poll_interval=args.backend_poll_interval)
+                testcoin=args.testcoin, force=args.force, backend_poll_interval=args.backend_poll_interval,
+                rpc_pool_size=args.rpc_pool_size, notify_port=args.notify_port)
+
+    # Be quick: the backend runs this for every block or transaction.
+    if args.action == 'notify':
+        notify.send(args.kind, args.value)
+        sys.exit(0)
 
     # Logging (to file and console).
     logger = logging.getLogger() #get root logger
@@ -670,7 +718,9 @@ if __name__ == '__main__':
 
     # Database
     logging.info('Status: Connecting to database.')
-    db = database.get_connection(read_only=False)
+    start_time = time.time()
+    db = database.get_connection(read_only=False, tuned=args.action in ('server', 'reparse', 'rollback', 'kickstart'))
+    logging.debug('Status: Connected to database in {:.3f}s.'.format(time.time() - start_time))
 
     # MESSAGE CREATION
     if args.action == 'send':
@@ -917,14 +967,26 @@ if __name__ == '__main__':
 
     # PARSING
     elif args.action == 'reparse':
-        blocks.reparse(db)
+        if args.verify:
+            blocks.verify(db, jobs=args.jobs)
+        else:
+            blocks.reparse(db)
 
     elif args.action == 'rollback':
-        blocks.reparse(db, block_index=args.block_index)
+        blocks.rollback(db, block_index=args.block_index)
+
+    elif args.action == 'check-integrity':
+        database.check_integrity(db)
+
+    elif args.action == 'audit-queries':
+        if args.corpus:
+            queryplan.log_audit(db, corpus=queryplan.load_corpus(args.corpus))
+        else:
+            queryplan.log_audit(db)
 
     elif args.action == 'kickstart':
 
-        blocks.kickstart(db, bitcoind_dir=args.bitcoind_dir)
+        blocks.kickstart(db, bitcoind_dir=args.bitcoind_dir, jobs=args.jobs)
 
     elif args.action == 'server':
         api_status_poller = api.APIStatusPoller()
@@ -935,6 +997,14 @@ if __name__ == '__main__':
         api_server.daemon = True
         api_server.start()
 
+        # Notifications from the backend.
+        try:
+            notify_listener = notify.Listener()
+        except OSError as e:
+            logging.warning('Status: Not listening for notifications on port {} ({}); polling only.'.format(config.NOTIFY_PORT, e))
+        else:
+            notify_listener.start()
+
         # Check blockchain explorer.
         if not config.FORCE:
             time_wait = 10
@@ -5,25 +5,28 @@ import os
 import threading
 import decimal
 import time
+import datetime
 import json
 import re
+import base64
 import requests
 import collections
+import itertools
 import logging
 from logging import handlers as logging_handlers
 D = decimal.Decimal
 
 import apsw
-import flask
-from flask.ext.httpauth import HTTPBasicAuth
-from tornado.wsgi import WSGIContainer
+from concurrent import futures
 from tornado.httpserver import HTTPServer
 from tornado.ioloop import IOLoop
+from tornado import gen, web, websocket
+from tornado.concurrent import Future
 import jsonrpc
 from jsonrpc import dispatcher
 import inspect
 
-from . import (config, bitcoin, exceptions, util, blockchain, check, backend, database)
+from . import (config, bitcoin, exceptions, util, blockchain, check, backend, database, notify)
 from .messages import (send, order, btcpay, issuance, broadcast, bet, dividend, burn, cancel, callback, rps, rpsresolve, publish, execute)
 
 API_TABLES = ['balances', 'credits', 'debits', 'bets', 'bet_matches',
@@ -49,6 +52,20 @@ ARGS_ALIAS = {
 API_MAX_LOG_SIZE = 10 * 1024 * 1024 #max log size of 20 MB before rotation (make configurable later)
 API_MAX_LOG_COUNT = 10
 
+API_EXPORT_TABLES = API_TABLES + ['messages']
+API_MAX_EXPORTS = 4         # Each export holds a read transaction open.
+API_EXPORT_FLUSH_ROWS = 1000
+
+# Methods that wait on the backend or the block explorer (besides `create_*` and `do_*`).
+API_BACKEND_METHODS = ['sign_tx', 'broadcast_tx', 'get_running_info',
+                       'search_raw_transactions', 'get_unspent_txouts']
+API_BACKEND_THREADS = 8
+
+API_MAX_SUBSCRIBERS = 10000
+API_SUBSCRIPTION_BATCH_SIZE = 1000  # Messages per update.
+API_LONG_POLL_TIMEOUT = 60  # Seconds.
+API_MAX_ORPHANS = 1000  # Orphaned blocks remembered by the message feed.
+
 current_api_status_code = None #is updated by the APIStatusPoller
 current_api_status_response_json = None #is updated by the APIStatusPoller
 
@@ -65,9 +82,64 @@ def db_query(db, statement, bindings=(), callback=None, **callback_args):
     cursor.close()
     return results
 
+def encode_page_token(order_by, order_dir, row):
+    """Opaque token for the rows after `row`."""
+    value = row[order_by] if order_by else None
+    token = json.dumps([order_by, order_dir, value, row['_rowid']])
+    return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii')
+
+def encode_boundary_token(order_by, order_dir):
+    """Opaque token for the rows after those whose `order_by` is NULL (in
+    ascending order), or after those whose `order_by` isn’t (in descending
+    order)."""
+    token = json.dumps([order_by, order_dir, None, None])
+    return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii')
+
+def decode_page_token(token, order_by, order_dir):
+    """Return the `order_by` value and the rowid of the last row of the
+    previous page (both None for a boundary token)."""
+    try:
+        token_order_by, token_order_dir, value, rowid = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError, UnicodeError):
+        raise Exception('Invalid after token')
+    if (token_order_by, token_order_dir) != (order_by, order_dir) or not (isinstance(rowid, int) or (order_by and rowid is None)):
+        raise Exception('Invalid after token (order_by and order_dir must stay the same)')
+    return value, rowid
+
 def get_rows(db, table, filters=[], filterop='AND', order_by=None, order_dir=None, start_block=None, end_block=None,
-              status=None, limit=1000, offset=0, show_expired=True):
-    """Filters results based on a filter data structure (as used by the API)"""
+              status=None, limit=1000, offset=0, show_expired=True, after=None):
+    """Filters results based on a filter data structure (as used by the API)
+
+    With `after` (`''` for the first page), pages through the results by key
+    instead of by offset, and returns `{'rows': …, 'next': …}`, where `next`
+    is the `after` token of the following page (or None after the last one).
+    """
+    statement, bindings = get_rows_query(db, table, filters=filters, filterop=filterop, order_by=order_by,
+                                         order_dir=order_dir, start_block=start_block, end_block=end_block,
+                                         status=status, limit=limit, offset=offset, show_expired=show_expired,
+                                         after=after)
+    rows = db_query(db, statement, bindings)
+    if after is None:
+        return rows
+
+    # Pages stop at the boundary between NULL and other values of `order_by`,
+    # so that each one reads a single range of an index.
+    order_dir = order_dir.upper() if order_dir else None
+    next_token = None
+    if limit and len(rows) == limit:
+        next_token = encode_page_token(order_by, order_dir, rows[-1])
+    elif after and order_by:
+        value, rowid = decode_page_token(after, order_by, order_dir)
+        if rowid is not None and (value is None) != (order_dir == 'DESC'):
+            next_token = encode_boundary_token(order_by, order_dir)
+    for row in rows:
+        del row['_rowid']
+    return {'rows': rows, 'next': next_token}
+
+def get_rows_query(db, table, filters=[], filterop='AND', order_by=None, order_dir=None, start_block=None, end_block=None,
+                   status=None, limit=1000, offset=0, show_expired=True, after=None):
+    """Return the statement and bindings with which `get_rows` queries the
+    database (see `lib/queryplan.py`)."""
 
     def value_to_marker(value):
         # if value is an array place holder is (?,?,?,..)
@@ -89,6 +161,10 @@ def get_rows(db, table, filters=[], filterop='AND', order_by=None, order_dir=Non
         raise Exception('Limit should be lower or equal to 1000')
     if not isinstance(offset, int):
         raise Exception('Invalid offset')
+    if after is not None and not isinstance(after, str):
+        raise Exception('Invalid after token')
+    if after is not None and offset:
+        raise Exception('Use either offset or after')
     # TODO: accept an object:  {'field1':'ASC', 'field2': 'DESC'}
     if order_by and not re.compile('^[a-z0-9_]+$').match(order_by):
         raise Exception('Invalid order_by, must be a field name')
@@ -126,7 +202,10 @@ def get_rows(db, table, filters=[], filterop='AND', order_by=None, order_dir=Non
             raise Exception("case_sensitive must be a boolean")
 
     # SELECT
-    statement = '''SELECT * FROM {}'''.format(table)
+    if after is None:
+        statement = '''SELECT * FROM {}'''.format(table)
+    else:
+        statement = '''SELECT *, rowid AS _rowid FROM {}'''.format(table)
     # WHERE
     bindings = []
     conditions = []
@@ -173,6 +252,26 @@ def get_rows(db, table, filters=[], filterop='AND', order_by=None, order_dir=Non
         more_conditions.append('''((give_asset == ? AND expire_index > ?) OR give_asset != ?)''')
         bindings += [config.BTC, expire_index, config.BTC]
 
+    # keyset pagination: the rows after the last one of the previous page, in
+    # (order_by, rowid) order. NULLs come first in ascending order, last in
+    # descending order; a page never reads past them (see `get_rows()`), so
+    # that every condition is a range of an `(…, order_by)` index.
+    descending = order_dir and order_dir.upper() == 'DESC'
+    comparison = '<' if descending else '>'
+    if after:
+        value, rowid = decode_page_token(after, order_by, order_dir.upper() if order_dir else None)
+        if not order_by:
+            more_conditions.append('''rowid {} ?'''.format(comparison))
+            bindings.append(rowid)
+        elif rowid is None:
+            more_conditions.append('''{} IS {}NULL'''.format(order_by, '' if descending else 'NOT '))
+        elif value is None:
+            more_conditions.append('''({} IS NULL AND rowid {} ?)'''.format(order_by, comparison))
+            bindings.append(rowid)
+        else:
+            more_conditions.append('''({}, rowid) {} (?, ?)'''.format(order_by, comparison))
+            bindings += [value, rowid]
+
     if (len(conditions) + len(more_conditions)) > 0:
         statement += ''' WHERE'''
         all_conditions = []
@@ -183,7 +282,13 @@ def get_rows(db, table, filters=[], filterop='AND', order_by=None, order_dir=Non
         statement += ''' {}'''.format(''' AND '''.join(all_conditions))
 
     # ORDER BY
-    if order_by != None:
+    if after is not None:
+        direction = '''DESC''' if descending else '''ASC'''
+        if order_by != None:
+            statement += ''' ORDER BY {0} {1}, rowid {1}'''.format(order_by, direction)
+        else:
+            statement += ''' ORDER BY rowid {}'''.format(direction)
+    elif order_by != None:
         statement += ''' ORDER BY {}'''.format(order_by)
         if order_dir != None:
             statement += ''' {}'''.format(order_dir.upper())
@@ -193,7 +298,7 @@ def get_rows(db, table, filters=[], filterop='AND', order_by=None, order_dir=Non
         if offset:
             statement += ''' OFFSET {}'''.format(offset)
 
-    return db_query(db, statement, tuple(bindings))
+    return statement, tuple(bindings)
 
 def compose_transaction(db, name, params,
                         encoding='auto',
@@ -260,11 +365,496 @@ def init_api_access_log():
     api_logger.addHandler(h)
     api_logger.propagate = False
 
+def get_asset_info_row(db, asset):
+    """Return the description of `asset` by `get_asset_info`, or None if it
+    does not exist."""
+    # BTC and XCP.
+    if asset in [config.BTC, config.XCP]:
+        if asset == config.BTC:
+            supply = bitcoin.get_btc_supply(normalize=False)
+        else:
+            supply = util.xcp_supply(db)
+
+        return {
+            'asset': asset,
+            'owner': None,
+            'divisible': True,
+            'locked': False,
+            'supply': supply,
+            'callable': False,
+            'call_date': None,
+            'call_price': None,
+            'description': '',
+            'issuer': None
+        }
+
+    # User‐created asset.
+    cursor = db.cursor()
+    issuances = list(cursor.execute('''SELECT * FROM issuances WHERE (status = ? AND asset = ?) ORDER BY block_index ASC''', ('valid', asset)))
+    cursor.close()
+    if not issuances: return None #asset not found, most likely
+    else: last_issuance = issuances[-1]
+    locked = False
+    for e in issuances:
+        if e['locked']: locked = True
+    return {
+        'asset': asset,
+        'owner': last_issuance['issuer'],
+        'divisible': bool(last_issuance['divisible']),
+        'locked': locked,
+        'supply': util.asset_supply(db, asset),
+        'callable': bool(last_issuance['callable']),
+        'call_date': last_issuance['call_date'],
+        'call_price': last_issuance['call_price'],
+        'description': last_issuance['description'],
+        'issuer': last_issuance['issuer']}
+
+class BlockCache(object):
+    """Responses which only change with the ledger, i.e. when a block is
+    parsed. They are kept until the last block (index and hash, for
+    reorganisations) changes.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.block = None
+        self.responses = {}
+
+    def get(self, db, key, compute):
+        cursor = db.cursor()
+        blocks = list(cursor.execute('''SELECT block_index, block_hash FROM blocks ORDER BY block_index DESC LIMIT 1'''))
+        cursor.close()
+        block = (blocks[0]['block_index'], blocks[0]['block_hash']) if blocks else None
+
+        with self.lock:
+            if block != self.block:
+                self.block = block
+                self.responses = {}
+            elif key in self.responses:
+                return self.responses[key]
+        response = compute()
+        with self.lock:
+            if block == self.block:
+                self.responses[key] = response
+        return response
+
+class HandlerMixin(object):
+    """Authentication and status checks for the API's Tornado handlers."""
+    def check_auth(self):
+        header = self.request.headers.get('Authorization', '')
+        if header.startswith('Basic '):
+            try:
+                credentials = base64.b64decode(header[6:].encode('ascii')).decode('utf-8')
+            except (ValueError, UnicodeError):
+                credentials = None
+            if credentials == '{}:{}'.format(config.RPC_USER, config.RPC_PASSWORD):
+                return
+        self.set_header('WWW-Authenticate', 'Basic realm="Authentication Required"')
+        raise web.HTTPError(401)
+
+    def check_status(self):
+        """Answer with the error, and return False, if the API fails its checks."""
+        if not config.FORCE and current_api_status_code:
+            self.set_status(503)
+            self.set_header('Content-Type', 'application/json')
+            self.finish(current_api_status_response_json)
+            return False
+        return True
+
+    def get_integer_argument(self, name):
+        value = self.get_argument(name, None)
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise web.HTTPError(400, reason='{} must be an integer'.format(name))
+
+class JSONRPCHandler(HandlerMixin, web.RequestHandler):
+    """The JSON‐RPC API, at `/` and `/api/`.
+
+    Methods run in threads, off the IOLoop. Those that wait on the backend or
+    the block explorer have threads of their own, so that they can’t hold up
+    the others.
+    """
+    def initialize(self, executors):
+        self.executors = executors
+
+    def set_cors_headers(self):
+        if config.RPC_ALLOW_CORS:
+            self.set_header('Access-Control-Allow-Origin', '*')
+            self.set_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.set_header('Access-Control-Allow-Headers', 'DNT,X-Mx-ReqToken,Keep-Alive,User-Agent,X-Requested-With,If-Modified-Since,Cache-Control,Content-Type')
+
+    def finish_json(self, response_json):
+        self.set_header('Content-Type', 'application/json')
+        self.finish(response_json)
+
+    def options(self):
+        self.set_status(204)
+        self.set_cors_headers()
+        self.finish()
+
+    @gen.coroutine
+    def post(self):
+        self.check_auth()
+        self.set_cors_headers()
+        try:
+            request_json = self.request.body.decode('utf-8')
+            request_data = json.loads(request_json)
+            assert 'id' in request_data and request_data['jsonrpc'] == "2.0" and request_data['method']
+            # params may be omitted
+        except:
+            obj_error = jsonrpc.exceptions.JSONRPCInvalidRequest(data="Invalid JSON-RPC 2.0 request format")
+            self.finish_json(obj_error.json.encode())
+            return
+
+        #only arguments passed as a dict are supported
+        if request_data.get('params', None) and not isinstance(request_data['params'], dict):
+            obj_error = jsonrpc.exceptions.JSONRPCInvalidRequest(
+                data='Arguments must be passed as a JSON object (list of unnamed arguments not supported)')
+            self.finish_json(obj_error.json.encode())
+            return
+
+        #return an error if API fails checks
+        if not config.FORCE and current_api_status_code:
+            self.finish_json(current_api_status_response_json)
+            return
+
+        method = str(request_data['method'])
+        if method in API_BACKEND_METHODS or method.startswith(('create_', 'do_')):
+            executor = self.executors['backend']
+        else:
+            executor = self.executors['database']
+        jsonrpc_response = yield executor.submit(jsonrpc.JSONRPCResponseManager.handle, request_json, dispatcher)
+        self.finish_json(jsonrpc_response.json.encode())
+
+class ExportHandler(HandlerMixin, web.RequestHandler):
+    """Stream a whole table, one JSON row per line, with chunked encoding.
+
+    `GET /export/{table}?start_block=…&end_block=…` (block range optional).
+    Rows are read in batches, on the database executor, and the handler waits
+    for each batch to be sent before reading the next one, so memory stays
+    constant and the IOLoop is never blocked on the database.
+    """
+    exports = 0
+
+    def initialize(self, executors):
+        self.executors = executors
+
+    @staticmethod
+    def get_statement(db, table, start_block=None, end_block=None):
+        if table == 'messages':
+            conditions, bindings = [], []
+            if start_block is not None:
+                conditions.append('''block_index >= ?''')
+                bindings.append(start_block)
+            if end_block is not None:
+                conditions.append('''block_index <= ?''')
+                bindings.append(end_block)
+            statement = '''SELECT * FROM messages'''
+            if conditions:
+                # The same order, but read from `block_index_message_index_idx`.
+                statement += ''' WHERE {} ORDER BY block_index ASC, message_index ASC'''.format(''' AND '''.join(conditions))
+            else:
+                statement += ''' ORDER BY message_index ASC'''
+            return statement, tuple(bindings)
+        return get_rows_query(db, table, start_block=start_block, end_block=end_block, limit=0)
+
+    @staticmethod
+    def fetch(cursor, statement=None, bindings=()):
+        """Return the next batch of rows (of `statement`, to start with)."""
+        if statement is not None:
+            cursor.execute(statement, bindings)
+        return list(itertools.islice(cursor, API_EXPORT_FLUSH_ROWS))
+
+    @gen.coroutine
+    def get(self, table):
+        self.check_auth()
+        if table not in API_EXPORT_TABLES:
+            raise web.HTTPError(404, reason='Unknown table')
+        if not self.check_status():
+            return
+        if ExportHandler.exports >= API_MAX_EXPORTS:
+            raise web.HTTPError(503, reason='Too many exports in progress')
+        start_block = self.get_integer_argument('start_block')
+        end_block = self.get_integer_argument('end_block')
+
+        if config.RPC_ALLOW_CORS:
+            self.set_header('Access-Control-Allow-Origin', '*')
+        self.set_header('Content-Type', 'application/x-ndjson')
+
+        executor = self.executors['database']
+        ExportHandler.exports += 1
+        db = database.get_connection(read_only=True)
+        cursor = db.cursor()
+        try:
+            statement, bindings = self.get_statement(db, table, start_block, end_block)
+            rows = yield executor.submit(self.fetch, cursor, statement, bindings)
+            while rows:
+                for row in rows:
+                    self.write(json.dumps(row))
+                    self.write('\n')
+                yield self.flush()
+                rows = yield executor.submit(self.fetch, cursor)
+        finally:
+            cursor.close()
+            db.close()
+            ExportHandler.exports -= 1
+
+class Subscriber(object):
+    """A client of the `MessageFeed`.
+
+    `cursor` is the index of the last message sent (None for the last one in
+    the database), `block_hash` the hash of the last block when it was sent
+    (None for the current one), and `mempool` the last mempool sent. `send` is
+    called on the IOLoop with each update,
+    `{"messages": […], "mempool": […], "last": …, "block_hash": …}`, where
+    either list may be missing. Subscribers that are sent only `once` are then
+    unsubscribed.
+
+    Should a reorganisation replace messages already sent, the update starts
+    with `"rewind": …`, the index of the last message still valid: those after
+    it are to be dropped, and the update’s messages follow it.
+    """
+    def __init__(self, cursor, block_hash, mempool, send, once=False):
+        self.cursor = cursor
+        self.block_hash = block_hash
+        self.mempool = mempool
+        self.send = send
+        self.once = once
+
+class MessageFeed(threading.Thread):
+    """Read new messages and changes to the mempool once for all subscribers,
+    and pass them to the IOLoop.
+
+    The parser wakes the feed up after each commit (`notify.LEDGER`); it
+    checks the database every `config.BACKEND_POLL_INTERVAL` seconds anyway.
+
+    Message indices are reused after a reorganisation, so the feed keeps the
+    hashes of the last blocks, and remembers, for each block that it sees
+    orphaned, the index of the last message that is still valid.
+    """
+    def __init__(self, ioloop):
+        self.ioloop = ioloop
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.mempool = []   # Replaced, never modified.
+        self.block_hashes = {}  # Of the last blocks, by index.
+        self.orphans = collections.OrderedDict()    # Last valid message index, by block hash.
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def subscribe(self, subscriber):
+        with self.lock:
+            if len(self.subscribers) >= API_MAX_SUBSCRIBERS:
+                return False
+            self.subscribers.add(subscriber)
+        notify.LEDGER.notify()  # Catch up now.
+        return True
+
+    def unsubscribe(self, subscriber):
+        """Return whether `subscriber` was still subscribed."""
+        with self.lock:
+            if subscriber not in self.subscribers:
+                return False
+            self.subscribers.remove(subscriber)
+            return True
+
+    def update_blocks(self, cursor):
+        """Record the blocks orphaned since the last call, and return the hash
+        of the last block."""
+        if self.block_hashes:
+            start = min(self.block_hashes)
+        else:
+            start = list(cursor.execute('''SELECT MAX(block_index) AS block_index FROM blocks'''))[0]['block_index'] or 0
+            start -= config.UNDOLOG_MAX_PAST_BLOCKS
+        blocks = {block['block_index']: block['block_hash'] for block in
+                  cursor.execute('''SELECT block_index, block_hash FROM blocks WHERE block_index >= ?''', (start,))}
+        orphaned = [block_index for block_index, block_hash in self.block_hashes.items()
+                    if blocks.get(block_index) != block_hash]
+        if orphaned:
+            # Messages are in block order.
+            valid = list(cursor.execute('''SELECT message_index FROM messages WHERE block_index < ?
+                                           ORDER BY message_index DESC LIMIT 1''', (min(orphaned),)))
+            valid = valid[0]['message_index'] if valid else -1
+            for block_hash in self.orphans:
+                self.orphans[block_hash] = min(self.orphans[block_hash], valid)
+            for block_index in orphaned:
+                self.orphans[self.block_hashes[block_index]] = valid
+            while len(self.orphans) > API_MAX_ORPHANS:
+                self.orphans.popitem(last=False)
+            logging.debug('Status: Message feed: Messages after {} replaced.'.format(valid))
+
+        if not blocks:
+            self.block_hashes = {}
+            return None
+        last_block = max(blocks)
+        self.block_hashes = {block_index: block_hash for block_index, block_hash in blocks.items()
+                             if block_index >= last_block - config.UNDOLOG_MAX_PAST_BLOCKS}
+        return blocks[last_block]
+
+    def update(self, cursor):
+        """Send the subscribers what they are missing, and return whether
+        some are still behind."""
+        block_hash = self.update_blocks(cursor)
+        last = list(cursor.execute('''SELECT MAX(message_index) AS message_index FROM messages'''))[0]['message_index']
+        if last is None:
+            last = -1
+        mempool = list(cursor.execute('''SELECT * FROM mempool'''))
+        if mempool != self.mempool:
+            self.mempool = mempool
+
+        with self.lock:
+            subscribers = list(self.subscribers)
+        batches = {}    # Most subscribers are at the same message.
+        behind = False
+        for subscriber in subscribers:
+            if subscriber.cursor is None:
+                subscriber.cursor = last
+            if subscriber.block_hash is None:
+                subscriber.block_hash = block_hash
+            subscriber_cursor = min(subscriber.cursor, last)
+            if subscriber.block_hash in self.orphans:
+                subscriber_cursor = min(subscriber_cursor, self.orphans[subscriber.block_hash])
+            if subscriber_cursor == subscriber.cursor and subscriber_cursor >= last \
+               and subscriber.mempool is self.mempool:
+                subscriber.block_hash = block_hash  # Nothing sent depends on later blocks.
+                continue
+            # Don’t update a subscriber that has just given up waiting.
+            if subscriber.once and not self.unsubscribe(subscriber):
+                continue
+
+            update = {}
+            if subscriber_cursor < subscriber.cursor:
+                update['rewind'] = subscriber.cursor = subscriber_cursor
+            subscriber.block_hash = block_hash
+            if subscriber.cursor < last:
+                if subscriber.cursor not in batches:
+                    batches[subscriber.cursor] = list(cursor.execute('''SELECT * FROM messages WHERE message_index > ?
+                                                                       ORDER BY message_index ASC LIMIT ?''',
+                                                                    (subscriber.cursor, API_SUBSCRIPTION_BATCH_SIZE)))
+                update['messages'] = batches[subscriber.cursor]
+                subscriber.cursor = update['messages'][-1]['message_index']
+                if subscriber.cursor < last and not subscriber.once:
+                    behind = True
+            if subscriber.mempool is not self.mempool:
+                update['mempool'] = subscriber.mempool = self.mempool
+            update['last'] = subscriber.cursor
+            update['block_hash'] = subscriber.block_hash
+            self.ioloop.add_callback(subscriber.send, update)
+        return behind
+
+    def run(self):
+        db = database.get_connection(read_only=True)
+        cursor = db.cursor()
+        while not self.stop_event.is_set():
+            notifications = notify.LEDGER.count
+            try:
+                with db:    # One snapshot of the database.
+                    behind = self.update(cursor)
+            except apsw.Error as e:
+                logging.warning('Status: Message feed: {}'.format(e))
+                behind = False
+            if not behind:
+                notify.LEDGER.wait(notifications, config.BACKEND_POLL_INTERVAL)
+        cursor.close()
+        db.close()
+
+class SubscribeHandler(HandlerMixin, web.RequestHandler):
+    """Long‐poll for new messages.
+
+    `GET /subscribe?after=…&block_hash=…&timeout=…` answers as soon as there
+    are messages after the message index `after` (by default, the last one),
+    or the mempool changes, or else after `timeout` seconds, with
+    `{"messages": […], "mempool": […], "last": …, "block_hash": …}`, and
+    maybe `"rewind": …` (see `Subscriber`). `last` and `block_hash` are the
+    `after` and `block_hash` of the next request.
+    """
+    def initialize(self, feed):
+        self.feed = feed
+        self.subscriber = None
+
+    @gen.coroutine
+    def get(self):
+        self.check_auth()
+        if not self.check_status():
+            return
+        after = self.get_integer_argument('after')
+        block_hash = self.get_argument('block_hash', None)
+        timeout = self.get_integer_argument('timeout')
+        if timeout is None or timeout > API_LONG_POLL_TIMEOUT:
+            timeout = API_LONG_POLL_TIMEOUT
+        if config.RPC_ALLOW_CORS:
+            self.set_header('Access-Control-Allow-Origin', '*')
+
+        future = Future()
+        self.subscriber = Subscriber(after, block_hash, self.feed.mempool, future.set_result, once=True)
+        if not self.feed.subscribe(self.subscriber):
+            raise web.HTTPError(503, reason='Too many subscribers')
+        try:
+            update = yield gen.with_timeout(datetime.timedelta(seconds=max(timeout, 0)), future)
+        except gen.TimeoutError:
+            if self.feed.unsubscribe(self.subscriber):
+                update = {'last': self.subscriber.cursor if self.subscriber.cursor is not None else after,
+                          'block_hash': self.subscriber.block_hash if self.subscriber.block_hash is not None else block_hash}
+            else:
+                update = yield future   # Already on its way.
+        update.setdefault('messages', [])
+        update.setdefault('mempool', self.feed.mempool)
+        self.set_header('Content-Type', 'application/json')
+        self.finish(json.dumps(update))
+
+    def on_connection_close(self):
+        if self.subscriber:
+            self.feed.unsubscribe(self.subscriber)
+
+class SubscribeWebSocketHandler(HandlerMixin, websocket.WebSocketHandler):
+    """Stream new messages, and the mempool each time it changes.
+
+    `GET /subscribe/websocket?after=…&block_hash=…` sends updates as
+    `SubscribeHandler` does, starting with the current mempool and the
+    messages after the message index `after` (by default, the last one).
+    """
+    def initialize(self, feed):
+        self.feed = feed
+        self.subscriber = None
+
+    def prepare(self):
+        self.check_auth()
+        if self.check_status():
+            self.after = self.get_integer_argument('after')
+            self.block_hash = self.get_argument('block_hash', None)
+
+    def check_origin(self, origin):
+        return config.RPC_ALLOW_CORS or websocket.WebSocketHandler.check_origin(self, origin)
+
+    def open(self):
+        self.subscriber = Subscriber(self.after, self.block_hash, None, self.send)
+        if not self.feed.subscribe(self.subscriber):
+            self.close(reason='Too many subscribers')
+
+    def send(self, update):
+        if self.ws_connection is None:
+            return
+        try:
+            self.write_message(json.dumps(update))
+        except websocket.WebSocketClosedError:
+            pass
+
+    def on_close(self):
+        if self.subscriber:
+            self.feed.unsubscribe(self.subscriber)
+
 class APIStatusPoller(threading.Thread):
     """Poll every few seconds for the length of time since the last version check, as well as the bitcoin status"""
     def __init__(self):
         self.last_version_check = 0
         self.last_database_check = 0
+        self.last_integrity_check = time.time()
         threading.Thread.__init__(self)
         self.stop_event = threading.Event()
 
@@ -275,12 +865,17 @@ class APIStatusPoller(threading.Thread):
         global current_api_status_code, current_api_status_response_json
         db = database.get_connection(integrity_check=False)
 
-        while self.stop_event == False:
+        while not self.stop_event.is_set():
             try:
                 # Check version.
-                if time.time() - self.last_version_check >= 10: # Four hours since last check.
+                if time.time() - self.last_version_check >= 4 * 3600: # Four hours since last check.
                     code = 10
-                    check.version(util.last_block(db)['block_index'])
+                    try:
+                        check.version(util.last_block(db)['block_index'])
+                    except check.VersionUpdateRequiredError:
+                        raise
+                    except check.VersionError as e:
+                        logging.warning('Status: {}'.format(e))   # Not worth taking the API down for.
                     self.last_version_check = time.time()
                 # Check that bitcoind is running, communicable, and caught up with the blockchain.
                 # Check that the database has caught up with bitcoind.
@@ -291,6 +886,11 @@ class APIStatusPoller(threading.Thread):
                     proxy = backend.get_proxy()
                     check.database(db, proxy.getblockcount())
                     self.last_database_check = time.time()
+                # Check the integrity of the database (slowly).
+                if time.time() - self.last_integrity_check > config.INTEGRITY_CHECK_INTERVAL:
+                    code = 13
+                    database.check_integrity(db)
+                    self.last_integrity_check = time.time()
             except Exception as e:
                 exception_name = e.__class__.__name__
                 exception_text = str(e)
@@ -300,7 +900,8 @@ class APIStatusPoller(threading.Thread):
             else:
                 current_api_status_code = None
                 current_api_status_response_json = None
-            time.sleep(2)
+            self.stop_event.wait(2)
+        db.close()
 
 class APIServer(threading.Thread):
     def __init__(self):
@@ -314,15 +915,9 @@ class APIServer(threading.Thread):
         self.stop_event.set()
 
     def run(self):
-        db = database.get_connection(integrity_check=False)
-        app = flask.Flask(__name__)
-        auth = HTTPBasicAuth()
-
-        @auth.get_password
-        def get_pw(username):
-            if username == config.RPC_USER:
-                return config.RPC_PASSWORD
-            return None
+        # A connection for each thread of the executors.
+        pool = database.ConnectionPool(config.RPC_POOL_SIZE + API_BACKEND_THREADS)
+        asset_info_cache = BlockCache()
 
         ######################
         #READ API
@@ -330,10 +925,11 @@ class APIServer(threading.Thread):
         # Generate dynamically get_{table} methods
         def generate_get_method(table):
             def get_method(**kwargs):
-                try:
-                    return get_rows(db, table=table, **kwargs)
-                except TypeError as e:          #TODO: generalise for all API methods
-                    raise Exception(str(e))
+                with pool.connection() as db:
+                    try:
+                        return get_rows(db, table=table, **kwargs)
+                    except TypeError as e:          #TODO: generalise for all API methods
+                        raise Exception(str(e))
             return get_method
 
         for table in API_TABLES:
@@ -343,7 +939,8 @@ class APIServer(threading.Thread):
 
         @dispatcher.add_method
         def sql(query, bindings=[]):
-            return db_query(db, query, tuple(bindings))
+            with pool.connection() as db:
+                return db_query(db, query, tuple(bindings))
 
 
         ######################
@@ -366,18 +963,20 @@ class APIServer(threading.Thread):
                 return transaction_args, common_args, private_key_wif
 
             def create_method(**kwargs):
-                try:
-                    transaction_args, common_args, private_key_wif = split_params(**kwargs)
-                    return compose_transaction(db, name=transaction, params=transaction_args, **common_args)
-                except TypeError as e:          #TODO: generalise for all API methods
-                    raise Exception(str(e))
+                with pool.connection() as db:
+                    try:
+                        transaction_args, common_args, private_key_wif = split_params(**kwargs)
+                        return compose_transaction(db, name=transaction, params=transaction_args, **common_args)
+                    except TypeError as e:          #TODO: generalise for all API methods
+                        raise Exception(str(e))
 
             def do_method(**kwargs):
-                try:
-                    transaction_args, common_args, private_key_wif = split_params(**kwargs)
-                    return do_transaction(db, name=transaction, params=transaction_args, private_key_wif=private_key_wif, **common_args)
-                except TypeError as e:          #TODO: generalise for all API methods
-                    raise Exception(str(e))
+                with pool.connection() as db:
+                    try:
+                        transaction_args, common_args, private_key_wif = split_params(**kwargs)
+                        return do_transaction(db, name=transaction, params=transaction_args, private_key_wif=private_key_wif, **common_args)
+                    except TypeError as e:          #TODO: generalise for all API methods
+                        raise Exception(str(e))
 
             return create_method, do_method
 
@@ -398,14 +997,15 @@ class APIServer(threading.Thread):
 
         @dispatcher.add_method
         def get_messages(block_index):
-            if not isinstance(block_index, int):
-                raise Exception("block_index must be an integer.")
+            with pool.connection() as db:
+                if not isinstance(block_index, int):
+                    raise Exception("block_index must be an integer.")
 
-            cursor = db.cursor()
-            cursor.execute('select * from messages where block_index = ? order by message_index asc', (block_index,))
-            messages = cursor.fetchall()
-            cursor.close()
-            return messages
+                cursor = db.cursor()
+                cursor.execute('select * from messages where block_index = ? order by message_index asc', (block_index,))
+                messages = cursor.fetchall()
+                cursor.close()
+                return messages
 
         @dispatcher.add_method
         def get_messages_by_index(message_indexes):
@@ -413,180 +1013,150 @@ class APIServer(threading.Thread):
 
             @param message_index: A single index, or a list of one or more message indexes to retrieve.
             """
-            if not isinstance(message_indexes, list):
-                message_indexes = [message_indexes,]
-            for idx in message_indexes:  #make sure the data is clean
-                if not isinstance(idx, int):
-                    raise Exception("All items in message_indexes are not integers")
-
-            cursor = db.cursor()
-            cursor.execute('SELECT * FROM messages WHERE message_index IN (%s) ORDER BY message_index ASC'
-                % (','.join([str(x) for x in message_indexes]),))
-            messages = cursor.fetchall()
-            cursor.close()
-            return messages
+            with pool.connection() as db:
+                if not isinstance(message_indexes, list):
+                    message_indexes = [message_indexes,]
+                for idx in message_indexes:  #make sure the data is clean
+                    if not isinstance(idx, int):
+                        raise Exception("All items in message_indexes are not integers")
+
+                cursor = db.cursor()
+                cursor.execute('SELECT * FROM messages WHERE message_index IN (%s) ORDER BY message_index ASC'
+                    % (','.join([str(x) for x in message_indexes]),))
+                messages = cursor.fetchall()
+                cursor.close()
+                return messages
 
         @dispatcher.add_method
         def get_xcp_supply():
-            return util.xcp_supply(db)
+            with pool.connection() as db:
+                return util.xcp_supply(db)
 
         @dispatcher.add_method
         def get_asset_info(assets):
-            if not isinstance(assets, list):
-                raise Exception("assets must be a list of asset names, even if it just contains one entry")
-            assetsInfo = []
-            for asset in assets:
-
-                # BTC and XCP.
-                if asset in [config.BTC, config.XCP]:
-                    if asset == config.BTC:
-                        supply = bitcoin.get_btc_supply(normalize=False)
-                    else:
-                        supply = util.xcp_supply(db)
-
-                    assetsInfo.append({
-                        'asset': asset,
-                        'owner': None,
-                        'divisible': True,
-                        'locked': False,
-                        'supply': supply,
-                        'callable': False,
-                        'call_date': None,
-                        'call_price': None,
-                        'description': '',
-                        'issuer': None
-                    })
-                    continue
-
-                # User‐created asset.
-                cursor = db.cursor()
-                issuances = list(cursor.execute('''SELECT * FROM issuances WHERE (status = ? AND asset = ?) ORDER BY block_index ASC''', ('valid', asset)))
-                cursor.close()
-                if not issuances: continue #asset not found, most likely
-                else: last_issuance = issuances[-1]
-                locked = False
-                for e in issuances:
-                    if e['locked']: locked = True
-                assetsInfo.append({
-                    'asset': asset,
-                    'owner': last_issuance['issuer'],
-                    'divisible': bool(last_issuance['divisible']),
-                    'locked': locked,
-                    'supply': util.asset_supply(db, asset),
-                    'callable': bool(last_issuance['callable']),
-                    'call_date': last_issuance['call_date'],
-                    'call_price': last_issuance['call_price'],
-                    'description': last_issuance['description'],
-                    'issuer': last_issuance['issuer']})
-            return assetsInfo
+            with pool.connection() as db:
+                if not isinstance(assets, list):
+                    raise Exception("assets must be a list of asset names, even if it just contains one entry")
+                assetsInfo = []
+                for asset in assets:
+                    info = asset_info_cache.get(db, asset, lambda: get_asset_info_row(db, asset))
+                    if info: assetsInfo.append(info)
+                return assetsInfo
 
         @dispatcher.add_method
         def get_block_info(block_index):
-            assert isinstance(block_index, int)
-            cursor = db.cursor()
-            cursor.execute('''SELECT * FROM blocks WHERE block_index = ?''', (block_index,))
-            blocks = list(cursor)
-            if len(blocks) == 1:
-                block = blocks[0]
-            elif len(blocks) == 0:
-                raise exceptions.DatabaseError('No blocks found.')
-            else:
-                assert False
-            cursor.close()
-            return block
+            with pool.connection() as db:
+                assert isinstance(block_index, int)
+                cursor = db.cursor()
+                cursor.execute('''SELECT * FROM blocks WHERE block_index = ?''', (block_index,))
+                blocks = list(cursor)
+                if len(blocks) == 1:
+                    block = blocks[0]
+                elif len(blocks) == 0:
+                    raise exceptions.DatabaseError('No blocks found.')
+                else:
+                    assert False
+                cursor.close()
+                return block
 
         @dispatcher.add_method
         def get_blocks(block_indexes):
             """fetches block info and messages for the specified block indexes"""
-            if not isinstance(block_indexes, (list, tuple)):
-                raise Exception("block_indexes must be a list of integers.")
-            if len(block_indexes) >= 250:
-                raise Exception("can only specify up to 250 indexes at a time.")
+            with pool.connection() as db:
+                if not isinstance(block_indexes, (list, tuple)):
+                    raise Exception("block_indexes must be a list of integers.")
+                if len(block_indexes) >= 250:
+                    raise Exception("can only specify up to 250 indexes at a time.")
 
-            block_indexes_str = ','.join([str(x) for x in block_indexes])
-            cursor = db.cursor()
+                block_indexes_str = ','.join([str(x) for x in block_indexes])
+                cursor = db.cursor()
 
-            cursor.execute('SELECT * FROM blocks WHERE block_index IN (%s) ORDER BY block_index ASC'
-                % (block_indexes_str,))
-            blocks = cursor.fetchall()
+                cursor.execute('SELECT * FROM blocks WHERE block_index IN (%s) ORDER BY block_index ASC'
+                    % (block_indexes_str,))
+                blocks = cursor.fetchall()
 
-            cursor.execute('SELECT * FROM messages WHERE block_index IN (%s) ORDER BY block_index ASC, message_index ASC'
-                % (block_indexes_str,))
-            messages = collections.deque(cursor.fetchall())
+                cursor.execute('SELECT * FROM messages WHERE block_index IN (%s) ORDER BY block_index ASC, message_index ASC'
+                    % (block_indexes_str,))
+                messages = collections.deque(cursor.fetchall())
 
-            for block in blocks:
-                messages_in_block = []
-                block['_messages'] = []
-                while len(messages) and messages[0]['block_index'] == block['block_index']:
-                    block['_messages'].append(messages.popleft())
-            assert not len(messages) #should have been cleared out
+                for block in blocks:
+                    messages_in_block = []
+                    block['_messages'] = []
+                    while len(messages) and messages[0]['block_index'] == block['block_index']:
+                        block['_messages'].append(messages.popleft())
+                assert not len(messages) #should have been cleared out
 
-            cursor.close()
-            return blocks
+                cursor.close()
+                return blocks
 
         @dispatcher.add_method
         def get_running_info():
-            proxy = backend.get_proxy()
-            latestBlockIndex = proxy.getblockcount()
+            with pool.connection() as db:
+                proxy = backend.get_proxy()
+                latestBlockIndex = proxy.getblockcount()
 
-            try:
-                check.database(db, latestBlockIndex)
-            except exceptions.DatabaseError as e:
-                caught_up = False
-            else:
-                caught_up = True
+                try:
+                    check.database(db, latestBlockIndex)
+                except exceptions.DatabaseError as e:
+                    caught_up = False
+                else:
+                    caught_up = True
 
-            try:
-                last_block = util.last_block(db)
-            except:
-                last_block = {'block_index': None, 'block_hash': None, 'block_time': None}
+                try:
+                    last_block = util.last_block(db)
+                except:
+                    last_block = {'block_index': None, 'block_hash': None, 'block_time': None}
 
-            try:
-                last_message = util.last_message(db)
-            except:
-                last_message = None
-
-            return {
-                'db_caught_up': caught_up,
-                'bitcoin_block_count': latestBlockIndex,
-                'last_block': last_block,
-                'last_message_index': last_message['message_index'] if last_message else -1,
-                'running_testnet': config.TESTNET,
-                'running_testcoin': config.TESTCOIN,
-                'version_major': config.VERSION_MAJOR,
-                'version_minor': config.VERSION_MINOR,
-                'version_revision': config.VERSION_REVISION
-            }
+                try:
+                    last_message = util.last_message(db)
+                except:
+                    last_message = None
+
+                return {
+                    'db_caught_up': caught_up,
+                    'bitcoin_block_count': latestBlockIndex,
+                    'last_block': last_block,
+                    'last_message_index': last_message['message_index'] if last_message else -1,
+                    'running_testnet': config.TESTNET,
+                    'running_testcoin': config.TESTCOIN,
+                    'version_major': config.VERSION_MAJOR,
+                    'version_minor': config.VERSION_MINOR,
+                    'version_revision': config.VERSION_REVISION,
+                    'last_block_metrics': check.LAST_BLOCK_METRICS
+                }
 
         @dispatcher.add_method
         def get_element_counts():
-            counts = {}
-            cursor = db.cursor()
-            for element in ['transactions', 'blocks', 'debits', 'credits', 'balances', 'sends', 'orders',
-                'order_matches', 'btcpays', 'issuances', 'broadcasts', 'bets', 'bet_matches', 'dividends',
-                'burns', 'cancels', 'callbacks', 'order_expirations', 'bet_expirations', 'order_match_expirations',
-                'bet_match_expirations', 'messages']:
-                cursor.execute("SELECT COUNT(*) AS count FROM %s" % element)
-                count_list = cursor.fetchall()
-                assert len(count_list) == 1
-                counts[element] = count_list[0]['count']
-            cursor.close()
-            return counts
+            with pool.connection() as db:
+                counts = {}
+                cursor = db.cursor()
+                for element in ['transactions', 'blocks', 'debits', 'credits', 'balances', 'sends', 'orders',
+                    'order_matches', 'btcpays', 'issuances', 'broadcasts', 'bets', 'bet_matches', 'dividends',
+                    'burns', 'cancels', 'callbacks', 'order_expirations', 'bet_expirations', 'order_match_expirations',
+                    'bet_match_expirations', 'messages']:
+                    cursor.execute("SELECT COUNT(*) AS count FROM %s" % element)
+                    count_list = cursor.fetchall()
+                    assert len(count_list) == 1
+                    counts[element] = count_list[0]['count']
+                cursor.close()
+                return counts
 
         @dispatcher.add_method
         def get_asset_names():
-            cursor = db.cursor()
-            names = [row['asset'] for row in cursor.execute("SELECT DISTINCT asset FROM issuances WHERE status = 'valid' ORDER BY asset ASC")]
-            cursor.close()
-            return names
+            with pool.connection() as db:
+                cursor = db.cursor()
+                names = [row['asset'] for row in cursor.execute("SELECT DISTINCT asset FROM issuances WHERE status = 'valid' ORDER BY asset ASC")]
+                cursor.close()
+                return names
 
         @dispatcher.add_method
         def get_holder_count(asset):
-            holders = util.holders(db, asset)
-            addresses = []
-            for holder in holders:
-                addresses.append(holder['address'])
-            return { asset: len(set(addresses)) }
+            with pool.connection() as db:
+                holders = util.holders(db, asset)
+                addresses = []
+                for holder in holders:
+                    addresses.append(holder['address'])
+                return { asset: len(set(addresses)) }
 
         @dispatcher.add_method
         def search_raw_transactions(address):
@@ -600,59 +1170,31 @@ class APIServer(threading.Thread):
             else:
                 return result
 
-        def _set_cors_headers(response):
-            if config.RPC_ALLOW_CORS:
-                response.headers['Access-Control-Allow-Origin'] = '*'
-                response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-                response.headers['Access-Control-Allow-Headers'] = 'DNT,X-Mx-ReqToken,Keep-Alive,User-Agent,X-Requested-With,If-Modified-Since,Cache-Control,Content-Type';
-
-        @app.route('/', methods=["OPTIONS",])
-        @app.route('/api/', methods=["OPTIONS",])
-        def handle_options():
-            response = flask.Response('', 204)
-            _set_cors_headers(response)
-            return response
-
-        @app.route('/', methods=["POST",])
-        @app.route('/api/', methods=["POST",])
-        @auth.login_required
-        def handle_post():
-            try:
-                request_json = flask.request.get_data().decode('utf-8')
-                request_data = json.loads(request_json)
-                assert 'id' in request_data and request_data['jsonrpc'] == "2.0" and request_data['method']
-                # params may be omitted
-            except:
-                obj_error = jsonrpc.exceptions.JSONRPCInvalidRequest(data="Invalid JSON-RPC 2.0 request format")
-                return flask.Response(obj_error.json.encode(), 200, mimetype='application/json')
-
-            #only arguments passed as a dict are supported
-            if request_data.get('params', None) and not isinstance(request_data['params'], dict):
-                obj_error = jsonrpc.exceptions.JSONRPCInvalidRequest(
-                    data='Arguments must be passed as a JSON object (list of unnamed arguments not supported)')
-                return flask.Response(obj_error.json.encode(), 200, mimetype='application/json')
-
-            #return an error if API fails checks
-            if not config.FORCE and current_api_status_code:
-                return flask.Response(current_api_status_response_json, 200, mimetype='application/json')
-
-            jsonrpc_response = jsonrpc.JSONRPCResponseManager.handle(request_json, dispatcher)
-            response = flask.Response(jsonrpc_response.json.encode(), 200, mimetype='application/json')
-            _set_cors_headers(response)
-            return response
-
         init_api_access_log()
 
-        http_server = HTTPServer(WSGIContainer(app), xheaders=True)
+        self.ioloop = IOLoop.instance()
+        feed = MessageFeed(self.ioloop)
+        executors = {'database': futures.ThreadPoolExecutor(max_workers=config.RPC_POOL_SIZE),
+                     'backend': futures.ThreadPoolExecutor(max_workers=API_BACKEND_THREADS)}
+        application = web.Application([
+            (r'/(?:api/)?', JSONRPCHandler, {'executors': executors}),
+            (r'/export/([a-z_]+)', ExportHandler, {'executors': executors}),
+            (r'/subscribe', SubscribeHandler, {'feed': feed}),
+            (r'/subscribe/websocket', SubscribeWebSocketHandler, {'feed': feed}),
+        ])
+        http_server = HTTPServer(application, xheaders=True)
         try:
             http_server.listen(config.RPC_PORT, address=config.RPC_HOST)
+            feed.start()
             self.is_ready = True
-            self.ioloop = IOLoop.instance()
             self.ioloop.start()
         except OSError:
             raise Exception("Cannot start the API subsystem. Is {} already running, or is something else listening on port {}?".format(config.XCP_CLIENT, config.RPC_PORT))
 
-        db.close()
+        feed.stop()
+        for executor in executors.values():
+            executor.shutdown(wait=False)
+        pool.close()
         http_server.stop()
         self.ioloop.close()
         return
@@ -1,5 +1,7 @@
 import getpass
 import binascii
+import collections
+import threading
 from functools import lru_cache
 
 import bitcoin as bitcoinlib
@@ -49,6 +51,66 @@ def get_cached_raw_transaction (tx_hash, verbose=False):
     else:
         return old_rpc('getrawtransaction', [tx_hash])
 
+# Raw transactions (hex), by hash, fetched in batches; least recently used first.
+raw_transactions_cache = collections.OrderedDict()
+raw_transactions_cache_lock = threading.Lock()
+
+def get_cached_raw_transactions (txhash_list):
+    """Get raw transactions (hex) in as few JSON‐RPC round trips as possible.
+
+    Transactions which the backend can’t find are left out of the result.
+    """
+    with raw_transactions_cache_lock:
+        missing = [tx_hash for tx_hash in collections.OrderedDict.fromkeys(txhash_list) if tx_hash not in raw_transactions_cache]
+
+    proxy = get_proxy()
+    for i in range(0, len(missing), config.BACKEND_RPC_BATCH_SIZE):
+        chunk = missing[i:i + config.BACKEND_RPC_BATCH_SIZE]
+        call_list = []
+        for call_id, tx_hash in enumerate(chunk):
+            call_list.append({
+                "method": 'getrawtransaction',
+                "params": [tx_hash],
+                "jsonrpc": "2.0",
+                "id": call_id
+            })
+        batch_responses = proxy._batch(call_list)
+        with raw_transactions_cache_lock:
+            for response in batch_responses:
+                if 'error' not in response or response['error'] is None:
+                    if 'result' in response and response['result'] is not None:
+                        raw_transactions_cache[chunk[response['id']]] = response['result']
+
+    raw_transactions = {}
+    with raw_transactions_cache_lock:
+        for tx_hash in txhash_list:
+            if tx_hash in raw_transactions_cache:
+                raw_transactions_cache.move_to_end(tx_hash)
+                raw_transactions[tx_hash] = raw_transactions_cache[tx_hash]
+        while len(raw_transactions_cache) > config.BACKEND_RAW_TRANSACTIONS_CACHE_SIZE:
+            raw_transactions_cache.popitem(last=False)
+    return raw_transactions
+
+def get_cached_ctx (tx_hash_bin):
+    """Get a transaction (as a `CTransaction`) from the cache of raw
+    transactions if it has been batch‐fetched, else from the backend."""
+    tx_hash = bitcoinlib.core.b2lx(tx_hash_bin)
+    with raw_transactions_cache_lock:
+        tx_hex = raw_transactions_cache.get(tx_hash)
+    if tx_hex is not None:
+        return deserialize(tx_hex)
+    proxy = get_proxy()
+    return proxy.getrawtransaction(tx_hash_bin)
+
+def get_input_txhash_list(ctxs):
+    """Hashes of the transactions spent by the inputs of `ctxs`."""
+    txhash_list = []
+    for ctx in ctxs:
+        if ctx.is_coinbase(): continue
+        for vin in ctx.vin:
+            txhash_list.append(bitcoinlib.core.b2lx(vin.prevout.hash))
+    return txhash_list
+
 def is_valid (address):
     proxy = get_proxy()
     return proxy.validateaddress(address)['isvalid']
@@ -1,5 +1,9 @@
 import os, json, time, logging, binascii
 import logging
+import collections
+import mmap
+import apsw
+from bitcoin.core.script import CScript
 
 from .bc_data_stream import BCDataStream
 from .utils import b2h, double_hash, ib2h, inverse_hash
@@ -16,16 +20,78 @@ def open_leveldb(db_dir):
         logging.info(str(e))
         raise Exception("Ensure that bitcoind is stopped.")
 
+class CompactOutPoint():
+    def __init__(self, hash, n):
+        self.hash = hash
+        self.n = n
+
+    def is_null(self):
+        return self.hash == b'\x00' * 32 and self.n == 0xffffffff
+
+class CompactTxIn():
+    def __init__(self, prevout, script_sig, sequence):
+        self.prevout = prevout
+        self.scriptSig = script_sig
+        self.nSequence = sequence
+
+class CompactTxOut():
+    def __init__(self, value, script):
+        self.nValue = value
+        self.script = script
+        self._script_pubkey = None
+
+    @property
+    def scriptPubKey(self):
+        if self._script_pubkey is None:
+            self._script_pubkey = CScript(bytes(self.script))
+        return self._script_pubkey
+
+class CompactTransaction():
+    """Transaction decoded in place: the raw transaction, scripts and
+    signatures are memoryview slices of the block data, and the hash is only
+    computed when asked for. Duck‐types the parts of python‐bitcoinlib’s
+    `CTransaction` used for parsing.
+    """
+
+    def __init__(self, data, vin, vout, lock_time):
+        self.data = data
+        self.vin = vin
+        self.vout = vout
+        self.nLockTime = lock_time
+        self._hash = None
+
+    def is_coinbase(self):
+        return len(self.vin) == 1 and self.vin[0].prevout.is_null()
+
+    def GetHash(self):
+        if self._hash is None:
+            self._hash = double_hash(self.data)
+        return self._hash
+
+    @property
+    def tx_hash(self):
+        return ib2h(self.GetHash())
+
+    @classmethod
+    def from_bytes(cls, data):
+        vds = BCDataStream()
+        vds.write(memoryview(data))
+        return BlockchainParser.read_compact_transaction(vds)
+
 class BlockchainParser():
 
-    def __init__(self, blocks_dir, leveldb_dir):
+    def __init__(self, blocks_dir, leveldb_dir=None, max_open_files=16):
         self.blocks_dir = blocks_dir 
         self.leveldb_dir = leveldb_dir
         self.file_num = -1
-        self.current_file_size = 0
-        self.current_block_file = None
         self.data_stream = None
-        self.ldb = open_leveldb(self.leveldb_dir)
+        # Mapped block files, by file number; least recently used first.
+        self.block_files = collections.OrderedDict()
+        self.max_open_files = max_open_files
+        # Without an index, blocks can only be read by position (LevelDB
+        # allows a single process at a time).
+        self.ldb = open_leveldb(self.leveldb_dir) if self.leveldb_dir else None
+        self.outputs_index = None
 
     def read_tx_in(self, vds):
         tx_in = {}
@@ -69,6 +135,25 @@ class BlockchainParser():
         transaction['__data__'] = b2h(data)
         return transaction
 
+    @staticmethod
+    def read_compact_transaction(vds):
+        start_pos = vds.read_cursor
+        version = vds.read_int32()
+
+        vin = []
+        for i in range(vds.read_compact_size()):
+            prevout = CompactOutPoint(bytes(vds.read_bytes(32)), vds.read_uint32())
+            script_sig = vds.read_bytes(vds.read_compact_size())
+            vin.append(CompactTxIn(prevout, script_sig, vds.read_uint32()))
+
+        vout = []
+        for i in range(vds.read_compact_size()):
+            value = vds.read_int64()
+            vout.append(CompactTxOut(value, vds.read_bytes(vds.read_compact_size())))
+
+        lock_time = vds.read_uint32()
+        return CompactTransaction(vds.input[start_pos:vds.read_cursor], vin, vout, lock_time)
+
     def read_block_header(self, vds):
         block_header = {}
         block_header['magic_bytes'] = vds.read_int32()
@@ -96,19 +181,32 @@ class BlockchainParser():
             block['transactions'].append(self.read_transaction(vds))
         return block
 
+    def map_block_file(self, file_num):
+        if file_num in self.block_files:
+            self.block_files.move_to_end(file_num)
+        else:
+            data_file_path = os.path.join(self.blocks_dir, 'blk%05d.dat' % (file_num,))
+            block_file = open(data_file_path, "rb")
+            self.block_files[file_num] = (block_file, mmap.mmap(block_file.fileno(), 0, access=mmap.ACCESS_READ))
+            while len(self.block_files) > self.max_open_files:
+                self.unmap_block_file(*self.block_files.popitem(last=False)[1])
+        return self.block_files[file_num][1]
+
+    def unmap_block_file(self, block_file, block_map):
+        block_map.close()
+        block_file.close()
+
     def prepare_data_stream(self, file_num, pos_in_file):
         if self.data_stream is None or file_num != self.file_num:
             self.file_num = file_num
-            if self.current_block_file:
-                self.current_block_file.close()
-            data_file_path = os.path.join(self.blocks_dir, 'blk%05d.dat' % (self.file_num,))
-            self.current_block_file = open(data_file_path, "rb")
             self.data_stream = BCDataStream()
-            self.data_stream.map_file(self.current_block_file, pos_in_file)
+            self.data_stream.input = self.map_block_file(file_num)
         else:
-            self.data_stream.seek_file(pos_in_file)
+            # Keep the current file most recently used.
+            self.map_block_file(file_num)
+        self.data_stream.seek_file(pos_in_file)
 
-    def read_raw_block(self, block_hash):
+    def read_block_index(self, block_hash):
         block_hash = binascii.unhexlify(inverse_hash(block_hash))
         block_data = self.ldb.get(bytes('b', 'utf-8') + block_hash)
         ds = BCDataStream()
@@ -123,13 +221,44 @@ class BlockchainParser():
         block_undo_pos_in_file = ds.read_var_int()
         block_header = ds.read_bytes(80)
 
+        return {
+            'block_index': height,
+            'file_num': file_num,
+            'block_pos_in_file': block_pos_in_file,
+            'hash_prev': ib2h(block_header[4:36])
+        }
+
+    def read_block_at(self, file_num, block_pos_in_file, block_index):
         self.prepare_data_stream(file_num, block_pos_in_file)
 
         block = self.read_block(self.data_stream)
-        block['block_index'] = height
+        block['block_index'] = block_index
+
+        return block
+
+    def read_compact_block_at(self, file_num, block_pos_in_file, block_index):
+        """Like `read_block_at`, with transactions as `CompactTransaction`s
+        sharing a single copy of the block data."""
+        self.prepare_data_stream(file_num, block_pos_in_file)
+
+        block = self.read_block_header(self.data_stream)
+        block['block_index'] = block_index
+        block['transaction_count'] = self.data_stream.read_compact_size()
+
+        # Copy out of the map, so that no views of it outlive its eviction.
+        block_end = block_pos_in_file + 8 + block['block_size']
+        vds = BCDataStream()
+        vds.write(memoryview(self.data_stream.input[self.data_stream.read_cursor:block_end]))
+        block['transactions'] = []
+        for i in range(block['transaction_count']):
+            block['transactions'].append(self.read_compact_transaction(vds))
 
         return block
 
+    def read_raw_block(self, block_hash):
+        location = self.read_block_index(block_hash)
+        return self.read_block_at(location['file_num'], location['block_pos_in_file'], location['block_index'])
+
     def read_raw_transaction(self, tx_hash):
         tx_hash = binascii.unhexlify(inverse_hash(tx_hash))
         tx_data = self.ldb.get(bytes('t', 'utf-8') + tx_hash)
@@ -149,9 +278,53 @@ class BlockchainParser():
         return transaction
 
     def close(self):
-        if self.current_block_file:
-            self.current_block_file.close()
-        self.ldb.close()
+        while self.block_files:
+            self.unmap_block_file(*self.block_files.popitem()[1])
+        self.data_stream = None
+        if self.ldb:
+            self.ldb.close()
+
+class OutputsIndex():
+    """On‐disk index of transaction outputs (value and scriptPubKey) by
+    `(txid, vout)`, so that sources can be resolved without re‐reading the
+    funding transactions.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.db = apsw.Connection(self.path)
+        cursor = self.db.cursor()
+        # Scratch data: rebuilt from the block files if lost.
+        cursor.execute('''PRAGMA journal_mode = OFF''')
+        cursor.execute('''PRAGMA synchronous = OFF''')
+        cursor.execute('''CREATE TABLE IF NOT EXISTS outputs(
+                          tx_hash BLOB,
+                          vout INTEGER,
+                          value INTEGER,
+                          script BLOB,
+                          PRIMARY KEY (tx_hash, vout)) WITHOUT ROWID''')
+        cursor.close()
+
+    def add(self, outputs):
+        """Add `(tx_hash, vout, value, script)` tuples, with binary (internal
+        byte order) transaction hashes."""
+        cursor = self.db.cursor()
+        with self.db:
+            cursor.executemany('''INSERT OR REPLACE INTO outputs VALUES(?,?,?,?)''', outputs)
+        cursor.close()
+
+    def get(self, tx_hash, vout):
+        cursor = self.db.cursor()
+        outputs = list(cursor.execute('''SELECT value, script FROM outputs WHERE (tx_hash = ? AND vout = ?)''', (tx_hash, vout)))
+        cursor.close()
+        if outputs:
+            return outputs[0]
+        return None
+
+    def close(self, remove=False):
+        self.db.close()
+        if remove:
+            os.remove(self.path)
 
 class ChainstateParser():
 
@@ -13,16 +13,19 @@ D = decimal.Decimal
 import logging
 import collections
 import platform
+import threading
+import queue
+import multiprocessing
 from Crypto.Cipher import ARC4
 import apsw
 import csv
 
 import bitcoin as bitcoinlib
 
-from lib import (config, exceptions, util, bitcoin, check, script, backend)
+from lib import (config, exceptions, util, bitcoin, check, script, backend, database, undolog, snapshot, notify)
 from .messages import (send, order, btcpay, issuance, broadcast, bet, dividend, burn, cancel, callback, rps, rpsresolve, publish, execute, destroy)
 
-from .blockchain.blocks_parser import BlockchainParser, ChainstateParser
+from .blockchain.blocks_parser import BlockchainParser, ChainstateParser, OutputsIndex, CompactTransaction
 from .blockchain.utils import ib2h
 
 from .exceptions import DecodeError
@@ -36,6 +39,9 @@ TABLES = ['credits', 'debits', 'messages'] + \
          'rps_match_expirations', 'rps_expirations', 'rpsresolves',
          'rps_matches', 'rps', 'executions', 'contracts', 'storage',
          'suicides', 'nonces', 'postqueue', 'destructions', 'assets']
+# Supplies follow the tables they are computed from (by triggers), and are
+# snapshotted only to be read.
+SNAPSHOT_TABLES = TABLES + ['balances', 'supplies']
 
 CURR_DIR = os.path.dirname(os.path.realpath(__file__))
 with open(CURR_DIR + '/../mainnet_burns.csv', 'r') as f:
@@ -92,9 +98,13 @@ def parse_tx (db, tx):
     elif message_type_id == rpsresolve.ID and rps_enabled:
         rpsresolve.parse(db, tx, message)
     elif message_type_id == publish.ID and tx['block_index'] != config.MEMPOOL_BLOCK_INDEX:
-        publish.parse(db, tx, message)
+        # Contracts roll back with savepoints, which the balance cache and
+        # the message journal can’t follow.
+        with util.balance_cache_suspended(db), util.message_journal_suspended(db):
+            publish.parse(db, tx, message)
     elif message_type_id == execute.ID and tx['block_index'] != config.MEMPOOL_BLOCK_INDEX:
-        execute.parse(db, tx, message)
+        with util.balance_cache_suspended(db), util.message_journal_suspended(db):
+            execute.parse(db, tx, message)
     elif message_type_id == destroy.ID:
         destroy.parse(db, tx, message)
     else:
@@ -118,29 +128,50 @@ def parse_tx (db, tx):
 def parse_block (db, block_index, block_time, previous_ledger_hash=None, ledger_hash=None, previous_txlist_hash=None, txlist_hash=None):
     cursor = db.cursor()
 
-    util.BLOCK_LEDGER = []
+    # Hash the ledger and the transactions as they go.
+    ledger_hasher = check.ConsensusHasher(db, block_index, 'ledger_hash', previous_ledger_hash)
+    txlist_hasher = check.ConsensusHasher(db, block_index, 'txlist_hash', previous_txlist_hash)
+    util.LEDGER_HASHER = ledger_hasher
 
-    # Expire orders, bets and rps.
-    order.expire(db, block_index)
-    bet.expire(db, block_index, block_time)
-    rps.expire(db, block_index)
-
-    # Parse transactions, sorting them by type.
-    cursor.execute('''SELECT * FROM transactions \
-                      WHERE block_index=? ORDER BY tx_index''',
-                   (block_index,))
-    txlist = []
-    for tx in list(cursor):
-        parse_tx(db, tx)
-        txlist.append('{}{}{}{}{}{}'.format(tx['tx_hash'], tx['source'], tx['destination'],
-                                            tx['btc_amount'], tx['fee'],
-                                            binascii.hexlify(tx['data']).decode('UTF-8')))
+    # Keep balances and messages in memory until the end of the block.
+    util.start_balance_cache(db)
+    util.start_message_journal(db)
+    util.clear_log_divisibility()
+    try:
+        # Expire orders, bets and rps.
+        order.expire(db, block_index)
+        bet.expire(db, block_index, block_time)
+        rps.expire(db, block_index)
+
+        # Parse transactions, sorting them by type.
+        cursor.execute('''SELECT * FROM transactions \
+                          WHERE block_index=? ORDER BY tx_index''',
+                       (block_index,))
+        for tx in list(cursor):
+            parse_tx(db, tx)
+            txlist_hasher.update('{}{}{}{}{}{}'.format(tx['tx_hash'], tx['source'], tx['destination'],
+                                                       tx['btc_amount'], tx['fee'],
+                                                       binascii.hexlify(tx['data']).decode('UTF-8')))
+
+        util.flush_balance_cache(db)
+        util.flush_message_journal(db)
+    finally:
+        util.stop_balance_cache()
+        util.stop_message_journal()
+        util.LEDGER_HASHER = None
 
     cursor.close()
 
     # Consensus hashes.
-    new_ledger_hash = check.consensus_hash(db, block_index, 'ledger_hash', previous_ledger_hash, util.BLOCK_LEDGER)
-    new_txlist_hash = check.consensus_hash(db, block_index, 'txlist_hash', previous_txlist_hash, txlist)
+    new_ledger_hash = ledger_hasher.finish()
+    new_txlist_hash = txlist_hasher.finish()
+    check.LAST_BLOCK_METRICS = {
+        'block_index': block_index,
+        'ledger_entries': ledger_hasher.entries,
+        'ledger_size': ledger_hasher.size,
+        'txlist_entries': txlist_hasher.entries,
+        'txlist_size': txlist_hasher.size
+    }
 
     return new_ledger_hash, new_txlist_hash
 
@@ -236,6 +267,18 @@ def initialise(db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       asset_idx ON debits (asset)
                    ''')
+    # Index names are global to the database: new ones are prefixed with the
+    # name of their table. (See `lib/queryplan.py`.)
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      debits_address_asset_block_index_idx ON debits (address, asset, block_index)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      debits_block_index_idx ON debits (block_index)
+                   ''')
+    # Pages of an address’s debits, in either order (see `get_rows_query()`).
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      debits_address_block_index_idx ON debits (address, block_index)
+                   ''')
 
     # (Valid) credits
     cursor.execute('''CREATE TABLE IF NOT EXISTS credits(
@@ -253,6 +296,18 @@ def initialise(db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       asset_idx ON credits (asset)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      credits_address_asset_block_index_idx ON credits (address, asset, block_index)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      credits_block_index_idx ON credits (block_index)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      credits_address_idx ON credits (address)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      credits_address_block_index_idx ON credits (address, block_index)
+                   ''')
 
     # Balances
     cursor.execute('''CREATE TABLE IF NOT EXISTS balances(
@@ -269,6 +324,9 @@ def initialise(db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       asset_idx ON balances (asset)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      balances_asset_idx ON balances (asset)
+                   ''')
 
     # Assets
     # TODO: Store more asset info here?!
@@ -305,6 +363,48 @@ def initialise(db):
     rpsresolve.initialise(db)
     callback.initialise(db)
 
+    # Supplies
+    # Kept up to date by triggers on the tables they are computed from, so
+    # that undoing, reparsing and restoring those tables also updates them.
+    supplies_exist = list(cursor.execute('''SELECT * FROM sqlite_master WHERE type = ? AND name = ?''', ('table', 'supplies')))
+    cursor.execute('''CREATE TABLE IF NOT EXISTS supplies(
+                      asset TEXT PRIMARY KEY,
+                      issued INTEGER,
+                      destroyed INTEGER)
+                   ''')
+    if not supplies_exist:
+        cursor.execute('''INSERT INTO supplies VALUES(?, 0, 0)''', (config.XCP,))
+        cursor.execute('''INSERT OR IGNORE INTO supplies SELECT DISTINCT asset, 0, 0 FROM issuances WHERE status = ?''', ('valid',))
+        cursor.execute('''INSERT OR IGNORE INTO supplies SELECT DISTINCT asset, 0, 0 FROM destructions WHERE status = ?''', ('valid',))
+        cursor.execute('''UPDATE supplies SET
+                          issued = (SELECT IFNULL(SUM(quantity), 0) FROM issuances WHERE (status = ? AND asset = supplies.asset)),
+                          destroyed = (SELECT IFNULL(SUM(quantity), 0) FROM destructions WHERE (status = ? AND asset = supplies.asset))
+                       ''', ('valid', 'valid'))
+        cursor.execute('''UPDATE supplies SET
+                          issued = issued + (SELECT IFNULL(SUM(earned), 0) FROM burns WHERE status = ?),
+                          destroyed = destroyed + (SELECT IFNULL(SUM(fee_paid), 0) FROM issuances WHERE status = ?)
+                                                + (SELECT IFNULL(SUM(fee_paid), 0) FROM dividends WHERE status = ?)
+                          WHERE asset = ?
+                       ''', ('valid', 'valid', 'valid', config.XCP))
+    # Issuances create assets, and destroy their fees in XCP.
+    for event, row, sign in (('insert', 'new', '+'), ('delete', 'old', '-')):
+        names = {'event': event, 'EVENT': event.upper(), 'row': row, 'sign': sign, 'XCP': config.XCP}
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS supplies_issuances_{event} AFTER {EVENT} ON issuances WHEN {row}.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES({row}.asset, 0, 0);
+                            UPDATE supplies SET issued = issued {sign} {row}.quantity WHERE asset = {row}.asset;
+                            UPDATE supplies SET destroyed = destroyed {sign} {row}.fee_paid WHERE asset = '{XCP}';
+                          END'''.format(**names))
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS supplies_destructions_{event} AFTER {EVENT} ON destructions WHEN {row}.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES({row}.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed {sign} {row}.quantity WHERE asset = {row}.asset;
+                          END'''.format(**names))
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS supplies_burns_{event} AFTER {EVENT} ON burns WHEN {row}.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued {sign} {row}.earned WHERE asset = '{XCP}';
+                          END'''.format(**names))
+        cursor.execute('''CREATE TRIGGER IF NOT EXISTS supplies_dividends_{event} AFTER {EVENT} ON dividends WHEN {row}.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed {sign} {row}.fee_paid WHERE asset = '{XCP}';
+                          END'''.format(**names))
+
     # Messages
     cursor.execute('''CREATE TABLE IF NOT EXISTS messages(
                       message_index INTEGER PRIMARY KEY,
@@ -332,13 +432,37 @@ def initialise(db):
                       bindings TEXT,
                       timestamp INTEGER)
                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      mempool_tx_hash_idx ON mempool (tx_hash)
+                   ''')
 
     cursor.close()
 
+def get_prevout (vin, block_parser = None):
+    """Get the output (a `CTxOut`) spent by an input."""
+    if block_parser:
+        if block_parser.outputs_index:
+            output = block_parser.outputs_index.get(vin.prevout.hash, vin.prevout.n)
+            if output:
+                value, scriptpubkey = output
+                return bitcoinlib.core.CTxOut(value, bitcoinlib.core.script.CScript(scriptpubkey))
+        vin_tx = block_parser.read_raw_transaction(ib2h(vin.prevout.hash))
+        vin_ctx = backend.deserialize(vin_tx['__data__'])
+    else:
+        vin_ctx = backend.get_cached_ctx(vin.prevout.hash)
+    return vin_ctx.vout[vin.prevout.n]
+
+def get_ctx (tx):
+    """Deserialise a raw transaction (hex), unless it has been decoded
+    already (as a `CTransaction` or a `CompactTransaction`)."""
+    if isinstance(tx, str):
+        return backend.deserialize(tx)
+    return tx
+
 def get_tx_info (tx_hex, block_index, block_parser = None):
     try:
         if util.enabled('multisig_addresses', block_index):   # Protocol change.
-            tx_info = get_tx_info2(tx_hex, block_parser=block_parser)
+            tx_info = get_tx_info2(tx_hex, block_parser=block_parser, pre_filter=True)
         else:
             tx_info = get_tx_info1(tx_hex, block_index, block_parser=block_parser)
     except DecodeError as e:
@@ -352,7 +476,7 @@ def get_tx_info1 (tx_hex, block_index, block_parser = None):
     The destination, if it exists, always comes before the data output; the
     change, if it exists, always comes after.
     """
-    ctx = backend.deserialize(tx_hex)
+    ctx = get_ctx(tx_hex)
 
     def get_pubkeyhash (scriptpubkey):
         asm = script.get_asm(scriptpubkey)
@@ -435,13 +559,7 @@ def get_tx_info1 (tx_hex, block_index, block_parser = None):
         if vin.prevout.is_null():
             raise DecodeError('coinbase transaction')
          # Get the full transaction data for this input transaction.
-        if block_parser:
-            vin_tx = block_parser.read_raw_transaction(ib2h(vin.prevout.hash))
-            vin_ctx = backend.deserialize(vin_tx['__data__'])
-        else:
-            proxy = backend.get_proxy()
-            vin_ctx = proxy.getrawtransaction(vin.prevout.hash)
-        vout = vin_ctx.vout[vin.prevout.n]
+        vout = get_prevout(vin, block_parser)
         fee += vout.nValue
 
         address = get_address(vout.scriptPubKey)
@@ -454,14 +572,83 @@ def get_tx_info1 (tx_hex, block_index, block_parser = None):
 
     return source, destination, btc_amount, fee, data
 
-def get_tx_info2 (tx_hex, block_parser = None):
+def is_candidate_tx1 (ctx, block_index):
+    """Counterpart of `is_candidate_tx2` for `get_tx_info1`. Coarser: any
+    OP_RETURN or 1‐of‐2 multi‐sig output makes a candidate.
+    """
+    unspendable_pubkeyhash = util.base58_check_decode(config.UNSPENDABLE, config.ADDRESSVERSION)
+    for vout in ctx.vout:
+        try:
+            asm = script.get_asm(vout.scriptPubKey)
+        except DecodeError:
+            continue
+        if len(asm) == 2 and asm[0] == 'OP_RETURN':
+            return True
+        elif len(asm) == 5 and asm[0] == 1 and asm[3] == 2 and asm[4] == 'OP_CHECKMULTISIG':
+            return True
+        elif len(asm) == 5 and asm[0] == 'OP_DUP' and asm[1] == 'OP_HASH160' and asm[3] == 'OP_EQUALVERIFY' and asm[4] == 'OP_CHECKSIG':
+            pubkeyhash = asm[2]
+            if pubkeyhash == unspendable_pubkeyhash:
+                return True
+            if block_index >= 293000 or config.TESTNET:    # Protocol change.
+                if ARC4.new(ctx.vin[0].prevout.hash[::-1]).decrypt(pubkeyhash[:9])[1:9] == config.PREFIX:
+                    return True
+    return False
+
+def is_candidate_tx (ctx, block_index):
+    """Whether `get_tx_info` could find a Counterparty transaction in `ctx`,
+    judging by its outputs alone."""
+    if ctx.is_coinbase():
+        return False
+    if util.enabled('multisig_addresses', block_index):   # Protocol change.
+        return is_candidate_tx2(ctx)
+    else:
+        return is_candidate_tx1(ctx, block_index)
+
+def is_candidate_tx2 (ctx):
+    """Tell, cheaply and without looking up any inputs, whether a transaction
+    may carry Counterparty data or be a burn.
+
+    A negative answer is definitive: `get_tx_info2` would find neither data
+    nor a destination of `config.UNSPENDABLE` in its outputs.
+    """
+    key = ctx.vin[0].prevout.hash[::-1]
+    unspendable_pubkeyhash = util.base58_check_decode(config.UNSPENDABLE, config.ADDRESSVERSION)
+
+    # Only the bytes which could hold the prefix need to be decrypted.
+    def has_prefix (cyphertext, offset):
+        chunk = ARC4.new(key).decrypt(cyphertext[:offset + len(config.PREFIX)])
+        return chunk[offset:] == config.PREFIX
+
+    for vout in ctx.vout:
+        try:
+            asm = script.get_asm(vout.scriptPubKey)
+            if asm[0] == 'OP_RETURN':
+                if len(asm) == 2 and type(asm[1]) == bytes and has_prefix(asm[1], 0):
+                    return True
+            elif asm[-1] == 'OP_CHECKSIG':
+                pubkeyhash = script.get_checksig(asm)
+                if pubkeyhash == unspendable_pubkeyhash or has_prefix(pubkeyhash, 1):
+                    return True
+            elif asm[-1] == 'OP_CHECKMULTISIG':
+                pubkeys, signatures_required = script.get_checkmultisig(asm)
+                if has_prefix(b''.join(pubkey[1:-1] for pubkey in pubkeys[:-1]), 1):
+                    return True
+        except DecodeError:
+            continue
+    return False
+
+def get_tx_info2 (tx_hex, block_parser = None, pre_filter = False):
     """
     The destinations, if they exists, always comes before the data output; the
     change, if it exists, always comes after.
+
+    With `pre_filter`, transactions which can’t be Counterparty transactions
+    are rejected before any of their inputs are looked up.
     """
 
     # Decode transaction binary.
-    ctx = backend.deserialize(tx_hex)
+    ctx = get_ctx(tx_hex)
 
     def arc4_decrypt (cyphertext):
         '''Un‐obfuscate. Initialise key once per attempt.'''
@@ -519,6 +706,10 @@ def get_tx_info2 (tx_hex, block_parser = None):
     # Ignore coinbase transactions.
     if ctx.is_coinbase(): raise DecodeError('coinbase transaction')
 
+    # Ignore anything with neither data nor a burn, for speed.
+    if pre_filter and not is_candidate_tx2(ctx):
+        raise DecodeError('no prefix and not unspendable')
+
     # Get destinations and data outputs.
     destinations, btc_amount, fee, data = [], 0, 0, b''
     for vout in ctx.vout:
@@ -552,13 +743,7 @@ def get_tx_info2 (tx_hex, block_parser = None):
     sources = []
     for vin in ctx.vin[:]:                   # Loop through inputs.
         # Get the full transaction data for this input transaction.  
-        if block_parser:
-            vin_tx = block_parser.read_raw_transaction(ib2h(vin.prevout.hash))
-            vin_ctx = backend.deserialize(vin_tx['__data__'])
-        else:
-            proxy = backend.get_proxy()
-            vin_ctx = proxy.getrawtransaction(vin.prevout.hash)
-        vout = vin_ctx.vout[vin.prevout.n]
+        vout = get_prevout(vin, block_parser)
         fee += vout.nValue
 
         asm = script.get_asm(vout.scriptPubKey)
@@ -582,8 +767,11 @@ def get_tx_info2 (tx_hex, block_parser = None):
 def reinitialise(db, block_index=None):
     cursor = db.cursor()
 
+    # The undo log is useless once everything is reparsed.
+    undolog.clear(db, TABLES + ['balances'])
+
     # Delete all of the results of parsing.
-    for table in TABLES + ['balances']:
+    for table in TABLES + ['balances', 'supplies']:
         cursor.execute('''DROP TABLE IF EXISTS {}'''.format(table))
 
     # Create missing tables
@@ -612,45 +800,216 @@ def reinitialise(db, block_index=None):
 def reparse (db, block_index=None, quiet=False):
     """Reparse all transactions (atomically). If block_index is set, rollback
     to the end of that block.
+
+    Parsing starts from the newest usable snapshot at or below the target, if
+    there is one.
     """
-    logging.warning('Status: Reparsing all transactions.')
     cursor = db.cursor()
 
-    with db:
-        reinitialise(db, block_index)
+    last_block_index = block_index
+    if last_block_index is None:
+        last_block_index = list(cursor.execute('''SELECT MAX(block_index) AS block_index FROM blocks'''))[0]['block_index'] or 0
+    snapshot_path = snapshot.find(db, last_block_index)
+    if snapshot_path:
+        logging.warning('Status: Reparsing transactions from snapshot `{}`.'.format(os.path.basename(snapshot_path)))
+        snapshot.attach(db, snapshot_path)
+    else:
+        logging.warning('Status: Reparsing all transactions.')
 
-        # Reparse all blocks, transactions.
-        if quiet:
-            log = logging.getLogger('')
-            log.setLevel(logging.WARNING)
+    try:
+        with db:
+            if snapshot_path:
+                undolog.clear(db, TABLES + ['balances'])
+                snapshot_block_index = snapshot.restore(db, TABLES + ['balances'])
+                cursor.execute('''DELETE FROM transactions WHERE block_index > ?''', (last_block_index,))
+                cursor.execute('''DELETE FROM blocks WHERE block_index > ?''', (last_block_index,))
+            else:
+                reinitialise(db, block_index)
+                snapshot_block_index = 0
+
+            # Reparse all blocks, transactions.
+            if quiet:
+                log = logging.getLogger('')
+                log.setLevel(logging.WARNING)
         
+            previous_ledger_hash, previous_txlist_hash = None, None
+            cursor.execute('''SELECT * FROM blocks WHERE block_index > ? ORDER BY block_index''', (snapshot_block_index,))
+            for block in cursor.fetchall():
+                logging.info('Block (re‐parse): {}'.format(str(block['block_index'])))
+                previous_ledger_hash, previous_txlist_hash = parse_block(db, block['block_index'], block['block_time'],
+                                                                         previous_ledger_hash, block['ledger_hash'],
+                                                                         previous_txlist_hash, block['txlist_hash'])
+
+            if quiet:
+                log.setLevel(logging.INFO)
+
+            # Check for conservation of assets.
+            check.asset_conservation(db)
+
+            # Update minor version number.
+            minor_version = cursor.execute('PRAGMA user_version = {}'.format(int(config.VERSION_MINOR))) # Syntax?!
+            logging.info('Status: Database minor version number updated.')
+    finally:
+        if snapshot_path:
+            snapshot.detach(db)
+
+    cursor.close()
+    return
+
+def remove_database_files(path):
+    for path in (path, path + '-journal', path + '-wal', path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+def copy_blocks(db, source_schema, first_block_index, last_block_index):
+    """Copy blocks and transactions from another (attached) database."""
+    cursor = db.cursor()
+    for table in ('blocks', 'transactions'):
+        columns = ','.join(['"{}"'.format(column['name']) for column in cursor.execute('''PRAGMA {}.table_info({})'''.format(source_schema, table))])
+        cursor.execute('''INSERT INTO main.{0}({1}) SELECT {1} FROM {2}.{0}
+                          WHERE block_index >= ? AND block_index <= ?
+                          ORDER BY rowid'''.format(table, columns, source_schema),
+                       (first_block_index, last_block_index))
+    cursor.close()
+
+def get_worker_settings():
+    """The settings in `config`, as `set_options()` left them."""
+    return {name: getattr(config, name) for name in dir(config) if name.isupper()}
+
+def init_worker(settings):
+    """Workers that are spawned, rather than forked, import `config` afresh."""
+    for name, value in settings.items():
+        setattr(config, name, value)
+
+def get_worker_pool(processes):
+    return multiprocessing.Pool(processes, initializer=init_worker, initargs=(get_worker_settings(),))
+
+def imap_bounded(pool, function, tasks, window):
+    """Like `pool.imap()`, but with at most `window` tasks queued or running,
+    so that results don’t pile up when they are consumed slower than they
+    are computed."""
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(pool.apply_async(function, (task,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+def verify_blocks(task):
+    """Reparse an interval of blocks in a scratch database, starting from a
+    snapshot (or from scratch), and check them against the consensus hashes in
+    the database. Snapshot any checkpoints passed. (Runs in worker processes.)
+    """
+    snapshot_path, first_block_index, last_block_index = task
+    logging.getLogger('').setLevel(logging.WARNING)
+    checkpoints = check.CHECKPOINTS_TESTNET if config.TESTNET else check.CHECKPOINTS_MAINNET
+
+    scratch_path = '{}.verify.{}'.format(config.DATABASE, first_block_index)
+    remove_database_files(scratch_path)
+    db = apsw.Connection(scratch_path)
+    db.setrowtrace(database.rowtracer)
+    cursor = db.cursor()
+    try:
+        initialise(db)
+        cursor.execute('''PRAGMA synchronous = OFF''')
+        if snapshot_path:
+            snapshot.attach(db, snapshot_path)
+            with db:
+                snapshot.restore(db, TABLES + ['balances'])
+            snapshot.detach(db)
+        # Parsing reads earlier blocks and transactions too.
+        cursor.execute('''ATTACH DATABASE ? AS live''', (config.DATABASE,))
+        copy_blocks(db, 'live', 0, last_block_index)
+        cursor.execute('''DETACH DATABASE live''')
+
+        # Commit, and snapshot, at every checkpoint.
+        block_list = collections.deque(cursor.execute('''SELECT * FROM blocks WHERE block_index >= ? ORDER BY block_index''', (first_block_index,)))
         previous_ledger_hash, previous_txlist_hash = None, None
-        cursor.execute('''SELECT * FROM blocks ORDER BY block_index''')
-        for block in cursor.fetchall():
-            logging.info('Block (re‐parse): {}'.format(str(block['block_index'])))
-            previous_ledger_hash, previous_txlist_hash = parse_block(db, block['block_index'], block['block_time'],
-                                                                     previous_ledger_hash, block['ledger_hash'],
-                                                                     previous_txlist_hash, block['txlist_hash'])
+        while block_list:
+            with db:
+                while block_list:
+                    block = block_list.popleft()
+                    previous_ledger_hash, previous_txlist_hash = parse_block(db, block['block_index'], block['block_time'],
+                                                                             previous_ledger_hash, block['ledger_hash'],
+                                                                             previous_txlist_hash, block['txlist_hash'])
+                    if block['block_index'] in checkpoints:
+                        break
+            if block['block_index'] in checkpoints and not os.path.exists(snapshot.get_path(block['block_index'])):
+                snapshot.create(db, block['block_index'], SNAPSHOT_TABLES)
+    except (check.ConsensusError, check.SanityError) as e:
+        return first_block_index, last_block_index, str(e)
+    finally:
+        cursor.close()
+        db.close()
+        remove_database_files(scratch_path)
+    return first_block_index, last_block_index, None
 
-        if quiet:
-            log.setLevel(logging.INFO)
+def verify (db, jobs=1):
+    """Check every block against the consensus hashes in the database, without
+    modifying it, reparsing the intervals between snapshots in parallel.
+    """
+    last_block_index = util.last_block(db)['block_index']
+    usable = snapshot.list_usable(db, last_block_index)
+
+    tasks = []
+    starts = [(config.BLOCK_FIRST - 1, None)] + list(usable.items())
+    for i, (start_block_index, snapshot_path) in enumerate(starts):
+        end_block_index = starts[i + 1][0] if i + 1 < len(starts) else last_block_index
+        if end_block_index > start_block_index:
+            tasks.append((snapshot_path, start_block_index + 1, end_block_index))
+    logging.warning('Status: Verifying blocks {} to {}, in {} intervals.'.format(config.BLOCK_FIRST, last_block_index, len(tasks)))
+
+    if jobs > 1 and len(tasks) > 1:
+        pool = get_worker_pool(min(jobs, len(tasks)))
+        results = pool.imap(verify_blocks, tasks)
+    else:
+        pool = None
+        results = map(verify_blocks, tasks)
+
+    errors = []
+    for first_block_index, end_block_index, error in results:
+        if error:
+            logging.error('Status: Blocks {} to {}: {}'.format(first_block_index, end_block_index, error))
+            errors.append(error)
+        else:
+            logging.info('Status: Blocks {} to {} verified.'.format(first_block_index, end_block_index))
+
+    if pool:
+        pool.close()
+        pool.join()
+    if errors:
+        raise check.ConsensusError(errors[0])
+    logging.warning('Status: Database verified.')
+
+def rollback (db, block_index):
+    """Rollback to the end of block `block_index` (atomically), replaying the
+    undo log if it reaches back far enough, and reparsing otherwise.
+    """
+    if not undolog.can_rollback(db, block_index):
+        reparse(db, block_index=block_index, quiet=True)
+        undolog.initialise(db, TABLES + ['balances'])
+        return
 
-        # Check for conservation of assets.
-        check.asset_conservation(db)
+    logging.warning('Status: Rolling back to block {}.'.format(block_index))
+    cursor = db.cursor()
 
-        # Update minor version number.
-        minor_version = cursor.execute('PRAGMA user_version = {}'.format(int(config.VERSION_MINOR))) # Syntax?!
-        logging.info('Status: Database minor version number updated.')
+    with db:
+        undolog.rollback(db, block_index, TABLES + ['balances'])
+        cursor.execute('''DELETE FROM transactions WHERE block_index > ?''', (block_index,))
+        cursor.execute('''DELETE FROM blocks WHERE block_index > ?''', (block_index,))
 
+    util.clear_log_divisibility()
     cursor.close()
-    return
 
-def list_tx (db, block_hash, block_index, block_time, tx_hash, tx_index):
+def list_tx (db, block_hash, block_index, block_time, tx_hash, tx_index, tx_info=None):
     assert type(tx_hash) == str
 
-    # Get the important details about each transaction.
-    tx_dict = backend.get_cached_raw_transaction(tx_hash, verbose=True)
-    source, destination, btc_amount, fee, data = get_tx_info(tx_dict['hex'], block_index)
+    # Get the important details about each transaction (unless already fetched).
+    if tx_info is None:
+        tx_dict = backend.get_cached_raw_transaction(tx_hash, verbose=True)
+        tx_info = get_tx_info(tx_dict['hex'], block_index)
+    source, destination, btc_amount, fee, data = tx_info
 
     # For mempool
     if block_hash == None:
@@ -689,7 +1048,38 @@ def list_tx (db, block_hash, block_index, block_time, tx_hash, tx_index):
 
     return tx_index
 
-def kickstart(db, bitcoind_dir):
+def decode_blocks(task):
+    """Read a chunk of blocks straight from the block files, and keep only the
+    transactions which might be Counterparty transactions. (Runs in worker
+    processes, without the block index.)
+    """
+    blocks_dir, locations = task
+    block_parser = BlockchainParser(blocks_dir, max_open_files=config.KICKSTART_MAX_OPEN_FILES)
+    decoded_blocks = []
+    for location in locations:
+        block = block_parser.read_compact_block_at(location['file_num'], location['block_pos_in_file'], location['block_index'])
+        assert block['block_hash'] == location['block_hash']
+        candidates, outputs = [], []
+        for ctx in block['transactions']:
+            if is_candidate_tx(ctx, block['block_index']):
+                candidates.append((ctx.tx_hash, bytes(ctx.data)))
+            # Only checksig and multi‐sig outputs can be sources.
+            tx_hash_bin = ctx.GetHash()
+            for n, vout in enumerate(ctx.vout):
+                if vout.scriptPubKey[-1:] in (b'\xac', b'\xae'):
+                    outputs.append((tx_hash_bin, n, vout.nValue, bytes(vout.scriptPubKey)))
+        decoded_blocks.append({
+            'block_index': block['block_index'],
+            'block_hash': block['block_hash'],
+            'block_time': block['block_time'],
+            'transaction_count': block['transaction_count'],
+            'candidates': candidates,
+            'outputs': outputs
+        })
+    block_parser.close()
+    return decoded_blocks
+
+def kickstart(db, bitcoind_dir, jobs=1):
     if bitcoind_dir is None:
         if platform.system() == 'Darwin':
             bitcoind_dir = os.path.expanduser('~/Library/Application Support/Bitcoin/')
@@ -717,77 +1107,90 @@ def kickstart(db, bitcoind_dir):
     last_hash = chain_parser.get_last_block_hash()
     chain_parser.close()
 
-    # Start block parser.
-    block_parser = BlockchainParser(os.path.join(bitcoind_dir, 'blocks'), os.path.join(bitcoind_dir, 'blocks/index'));
-
+    # Start block parser, with a fresh index of outputs.
+    block_parser = BlockchainParser(os.path.join(bitcoind_dir, 'blocks'), os.path.join(bitcoind_dir, 'blocks/index'), max_open_files=config.KICKSTART_MAX_OPEN_FILES)
+    outputs_index_path = '{}.outputs'.format(config.DATABASE)
+    if os.path.exists(outputs_index_path):
+        os.remove(outputs_index_path)
+    block_parser.outputs_index = OutputsIndex(outputs_index_path)
+
+    # Locate every block, moving backwards in time through the block index.
+    logging.info('Locating blocks…')
+    start_time = time.time()
+    locations = []
     current_hash = last_hash
+    while current_hash != None:
+        location = block_parser.read_block_index(current_hash)
+        location['block_hash'] = current_hash
+        locations.append(location)
+        current_hash = location['hash_prev'] if current_hash != first_hash else None
+    locations.reverse()
+    logging.info('Located {} blocks in {:.3f}s'.format(len(locations), time.time() - start_time))
+
+    # Decode blocks in parallel, in contiguous chunks; results come back in chain order.
+    chunks = [locations[i:i + config.KICKSTART_CHUNK_SIZE] for i in range(0, len(locations), config.KICKSTART_CHUNK_SIZE)]
+    tasks = [(os.path.join(bitcoind_dir, 'blocks'), chunk) for chunk in chunks]
+    if jobs > 1:
+        pool = get_worker_pool(jobs)
+        decoded_chunks = imap_bounded(pool, decode_blocks, tasks, config.KICKSTART_MAX_PENDING_CHUNKS_PER_JOB * jobs)
+    else:
+        pool = None
+        decoded_chunks = map(decode_blocks, tasks)
+
     tx_index = 0
     with db:
 
         # Prepare SQLite database. # TODO: Be more specific!
         logging.info('Preparing database…')
         start_time = time.time()
-        first_block = block_parser.read_raw_block(first_hash)
         reinitialise(db, block_index=config.BLOCK_FIRST - 1)
         logging.info('Prepared database in {:.3f}s'.format(time.time() - start_time))
 
-        # Get blocks and transactions, moving backwards in time.
-        while current_hash != None:
-            start_time = time.time()
-            transactions = []
-
-            # Get `tx_info`s for transactions in this block.
-            block = block_parser.read_raw_block(current_hash)
-            for tx in block['transactions']:
-                source, destination, btc_amount, fee, data  = get_tx_info(tx['__data__'], block['block_index'], block_parser)
-                if source and (data or destination == config.UNSPENDABLE):
-                    transactions.append((
-                        tx['tx_hash'], block['block_index'], block['block_hash'], block['block_time'],
-                        source, destination, btc_amount, fee, data
-                    ))
-                    logging.info('Valid transaction: {}'.format(tx['tx_hash']))
-
-            # Insert block and transactions into database.
-            cursor.execute('''INSERT INTO blocks(
-                                    block_index,
-                                    block_hash,
-                                    block_time) VALUES(?,?,?)''',
-                                    (block['block_index'],
-                                    block['block_hash'],
-                                    block['block_time']))
-            if len(transactions):
-                transactions = list(reversed(transactions))
-                tx_chunks = [transactions[i:i+90] for i in range(0,len(transactions),90)]
-                for tx_chunk in tx_chunks:
-                    sql = '''INSERT INTO transactions
-                                (tx_index, tx_hash, block_index, block_hash, block_time, source, destination, btc_amount, fee, data) 
-                             VALUES '''
-                    bindings = ()
-                    bindings_place = []
-                    # negative tx_index from -1 and inverse order for fast reordering   # TODO: Can this be clearer?
-                    for tx in tx_chunk:
-                        bindings += (-(tx_index + 1),) + tx
-                        bindings_place.append('''(?,?,?,?,?,?,?,?,?,?)''')
+        # Get blocks and transactions, moving forwards in time.
+        for decoded_chunk in decoded_chunks:
+            for block in decoded_chunk:
+                start_time = time.time()
+                transactions = []
+
+                # Index outputs first: they may be spent within the same block.
+                block_parser.outputs_index.add(block['outputs'])
+
+                # Get `tx_info`s for the candidate transactions in this block.
+                for tx_hash, tx_data in block['candidates']:
+                    ctx = CompactTransaction.from_bytes(tx_data)
+                    source, destination, btc_amount, fee, data  = get_tx_info(ctx, block['block_index'], block_parser)
+                    if source and (data or destination == config.UNSPENDABLE):
+                        transactions.append((
+                            tx_index, tx_hash, block['block_index'], block['block_hash'], block['block_time'],
+                            source, destination, btc_amount, fee, data
+                        ))
                         tx_index += 1
-                    sql += ', '.join(bindings_place)
-                    cursor.execute(sql, bindings)
-
-            logging.info('Block {} ({}): {}/{} saved in {:.3f}s'.format(
-                          block['block_index'], block['block_hash'],
-                          len(transactions), len(block['transactions']),
-                          time.time() - start_time))
-
-            # Get hash of next block.
-            current_hash = block['hash_prev'] if current_hash != first_hash else None
+                        logging.info('Valid transaction: {}'.format(tx_hash))
 
+                # Insert block and transactions into database.
+                cursor.execute('''INSERT INTO blocks(
+                                        block_index,
+                                        block_hash,
+                                        block_time) VALUES(?,?,?)''',
+                                        (block['block_index'],
+                                        block['block_hash'],
+                                        block['block_time']))
+                if len(transactions):
+                    cursor.executemany('''INSERT INTO transactions
+                                            (tx_index, tx_hash, block_index, block_hash, block_time, source, destination, btc_amount, fee, data)
+                                          VALUES (?,?,?,?,?,?,?,?,?,?)''', transactions)
+
+                logging.info('Block {} ({}): {}/{} saved in {:.3f}s'.format(
+                              block['block_index'], block['block_hash'],
+                              len(transactions), block['transaction_count'],
+                              time.time() - start_time))
+
+        if pool:
+            pool.close()
+            pool.join()
+        block_parser.outputs_index.close(remove=True)
         block_parser.close()
-        
-        # Reorder all transactions in database.
-        logging.info('Reordering transactions…')
-        start_time = time.time()
-        cursor.execute('''UPDATE transactions SET tx_index = tx_index + ?''', (tx_index,))
-        logging.info('Reordered transactions in {:.3f}s.'.format(time.time() - start_time))
-        
+
         # Parse all transactions in database.
         reparse(db)
 
@@ -805,7 +1208,245 @@ def get_next_tx_index(db):
     cursor.close()
     return tx_index
 
+class BlockFetcher(threading.Thread):
+    """Fetch and decode upcoming blocks in the background, while the current
+    block is being parsed. Blocks are queued strictly in order of block index,
+    so parsing stays deterministic.
+
+    The fetcher is the only one to poll the backend for its block count. Once
+    caught up, it queues None (if nothing else is queued) each time it has
+    looked, so that `follow()` can update the mempool meanwhile.
+    """
+    def __init__(self, block_index, queue_size=None):
+        self.block_index = block_index
+        self.block_count = None
+        if queue_size is None:
+            queue_size = config.BACKEND_PREFETCH_QUEUE_SIZE
+        self.queue = queue.Queue(maxsize=queue_size)
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def put(self, item):
+        # Don’t block forever on a full queue once stopped.
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, block_index):
+        """Return block `block_index`, or None if the backend doesn’t have it yet."""
+        while True:
+            try:
+                block = self.queue.get(timeout=1)
+                break
+            except queue.Empty:
+                # Died without saying why.
+                if not self.is_alive() and self.queue.empty():
+                    raise backend.BitcoindError('Block fetcher stopped.')
+        if isinstance(block, Exception):
+            raise block
+        assert block is None or block['block_index'] == block_index
+        return block
+
+    def fetch(self, proxy, block_index):
+        block_hash_bin = proxy.getblockhash(block_index)
+        block = proxy.getblock(block_hash_bin)
+
+        # The raw transactions come with the block; get the transactions
+        # spent by (possible) Counterparty transactions in batches.
+        if util.enabled('multisig_addresses', block_index):   # Protocol change.
+            candidates = [ctx for ctx in block.vtx if not ctx.is_coinbase() and is_candidate_tx2(ctx)]
+        else:
+            candidates = block.vtx
+        backend.get_cached_raw_transactions(backend.get_input_txhash_list(candidates))
+
+        transactions = []
+        for ctx in block.vtx:
+            tx_hash = bitcoinlib.core.b2lx(ctx.GetHash())
+            transactions.append((tx_hash, get_tx_info(ctx, block_index)))
+        return {
+            'block_index': block_index,
+            'block_hash': bitcoinlib.core.b2lx(block_hash_bin),
+            'previous_block_hash': bitcoinlib.core.b2lx(block.hashPrevBlock),
+            'block_time': block.nTime,
+            'difficulty': block.difficulty,
+            'transactions': transactions
+        }
+
+    def run(self):
+        proxy = backend.get_proxy()
+        while not self.stop_event.is_set():
+            try:
+                # Wait for the backend to have the next block.
+                if self.block_count is None or self.block_index > self.block_count:
+                    notifications = notify.BACKEND.count
+                    self.block_count = proxy.getblockcount()
+                    if self.block_index > self.block_count:
+                        if self.queue.empty() and not self.put(None):
+                            return
+                        notify.BACKEND.wait(notifications, config.BACKEND_POLL_INTERVAL)
+                        continue
+                block = self.fetch(proxy, self.block_index)
+            except Exception as e:
+                # Let `follow()` handle the error.
+                self.put(e)
+                return
+            if not self.put(block):
+                return
+            self.block_index += 1
+
 class MempoolError (exceptions.TransactionError): pass
+
+class Mempool(object):
+    """The Counterparty transactions in the backend’s mempool, each parsed on
+    top of the ledger, and their messages, saved in the table `mempool`.
+
+    Each poll only parses the transactions that are new, and removes those
+    that have left the mempool (mined or evicted).
+    """
+    def __init__(self):
+        self.initialised = False
+        self.messages = {}  # Messages of the parsed transactions, by transaction hash.
+        self.not_supported = {}   # No false positives. Use a dict to allow for O(1) lookups
+        self.not_supported_sorted = collections.deque()
+        # ^ Entries in form of (block_index, tx_hash), oldest first. Allows for easy removal of past, unncessary entries
+
+    def skip(self, tx_hash, block_index):
+        self.not_supported[tx_hash] = ''
+        self.not_supported_sorted.append((block_index, tx_hash))
+
+    def forget_not_supported(self, block_index):
+        """Remove any non‐supported transactions older than ten blocks."""
+        while len(self.not_supported_sorted) and self.not_supported_sorted[0][0] <= block_index - 10:
+            (i, tx_h) = self.not_supported_sorted.popleft()
+            del self.not_supported[tx_h]
+
+    def get_tx_infos(self, tx_hashes, block_index):
+        """Fetch `tx_hashes`, and the transactions spent by the candidates
+        among them, in batches, and return `(tx_hash, tx_info)` for each
+        candidate.
+
+        The others are skipped from now on. Transactions that can’t be found
+        whole are left for the next poll: sometimes the backend doesn’t have
+        them (is txindex enabled?).
+        """
+        raw_transactions = backend.get_cached_raw_transactions(tx_hashes)
+        candidates = []
+        for tx_hash in tx_hashes:
+            if tx_hash not in raw_transactions:
+                continue
+            ctx = backend.deserialize(raw_transactions[tx_hash])
+            if is_candidate_tx(ctx, block_index):
+                candidates.append((tx_hash, ctx))
+            else:
+                self.skip(tx_hash, block_index)
+
+        inputs = backend.get_cached_raw_transactions(backend.get_input_txhash_list([ctx for tx_hash, ctx in candidates]))
+        tx_infos = []
+        for tx_hash, ctx in candidates:
+            if all(input_tx_hash in inputs for input_tx_hash in backend.get_input_txhash_list([ctx])):
+                tx_infos.append((tx_hash, get_tx_info(ctx, block_index)))
+        return tx_infos
+
+    def update(self, db, proxy, block_index, tx_index):
+        """Parse the new transactions in the mempool, forget those that have
+        left it, and return the hashes of both."""
+        cursor = db.cursor()
+
+        # Transactions that have left the mempool (mined or evicted).
+        util.MEMPOOL = proxy.getrawmempool()
+        mempool_tx_hashes = [bitcoinlib.core.b2lx(tx_hash) for tx_hash in util.MEMPOOL]
+        current_tx_hashes = set(mempool_tx_hashes)
+        evicted_tx_hashes = [tx_hash for tx_hash in self.messages if tx_hash not in current_tx_hashes]
+
+        # If already parsed or skipped, skip it again. Talk to the backend
+        # before opening the transaction.
+        tx_infos = self.get_tx_infos([tx_hash for tx_hash in mempool_tx_hashes
+                                      if tx_hash not in self.messages and tx_hash not in self.not_supported], block_index)
+
+        # Fake values for fake block.
+        curr_time = int(time.time())
+        mempool_tx_index = tx_index
+
+        # Parse each new transaction on top of a fake block, capture the
+        # generated messages, and then save those messages.
+        # Every transaction is parsed independently, in its own savepoint,
+        # which is rolled back after it. The fake block is listed once, in the
+        # enclosing transaction, which is rolled back at the end.
+        new_tx_hashes = []
+        try:
+            with db:
+                # List the fake block.
+                cursor.execute('''INSERT INTO blocks(
+                                    block_index,
+                                    block_hash,
+                                    block_time) VALUES(?,?,?)''',
+                                    (config.MEMPOOL_BLOCK_INDEX,
+                                     config.MEMPOOL_BLOCK_HASH,
+                                     curr_time)
+                              )
+
+                for tx_hash, tx_info in tx_infos:
+                    try:
+                        with db:    # Nested, i.e. a savepoint.
+                            # List transaction.
+                            mempool_tx_index = list_tx(db, None, block_index, curr_time, tx_hash, mempool_tx_index, tx_info=tx_info)
+
+                            # Parse transaction.
+                            cursor.execute('''SELECT * FROM transactions \
+                                              WHERE tx_hash = ?''',
+                                           (tx_hash,))
+                            transactions = list(cursor)
+                            if transactions:
+                                assert len(transactions) == 1
+                                transaction = transactions[0]
+                                supported = parse_tx(db, transaction)
+                                if not supported:
+                                    self.skip(tx_hash, block_index)
+                            else:
+                                # If a transaction hasn’t been added to the
+                                # table `transactions`, then it’s not a
+                                # Counterparty transaction.
+                                self.skip(tx_hash, block_index)
+                                raise MempoolError
+
+                            # Save transaction and side‐effects in memory.
+                            cursor.execute('''SELECT * FROM messages WHERE block_index = ?''', (config.MEMPOOL_BLOCK_INDEX,))
+                            self.messages[tx_hash] = list(cursor)
+                            new_tx_hashes.append(tx_hash)
+
+                            # Roll back to the savepoint.
+                            raise MempoolError
+                    except MempoolError:
+                        pass
+
+                # Rollback.
+                raise MempoolError
+        except MempoolError:
+            pass
+
+        # Apply the changes to the mempool messages in the database.
+        with db:
+            if not self.initialised:
+                cursor.execute('''DELETE FROM mempool''')
+            for tx_hash in evicted_tx_hashes:
+                cursor.execute('''DELETE FROM mempool WHERE tx_hash = ?''', (tx_hash,))
+                del self.messages[tx_hash]
+            for tx_hash in new_tx_hashes:
+                for message in self.messages[tx_hash]:
+                    message['tx_hash'] = tx_hash
+                    cursor.execute('''INSERT INTO mempool VALUES(:tx_hash, :command, :category, :bindings, :timestamp)''', (message))
+        self.initialised = True
+        cursor.close()
+        return new_tx_hashes, evicted_tx_hashes
+
 def follow (db):
     cursor = db.cursor()
 
@@ -828,68 +1469,82 @@ def follow (db):
         logging.warning('Status: New database.')
         block_index = config.BLOCK_FIRST
 
+    # Record how to undo parsing, for reorganisations.
+    undolog.initialise(db, TABLES + ['balances'])
+
     # Get index of last transaction.
     tx_index = get_next_tx_index(db)
 
-    not_supported = {}   # No false positives. Use a dict to allow for O(1) lookups
-    not_supported_sorted = collections.deque()
-    # ^ Entries in form of (block_index, tx_hash), oldest first. Allows for easy removal of past, unncessary entries
-    mempool_initialised = False
+    mempool = Mempool()
+    fetcher = None
+    reorganised_at = None
     # a reorg can happen without the block count increasing, or even for that
         # matter, with the block count decreasing. This should only delay
         # processing of the new blocks a bit.
     while True:
         starttime = time.time()
-        # Get new blocks.
-        block_count = proxy.getblockcount()
-        if block_index <= block_count:
-
-            # Backwards check for incorrect blocks due to chain reorganisation, and stop when a common parent is found.
-            c = block_index
-            requires_rollback = False
-            while True:
-                if c == config.BLOCK_FIRST: break
-
-                logging.debug('Status: Checking that block {} is not an orphan.'.format(c))
-
-                # Backend parent hash.
-                c_hash_bin = proxy.getblockhash(c)
-                backend_parent = backend.get_prevhash(c_hash_bin)
-
-                # DB parent hash.
-                blocks = list(cursor.execute('''SELECT * FROM blocks
-                                                WHERE block_index = ?''', (c - 1,)))
-                if len(blocks) != 1: break  # For empty DB.
-                db_parent = blocks[0]['block_hash']
-
-                # Compare.
-                assert type(db_parent) == str
-                assert type(backend_parent) == str
-                if db_parent == backend_parent:
-                    break
-                else:
-                    c -= 1
-                    requires_rollback = True
-
-            # Rollback for reorganisation.
-            if requires_rollback:
-                # Record reorganisation.
-                logging.warning('Status: Blockchain reorganisation at block {}.'.format(c))
-                util.message(db, block_index, 'reorg', None, {'block_index': c})
-
-                # Rollback the DB.
-                reparse(db, block_index=c-1, quiet=True)
-                block_index = c
-                tx_index = get_next_tx_index(db)
+
+        # Get new blocks, fetched in the background (which paces this loop).
+        if not fetcher:
+            fetcher = BlockFetcher(block_index)
+            fetcher.start()
+        fetched_block = fetcher.get(block_index)
+        if fetched_block:
+
+            # If the fetched block doesn’t build on the last parsed one, then
+            # the blockchain has been reorganised.
+            blocks = list(cursor.execute('''SELECT * FROM blocks
+                                            WHERE block_index = ?''', (block_index - 1,)))
+            if block_index != config.BLOCK_FIRST and blocks and blocks[0]['block_hash'] != fetched_block['previous_block_hash']:
+                # Prefetched blocks are stale.
+                fetcher.stop()
+                fetcher = None
+
+                # Backwards check for incorrect blocks due to chain reorganisation, and stop when a common parent is found.
+                c = block_index
+                requires_rollback = False
+                while True:
+                    if c == config.BLOCK_FIRST: break
+
+                    logging.debug('Status: Checking that block {} is not an orphan.'.format(c))
+
+                    # Backend parent hash.
+                    c_hash_bin = proxy.getblockhash(c)
+                    backend_parent = backend.get_prevhash(c_hash_bin)
+
+                    # DB parent hash.
+                    blocks = list(cursor.execute('''SELECT * FROM blocks
+                                                    WHERE block_index = ?''', (c - 1,)))
+                    if len(blocks) != 1: break  # For empty DB.
+                    db_parent = blocks[0]['block_hash']
+
+                    # Compare.
+                    assert type(db_parent) == str
+                    assert type(backend_parent) == str
+                    if db_parent == backend_parent:
+                        break
+                    else:
+                        c -= 1
+                        requires_rollback = True
+
+                # Rollback for reorganisation.
+                if requires_rollback:
+                    # Record reorganisation.
+                    logging.warning('Status: Blockchain reorganisation at block {}.'.format(c))
+
+                    # Rollback the DB.
+                    rollback(db, block_index=c-1)
+                    block_index = c
+                    tx_index = get_next_tx_index(db)
+                    reorganised_at = c
+
+                # Refetch from the (new) current block.
                 continue
 
-            # Get and parse transactions in this block (atomically).
-            block_hash_bin = proxy.getblockhash(c)
-            block = proxy.getblock(block_hash_bin)
-            block_hash = bitcoinlib.core.b2lx(block_hash_bin)
-            previous_block_hash = bitcoinlib.core.b2lx(block.hashPrevBlock)
-            block_time = block.nTime
-            txhash_list = backend.get_txhash_list(block)
+            # Parse transactions in this block (atomically).
+            block_hash = fetched_block['block_hash']
+            previous_block_hash = fetched_block['previous_block_hash']
+            block_time = fetched_block['block_time']
             with db:
                 # List the block.
                 cursor.execute('''INSERT INTO blocks(
@@ -902,124 +1557,55 @@ def follow (db):
                                     block_hash,
                                     block_time,
                                     previous_block_hash,
-                                    block.difficulty)
+                                    fetched_block['difficulty'])
                               )
 
+                # Record the reorganisation as the first message of the new
+                # branch, so that the undo log tags it with this block.
+                if reorganised_at == block_index:
+                    util.message(db, block_index, 'reorg', None, {'block_index': block_index})
+
                 # List the transactions in the block.
-                for tx_hash in txhash_list:
-                    tx_index = list_tx(db, block_hash, block_index, block_time, tx_hash, tx_index)
+                for tx_hash, tx_info in fetched_block['transactions']:
+                    tx_index = list_tx(db, block_hash, block_index, block_time, tx_hash, tx_index, tx_info=tx_info)
 
                 # Parse the transactions in the block.
                 parse_block(db, block_index, block_time)
 
+                # Forget how to undo old blocks.
+                undolog.prune(db, block_index)
+
+                commit_start_time = time.time()
+            reorganised_at = None
+            logging.debug('Status: Block {} committed in {:.3f}s.'.format(block_index, time.time() - commit_start_time))
+
+            # Snapshot the ledger, now and then, and at checkpoints, once caught up.
+            checkpoints = check.CHECKPOINTS_TESTNET if config.TESTNET else check.CHECKPOINTS_MAINNET
+            if block_index == fetcher.block_count and (block_index % config.SNAPSHOT_INTERVAL == 0 or block_index in checkpoints):
+                snapshot.create(db, block_index, SNAPSHOT_TABLES)
+
             # When newly caught up, check for conservation of assets.
-            if block_index == block_count:
+            if block_index == fetcher.block_count:
                 check.asset_conservation(db)
 
-            # Remove any non‐supported transactions older than ten blocks.
-            while len(not_supported_sorted) and not_supported_sorted[0][0] <= block_index - 10:
-                (i, tx_h) = not_supported_sorted.popleft()
-                del not_supported[tx_h]
+            mempool.forget_not_supported(block_index)
 
+            notify.LEDGER.notify()
             logging.info('Block: %s (%ss)'%(str(block_index), "{:.2f}".format(time.time() - starttime, 3)))
             # Increment block index.
-            block_count = proxy.getblockcount()
             block_index +=1
 
         else:
             # First mempool fill for session?
-            if mempool_initialised:
+            if mempool.initialised:
                 logging.debug('Status: Updating mempool.')
             else:
                 logging.debug('Status: Initialising mempool.')
-
-            # Get old counterpartyd mempool.
-            old_mempool = list(cursor.execute('''SELECT * FROM mempool'''))
-            old_mempool_hashes = [message['tx_hash'] for message in old_mempool]
-
-            # Fake values for fake block.
-            curr_time = int(time.time())
-            mempool_tx_index = tx_index
-
-            # For each transaction in Bitcoin Core mempool, if it’s new, create
-            # a fake block, a fake transaction, capture the generated messages,
-            # and then save those messages.
-            # Every transaction in mempool is parsed independently. (DB is rolled back after each one.)
-            mempool = []
-            util.MEMPOOL = proxy.getrawmempool()
-            for tx_hash in util.MEMPOOL:
-                tx_hash = bitcoinlib.core.b2lx(tx_hash)
-
-                # If already in counterpartyd mempool, copy to new one.
-                if tx_hash in old_mempool_hashes:
-                    for message in old_mempool:
-                        if message['tx_hash'] == tx_hash:
-                            mempool.append((tx_hash, message))
-
-                # If already skipped, skip it again.
-                elif tx_hash not in not_supported:
-
-                    # Else: list, parse and save it.
-                    try:
-                        with db:
-                            # List the fake block.
-                            cursor.execute('''INSERT INTO blocks(
-                                                block_index,
-                                                block_hash,
-                                                block_time) VALUES(?,?,?)''',
-                                                (config.MEMPOOL_BLOCK_INDEX,
-                                                 config.MEMPOOL_BLOCK_HASH,
-                                                 curr_time)
-                                          )
-
-                            # List transaction.
-                            try:    # Sometimes the transactions can’t be found: `{'code': -5, 'message': 'No information available about transaction'} Is txindex enabled in Bitcoind?`
-                                mempool_tx_index = list_tx(db, None, block_index, curr_time, tx_hash, mempool_tx_index)
-                            except backend.BitcoindError:
-                                raise MempoolError
-
-                            # Parse transaction.
-                            cursor.execute('''SELECT * FROM transactions \
-                                              WHERE tx_hash = ?''',
-                                           (tx_hash,))
-                            transactions = list(cursor)
-                            if transactions:
-                                assert len(transactions) == 1
-                                transaction = transactions[0]
-                                supported = parse_tx(db, transaction)
-                                if not supported:
-                                    not_supported[tx_hash] = ''
-                                    not_supported_sorted.append((block_index, tx_hash))
-                            else:
-                                # If a transaction hasn’t been added to the
-                                # table `transactions`, then it’s not a
-                                # Counterparty transaction.
-                                not_supported[tx_hash] = ''
-                                not_supported_sorted.append((block_index, tx_hash))
-                                raise MempoolError
-
-                            # Save transaction and side‐effects in memory.
-                            cursor.execute('''SELECT * FROM messages WHERE block_index = ?''', (config.MEMPOOL_BLOCK_INDEX,))
-                            for message in list(cursor):
-                                mempool.append((tx_hash, message))
-
-                            # Rollback.
-                            raise MempoolError
-                    except MempoolError:
-                        pass
-
-            # Re‐write mempool messages to database.
-            with db:
-                cursor.execute('''DELETE FROM mempool''')
-                for message in mempool:
-                    tx_hash, new_message = message
-                    new_message['tx_hash'] = tx_hash
-                    cursor.execute('''INSERT INTO mempool VALUES(:tx_hash, :command, :category, :bindings, :timestamp)''', (new_message))
-
-            # Wait
-            mempool_initialised = True
+            new_tx_hashes, evicted_tx_hashes = mempool.update(db, proxy, block_index, tx_index)
+            if new_tx_hashes or evicted_tx_hashes:
+                notify.LEDGER.notify()
+            logging.debug('Status: Mempool: {} new and {} evicted transactions.'.format(len(new_tx_hashes), len(evicted_tx_hashes)))
             db.wal_checkpoint(mode=apsw.SQLITE_CHECKPOINT_PASSIVE)
-            time.sleep(config.BACKEND_POLL_INTERVAL)
 
     cursor.close()
 
@@ -1,11 +1,15 @@
 import json
+import time
 import requests
 import logging
 import warnings
+import hashlib
+import binascii
 
 import bitcoin as bitcoinlib
 
-from lib import (config, util, exceptions, backend)
+from lib import (config, util, exceptions)
+from lib import backend as backend_module  # `backend()` is a check.
 
 CONSENSUS_HASH_SEED = 'We can only see a short distance ahead, but we can see plenty there that needs to be done.'
 
@@ -29,7 +33,7 @@ CHECKPOINTS_TESTNET = {
 
 
 class ConsensusError (Exception): pass
-def consensus_hash (db, block_index, field, previous_consensus_hash, content):
+def get_previous_consensus_hash (db, block_index, field, previous_consensus_hash):
     cursor = db.cursor()
 
     # Initialise previous hash on first block.
@@ -43,9 +47,11 @@ def consensus_hash (db, block_index, field, previous_consensus_hash, content):
         if not previous_consensus_hash:
             raise ConsensusError('Empty previous {} for block {}. Please launch a `reparse`.'.format(field, block_index))
 
-    # Calculate current hash.
-    version = CONSENSUS_HASH_VERSION_TESTNET if config.TESTNET else CONSENSUS_HASH_VERSION_MAINNET
-    calculated_hash = util.dhash_string(previous_consensus_hash + '{}{}'.format(version, ''.join(content)))
+    cursor.close()
+    return previous_consensus_hash
+
+def check_consensus_hash (db, block_index, field, calculated_hash):
+    cursor = db.cursor()
 
     # Verify hash (if already in database) or save hash (if not).
     found_hash = list(cursor.execute('''SELECT * FROM blocks WHERE block_index = ?''', (block_index,)))[0][field]
@@ -62,8 +68,43 @@ def consensus_hash (db, block_index, field, previous_consensus_hash, content):
     if block_index in checkpoints and checkpoints[block_index][field] != calculated_hash:
         raise ConsensusError('Incorrect {} for block {}.'.format(field, block_index))
 
+    cursor.close()
     return calculated_hash
 
+class ConsensusHasher(object):
+    """Hash the content of a block as it is produced, instead of joining it all
+    at the end. The digest is the same as that of `consensus_hash`.
+    """
+    def __init__(self, db, block_index, field, previous_consensus_hash=None):
+        self.db = db
+        self.block_index = block_index
+        self.field = field
+        previous_consensus_hash = get_previous_consensus_hash(db, block_index, field, previous_consensus_hash)
+        version = CONSENSUS_HASH_VERSION_TESTNET if config.TESTNET else CONSENSUS_HASH_VERSION_MAINNET
+        self.hasher = hashlib.sha256(bytes(previous_consensus_hash + '{}'.format(version), 'utf-8'))
+        self.entries = 0    # Metrics
+        self.size = 0
+
+    def update(self, string):
+        data = bytes(string, 'utf-8')
+        self.hasher.update(data)
+        self.entries += 1
+        self.size += len(data)
+
+    def finish(self):
+        """Verify or save the hash, and return it."""
+        calculated_hash = binascii.hexlify(hashlib.sha256(self.hasher.digest()).digest()).decode()
+        return check_consensus_hash(self.db, self.block_index, self.field, calculated_hash)
+
+def consensus_hash (db, block_index, field, previous_consensus_hash, content):
+    hasher = ConsensusHasher(db, block_index, field, previous_consensus_hash)
+    for string in content:
+        hasher.update(string)
+    return hasher.finish()
+
+# Size of the consensus content of the last block parsed.
+LAST_BLOCK_METRICS = {}
+
 class SanityError (Exception): pass
 def asset_conservation (db):
     logging.debug('Status: Checking for conservation of assets.')
@@ -77,7 +118,7 @@ def asset_conservation (db):
 
 class VersionError (Exception): pass
 class VersionUpdateRequiredError (VersionError): pass
-def check_change(protocol_change):
+def check_change(protocol_change, change_name, block_index):
 
     # Check client version.
     passed = True
@@ -111,25 +152,25 @@ def version (block_index):
     # once these changes are pushed to `master`.
     if 'minimum_version_major' in versions.keys():
         protocol_change = versions
-        check_change(protocol_change)
+        check_change(protocol_change, 'protocol_change', block_index)
     else:
         for change_name in versions:
             protocol_change = versions[change_name]
-            check_change(protocol_change)
+            check_change(protocol_change, change_name, block_index)
 
     logging.debug('Status: Version check passed.')
     return
 
 def backend (db):
     """Checks blocktime of last block to see if {} Core is running behind.""".format(config.BTC_NAME)
-    proxy = backend.get_proxy()
+    proxy = backend_module.get_proxy()
     block_count = proxy.getblockcount()
     block_hash_bin = proxy.getblockhash(block_count)
     block = proxy.getblock(block_hash_bin)
     block_hash = bitcoinlib.core.b2lx(block_hash_bin)
-    time_behind = time.time() - block['time']   # TODO: Block times are not very reliable.
+    time_behind = time.time() - block.nTime   # TODO: Block times are not very reliable.
     if time_behind > 60 * 60 * 2:   # Two hours.
-        raise backend.BitcoindError('Bitcoind is running about {} seconds behind.'.format(round(time_behind)))
+        raise backend_module.BitcoindError('Bitcoind is running about {} seconds behind.'.format(round(time_behind)))
 
 def database (db, blockcount):
     """Checks {} database to see if the {} server has caught up with Bitcoind.""".format(config.XCP_NAME, config.XCP_CLIENT)
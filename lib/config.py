@@ -26,10 +26,27 @@ MEMPOOL_BLOCK_INDEX = 9999999
 
 # SQLite3
 MAX_INT = 2**63 - 1
+UNDOLOG_MAX_PAST_BLOCKS = 100     # Blocks that can be rolled back without a reparse.
+SNAPSHOT_INTERVAL = 1000          # Blocks between ledger snapshots.
+SNAPSHOTS_KEPT = 3
+
+# Performance profile of the parser’s connection.
+DATABASE_PAGE_SIZE = 4096           # Bytes. Only applies to new databases.
+DATABASE_CACHE_SIZE = -256 * 1024   # KiB, when negative.
+DATABASE_MMAP_SIZE = 2**30          # Bytes.
+DATABASE_TEMP_STORE = 'MEMORY'
+DATABASE_SYNCHRONOUS = 'NORMAL'     # Safe with WAL: commits don’t wait for the disk, checkpoints do.
+INTEGRITY_CHECK_INTERVAL = 24 * 3600    # Seconds between integrity checks by the server.
 
 
 # Bitcoin Core
 OP_RETURN_MAX_SIZE = 40 # bytes
+BACKEND_PREFETCH_QUEUE_SIZE = 10    # Number of upcoming blocks fetched ahead of the parser.
+BACKEND_RPC_BATCH_SIZE = 1000       # Maximum number of calls per batched JSON-RPC request.
+BACKEND_RAW_TRANSACTIONS_CACHE_SIZE = 20000
+KICKSTART_CHUNK_SIZE = 100          # Blocks decoded per task by kickstart workers.
+KICKSTART_MAX_PENDING_CHUNKS_PER_JOB = 2  # Decoded chunks waiting to be saved, at most.
+KICKSTART_MAX_OPEN_FILES = 16       # Block files kept mapped at once, per process.
 
 
 # Currency agnosticism
@@ -44,6 +61,9 @@ XCP_CLIENT = 'counterpartyd'
 DEFAULT_RPC_PORT_TESTNET = 14000
 DEFAULT_RPC_PORT = 4000
 
+DEFAULT_NOTIFY_PORT_TESTNET = 14010
+DEFAULT_NOTIFY_PORT = 4010
+
 DEFAULT_BACKEND_RPC_PORT_TESTNET = 18332
 DEFAULT_BACKEND_RPC_PORT = 8332
 
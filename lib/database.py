@@ -1,6 +1,8 @@
 import apsw
 import logging
 import time
+import queue
+import contextlib
 
 
 from lib import config, util, exceptions
@@ -12,43 +14,37 @@ def rowtracer(cursor, sql):
         dictionary[name] = sql[index]
     return dictionary
 
-def exectracer(cursor, sql, bindings):
-    # This means that all changes to database must use a very simple syntax.
-        # TODO: Need sanity checks here.
-    sql = sql.lower()
-
-    # Parse SQL.
-    array = sql.split('(')[0].split(' ')
-    command = array[0]
-    if 'insert' in sql:
-        category = array[2]
-    elif 'update' in sql:
-        category = array[1]
-    else:
-        return True
-
-    db = cursor.getconnection()
-    dictionary = {'command': command, 'category': category, 'bindings': bindings}
-
-    # Skip blocks, transactions.
-    if 'blocks' in sql or 'transactions' in sql: return True
-
-    # Record alteration in database.
-    if category not in ('balances', 'messages', 'mempool', 'assets'):
-        if category not in ('suicides', 'postqueue'):  # These tables are ephemeral.
-            if category not in ('nonces', 'storage'):  # List message manually.
-                if not (command in ('update') and category in ('orders', 'bets', 'rps', 'order_matches', 'bet_matches', 'rps_matches', 'contracts')):    # List message manually.
-                    # try:
-                        util.message(db, bindings['block_index'], command, category, bindings)
-                    # except:
-                        # raise TypeError('SQLite3 statements must used named arguments.')
-
-    return True
-
 class DatabaseIntegrityError(exceptions.DatabaseError):
     pass
-def get_connection(read_only=True, foreign_keys=True, integrity_check=True):
-    """Connects to the SQLite database, returning a db `Connection` object"""
+def check_integrity(db):
+    """Run `PRAGMA integrity_check`, which takes minutes on a large database."""
+    cursor = db.cursor()
+    start_time = time.time()
+    integral = False
+    for i in range(10): # DUPE
+        try:
+            logging.debug('Status: Checking database integrity.')
+            cursor.execute('''PRAGMA integrity_check''')
+            rows = [list(row.values()) if isinstance(row, dict) else row for row in cursor.fetchall()]
+            if not (len(rows) == 1 and rows[0][0] == 'ok'):
+                raise exceptions.DatabaseError('Integrity check failed.')
+            integral = True
+            break
+        except DatabaseIntegrityError:
+            time.sleep(1)
+            continue
+    cursor.close()
+    if not integral:
+        raise exceptions.DatabaseError('Could not perform integrity check.')
+    logging.info('Status: Database integrity checked in {:.3f}s.'.format(time.time() - start_time))
+
+def get_connection(read_only=True, foreign_keys=True, integrity_check=False, tuned=False):
+    """Connects to the SQLite database, returning a db `Connection` object
+
+    `tuned` applies the performance profile in `config` to a connection that
+    writes (i.e. the parser’s). The integrity check is slow, and is run on
+    demand or periodically instead.
+    """
     logging.debug('Status: Creating connection to `{}`.'.format(config.DATABASE.split('/').pop()))
 
     if read_only:
@@ -57,6 +53,14 @@ def get_connection(read_only=True, foreign_keys=True, integrity_check=True):
         db = apsw.Connection(config.DATABASE)
     cursor = db.cursor()
 
+    # Performance profile.
+    if tuned and not read_only:
+        cursor.execute('''PRAGMA page_size = {}'''.format(int(config.DATABASE_PAGE_SIZE)))  # Only for new databases.
+        cursor.execute('''PRAGMA cache_size = {}'''.format(int(config.DATABASE_CACHE_SIZE)))
+        cursor.execute('''PRAGMA mmap_size = {}'''.format(int(config.DATABASE_MMAP_SIZE)))
+        cursor.execute('''PRAGMA temp_store = {}'''.format(config.DATABASE_TEMP_STORE))
+        cursor.execute('''PRAGMA synchronous = {}'''.format(config.DATABASE_SYNCHRONOUS))
+
     # For integrity, security.
     if foreign_keys and not read_only:
         cursor.execute('''PRAGMA foreign_keys = ON''')
@@ -72,27 +76,35 @@ def get_connection(read_only=True, foreign_keys=True, integrity_check=True):
     cursor.execute('''PRAGMA case_sensitive_like = ON''')
 
     if integrity_check:
-        # Integrity check
-        integral = False
-        for i in range(10): # DUPE
-            try:
-                logging.debug('Status: Checking database integrity.')
-                cursor.execute('''PRAGMA integrity_check''')
-                rows = cursor.fetchall()
-                if not (len(rows) == 1 and rows[0][0] == 'ok'):
-                    raise exceptions.DatabaseError('Integrity check failed.')
-                integral = True
-                break
-            except DatabaseIntegrityError:
-                time.sleep(1)
-                continue
-        if not integral:
-            raise exceptions.DatabaseError('Could not perform integrity check.')
+        check_integrity(db)
 
     db.setrowtrace(rowtracer)
-    db.setexectrace(exectracer)
 
     cursor.close()
     return db
 
+class ConnectionPool(object):
+    """A fixed number of read‐only connections, each checked out by one
+    request at a time.
+
+    In WAL mode readers don’t block the parser, nor each other.
+    """
+    def __init__(self, size):
+        self.connections = [get_connection(read_only=True) for i in range(size)]
+        self.idle = queue.Queue()
+        for db in self.connections:
+            self.idle.put(db)
+
+    @contextlib.contextmanager
+    def connection(self):
+        db = self.idle.get()
+        try:
+            yield db
+        finally:
+            self.idle.put(db)
+
+    def close(self):
+        for db in self.connections:
+            db.close()
+
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
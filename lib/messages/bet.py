@@ -67,6 +67,9 @@ def initialise (db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       status_idx ON bets (status)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      bets_source_idx ON bets (source)
+                   ''')
 
     # Bet Matches
     cursor.execute('''CREATE TABLE IF NOT EXISTS bet_matches(
@@ -115,6 +118,12 @@ def initialise (db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       status_idx ON bet_matches (status)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      bet_matches_tx0_address_idx ON bet_matches (tx0_address)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      bet_matches_tx1_address_idx ON bet_matches (tx1_address)
+                   ''')
 
     # Bet Expirations
     cursor.execute('''CREATE TABLE IF NOT EXISTS bet_expirations(
@@ -326,9 +335,7 @@ def parse (db, tx, message):
         fee_fraction = get_fee_fraction(db, feed_address)
 
         # Overbet
-        bet_parse_cursor.execute('''SELECT * FROM balances \
-                                    WHERE (address = ? AND asset = ?)''', (tx['source'], config.XCP))
-        balances = list(bet_parse_cursor)
+        balances = util.get_balance_rows(db, tx['source'], config.XCP)
         if not balances:
             wager_quantity = 0
         else:
@@ -367,6 +374,7 @@ def parse (db, tx, message):
     }
     sql='insert into bets values(:tx_index, :tx_hash, :block_index, :source, :feed_address, :bet_type, :deadline, :wager_quantity, :wager_remaining, :counterwager_quantity, :counterwager_remaining, :target_value, :leverage, :expiration, :expire_index, :fee_fraction_int, :status)'
     bet_parse_cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'bets', bindings)
 
     # Match.
     if status == 'open' and tx['block_index'] != config.MEMPOOL_BLOCK_INDEX:
@@ -537,6 +545,7 @@ def match (db, tx):
             }
             sql='insert into bet_matches values(:id, :tx0_index, :tx0_hash, :tx0_address, :tx1_index, :tx1_hash, :tx1_address, :tx0_bet_type, :tx1_bet_type, :feed_address, :initial_value, :deadline, :target_value, :leverage, :forward_quantity, :backward_quantity, :tx0_block_index, :tx1_block_index, :block_index, :tx0_expiration, :tx1_expiration, :match_expire_index, :fee_fraction_int, :status)'
             cursor.execute(sql, bindings)
+            util.message(db, bindings['block_index'], 'insert', 'bet_matches', bindings)
 
     cursor.close()
     return
@@ -559,6 +568,7 @@ def expire (db, block_index, block_time):
         }
         sql='insert into bet_expirations values(:bet_index, :bet_hash, :source, :block_index)'
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'bet_expirations', bindings)
 
     # Expire bet matches whose deadline is more than two weeks before the current block time.
     cursor.execute('''SELECT * FROM bet_matches \
@@ -575,6 +585,7 @@ def expire (db, block_index, block_time):
         }
         sql='insert into bet_match_expirations values(:bet_match_id, :tx0_address, :tx1_address, :block_index)'
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'bet_match_expirations', bindings)
 
     cursor.close()
 
@@ -158,6 +158,7 @@ def parse (db, tx, message):
     }
     sql='insert into broadcasts values(:tx_index, :tx_hash, :block_index, :source, :timestamp, :value, :fee_fraction_int, :text, :locked, :status)'
     cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'broadcasts', bindings)
 
     # Negative values (default to ignore).
     if value == None or value < 0:
@@ -256,6 +257,7 @@ def parse (db, tx, message):
                 }
                 sql='insert into bet_match_resolutions values(:bet_match_id, :bet_match_type_id, :block_index, :settled, :bull_credit, :bear_credit, :winner, :escrow_less_fee, :fee)'
                 cursor.execute(sql, bindings)
+                util.message(db, bindings['block_index'], 'insert', 'bet_match_resolutions', bindings)
 
             # Settle (if not liquidated).
             elif timestamp >= bet_match['deadline']:
@@ -281,6 +283,7 @@ def parse (db, tx, message):
                 }
                 sql='insert into bet_match_resolutions values(:bet_match_id, :bet_match_type_id, :block_index, :settled, :bull_credit, :bear_credit, :winner, :escrow_less_fee, :fee)'
                 cursor.execute(sql, bindings)
+                util.message(db, bindings['block_index'], 'insert', 'bet_match_resolutions', bindings)
 
         # Equal[/NotEqual] bet.
         elif bet_match_type_id == equal_type_id and timestamp >= bet_match['deadline']:
@@ -320,6 +323,7 @@ def parse (db, tx, message):
             }
             sql='insert into bet_match_resolutions values(:bet_match_id, :bet_match_type_id, :block_index, :settled, :bull_credit, :bear_credit, :winner, :escrow_less_fee, :fee)'
             cursor.execute(sql, bindings)
+            util.message(db, bindings['block_index'], 'insert', 'bet_match_resolutions', bindings)
 
         # Update the bet match’s status.
         if bet_match_status:
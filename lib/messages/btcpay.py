@@ -33,6 +33,12 @@ def initialise(db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       destination_idx ON btcpays (destination)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      btcpays_source_idx ON btcpays (source)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      btcpays_destination_idx ON btcpays (destination)
+                   ''')
 def validate (db, source, order_match_id, block_index):
     problems = []
     order_match = None
@@ -149,6 +155,7 @@ def parse (db, tx, message):
     }
     sql='insert into btcpays values(:tx_index, :tx_hash, :block_index, :source, :destination, :btc_amount, :order_match_id, :status)'
     cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'btcpays', bindings)
 
 
     cursor.close()
@@ -29,6 +29,9 @@ def initialise (db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       address_idx ON burns (source)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      burns_source_idx ON burns (source)
+                   ''')
 
 def validate (db, source, destination, quantity, block_index, overburn=False):
     problems = []
@@ -139,6 +142,7 @@ def parse (db, tx, MAINNET_BURNS, message=None):
     }
     sql='insert into burns values(:tx_index, :tx_hash, :block_index, :source, :burned, :earned, :status)'
     burn_parse_cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'burns', bindings)
 
     burn_parse_cursor.close()
 
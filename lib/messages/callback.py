@@ -35,6 +35,9 @@ def initialise (db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       asset_idx ON callbacks (asset)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      callbacks_asset_idx ON callbacks (asset)
+                   ''')
 
 def validate (db, source, fraction, asset, block_time, block_index, parse):
     cursor = db.cursor()
@@ -112,7 +115,7 @@ def validate (db, source, fraction, asset, block_time, block_index, parse):
     callback_total = sum([output['callback_quantity'] for output in outputs])
     if not callback_total: problems.append('nothing called back')
 
-    balances = list(cursor.execute('''SELECT * FROM balances WHERE (address = ? AND asset = ?)''', (source, config.XCP)))
+    balances = util.get_balance_rows(db, source, config.XCP)
     if not balances or balances[0]['quantity'] < (call_price * callback_total):
         problems.append('insufficient funds')
 
@@ -171,6 +174,7 @@ def parse (db, tx, message):
     }
     sql='insert into callbacks values(:tx_index, :tx_hash, :block_index, :source, :fraction, :asset, :status)'
     callback_parse_cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'callbacks', bindings)
 
     callback_parse_cursor.close()
 
@@ -32,6 +32,9 @@ def initialise (db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       source_idx ON cancels (source)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      cancels_source_idx ON cancels (source)
+                   ''')
 
 def validate (db, source, offer_hash):
     problems = []
@@ -118,6 +121,7 @@ def parse (db, tx, message):
     }
     sql='INSERT INTO cancels VALUES (:tx_index, :tx_hash, :block_index, :source, :offer_hash, :status)'
     cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'cancels', bindings)
 
     cursor.close()
 
@@ -121,5 +121,6 @@ def parse (db, tx, message):
         sql='insert into destructions values(:tx_index, :tx_hash, :block_index, :source, :asset, :quantity, :tag, :status)'
         cursor = db.cursor()
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'destructions', bindings)
 
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
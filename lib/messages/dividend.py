@@ -38,6 +38,9 @@ def initialise (db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       asset_idx ON dividends (asset)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      dividends_asset_idx ON dividends (asset)
+                   ''')
 
 def validate (db, source, quantity_per_unit, asset, dividend_asset, block_index):
     cursor = db.cursor()
@@ -101,7 +104,7 @@ def validate (db, source, quantity_per_unit, asset, dividend_asset, block_index)
     if not dividend_total: problems.append('zero dividend')
 
     if dividend_asset != config.BTC:
-        balances = list(cursor.execute('''SELECT * FROM balances WHERE (address = ? AND asset = ?)''', (source, dividend_asset)))
+        balances = util.get_balance_rows(db, source, dividend_asset)
         if not balances or balances[0]['quantity'] < dividend_total:
             problems.append('insufficient funds ({})'.format(dividend_asset))
 
@@ -111,7 +114,7 @@ def validate (db, source, quantity_per_unit, asset, dividend_asset, block_index)
         if block_index >= 330000 or config.TESTNET: # Protocol change.
             fee = int(0.0002 * config.UNIT * holder_count)
         if fee:
-            balances = list(cursor.execute('''SELECT * FROM balances WHERE (address = ? AND asset = ?)''', (source, config.XCP)))
+            balances = util.get_balance_rows(db, source, config.XCP)
             if not balances or balances[0]['quantity'] < fee:
                 problems.append('insufficient funds ({})'.format(config.XCP))
 
@@ -188,6 +191,7 @@ def parse (db, tx, message):
     }
     sql='insert into dividends values(:tx_index, :tx_hash, :block_index, :source, :asset, :dividend_asset, :quantity_per_unit, :fee_paid, :status)'
     dividend_parse_cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'dividends', bindings)
 
     dividend_parse_cursor.close()
 
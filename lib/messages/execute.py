@@ -189,5 +189,6 @@ def parse (db, tx, message):
         sql='insert into executions values(:tx_index, :tx_hash, :block_index, :source, :contract_id, :gasprice, :startgas, :gas_cost, :gas_remained, :value, :data, :output, :status)'
         cursor = db.cursor()
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'executions', bindings)
 
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
@@ -50,6 +50,12 @@ def initialise(db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       source_idx ON issuances (source)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      issuances_issuer_idx ON issuances (issuer)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      issuances_block_index_idx ON issuances (block_index)
+                   ''')
 
 def validate (db, source, destination, asset, quantity, divisible, callable_, call_date, call_price, description, block_index):
     problems = []
@@ -124,11 +130,7 @@ def validate (db, source, destination, asset, quantity, divisible, callable_, ca
     # Check for existence of fee funds.
     if quantity or (block_index >= 315000 or config.TESTNET):   # Protocol change.
         if not reissuance or (block_index < 310000 and not config.TESTNET):  # Pay fee only upon first issuance. (Protocol change.)
-            cursor = db.cursor()
-            cursor.execute('''SELECT * FROM balances \
-                              WHERE (address = ? AND asset = ?)''', (source, config.XCP))
-            balances = cursor.fetchall()
-            cursor.close()
+            balances = util.get_balance_rows(db, source, config.XCP)
             if util.enabled('numeric_asset_names', block_index):  # Protocol change.
                 if len(asset) >= 13:
                     fee = 0
@@ -272,6 +274,7 @@ def parse (db, tx, message):
     }
     sql='insert into issuances values(:tx_index, :tx_hash, :block_index, :asset, :quantity, :divisible, :source, :issuer, :transfer, :callable, :call_date, :call_price, :description, :fee_paid, :locked, :status)'
     issuance_parse_cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'issuances', bindings)
 
     # Credit.
     if status == 'valid' and quantity:
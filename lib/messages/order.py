@@ -63,6 +63,9 @@ def initialise(db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       give_asset_idx ON orders (give_asset)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      orders_block_index_idx ON orders (block_index)
+                   ''')
 
     # Order Matches
     cursor.execute('''CREATE TABLE IF NOT EXISTS order_matches(
@@ -191,6 +194,7 @@ def cancel_order (db, order, status, block_index):
         }
         sql='insert into order_expirations values(:order_index, :order_hash, :source, :block_index)'
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'order_expirations', bindings)
 
     cursor.close()
 
@@ -315,6 +319,7 @@ def cancel_order_match (db, order_match, status, block_index):
         }
         sql='insert into order_match_expirations values(:order_match_id, :tx0_address, :tx1_address, :block_index)'
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'order_match_expirations', bindings)
 
     cursor.close()
 
@@ -410,9 +415,7 @@ def parse (db, tx, message):
             price = 0
 
         # Overorder
-        order_parse_cursor.execute('''SELECT * FROM balances \
-                                      WHERE (address = ? AND asset = ?)''', (tx['source'], give_asset))
-        balances = list(order_parse_cursor)
+        balances = util.get_balance_rows(db, tx['source'], give_asset)
         if give_asset != config.BTC:
             if not balances:
                 give_quantity = 0
@@ -452,6 +455,7 @@ def parse (db, tx, message):
     }
     sql='insert into orders values(:tx_index, :tx_hash, :block_index, :source, :give_asset, :give_quantity, :give_remaining, :get_asset, :get_quantity, :get_remaining, :expiration, :expire_index, :fee_required, :fee_required_remaining, :fee_provided, :fee_provided_remaining, :status)'
     order_parse_cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'orders', bindings)
 
     # Match.
     if status == 'open' and tx['block_index'] != config.MEMPOOL_BLOCK_INDEX:
@@ -703,6 +707,7 @@ def match (db, tx, block_index=None):
             }
             sql='insert into order_matches values(:id, :tx0_index, :tx0_hash, :tx0_address, :tx1_index, :tx1_hash, :tx1_address, :forward_asset, :forward_quantity, :backward_asset, :backward_quantity, :tx0_block_index, :tx1_block_index, :block_index, :tx0_expiration, :tx1_expiration, :match_expire_index, :fee_paid, :status)'
             cursor.execute(sql, bindings)
+            util.message(db, bindings['block_index'], 'insert', 'order_matches', bindings)
 
             if tx1_status == 'filled':
                 break
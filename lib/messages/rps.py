@@ -59,6 +59,9 @@ def initialise (db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       status_idx ON rps (status)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      rps_source_idx ON rps (source)
+                   ''')
 
     # RPS Matches
     cursor.execute('''CREATE TABLE IF NOT EXISTS rps_matches(
@@ -235,9 +238,7 @@ def parse(db, tx, message):
     if status == 'open':
         move_random_hash = binascii.hexlify(move_random_hash).decode('utf8')
         # Overbet
-        rps_parse_cursor.execute('''SELECT * FROM balances \
-                                    WHERE (address = ? AND asset = ?)''', (tx['source'], 'XCP'))
-        balances = list(rps_parse_cursor)
+        balances = util.get_balance_rows(db, tx['source'], 'XCP')
         if not balances:
             wager = 0
         else:
@@ -267,6 +268,7 @@ def parse(db, tx, message):
     }
     sql = '''INSERT INTO rps VALUES (:tx_index, :tx_hash, :block_index, :source, :possible_moves, :wager, :move_random_hash, :expiration, :expire_index, :status)'''
     rps_parse_cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'rps', bindings)
 
     # Match.
     if status == 'open':
@@ -342,6 +344,7 @@ def match (db, tx, block_index):
                                                  :tx0_block_index, :tx1_block_index, :block_index, :tx0_expiration, :tx1_expiration,
                                                  :match_expire_index, :status)'''
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'rps_matches', bindings)
 
     cursor.close()
 
@@ -362,6 +365,7 @@ def expire (db, block_index):
         }
         sql = '''INSERT INTO rps_expirations VALUES (:rps_index, :rps_hash, :source, :block_index)'''
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'rps_expirations', bindings)
 
     # Expire rps matches
     expire_bindings = ('pending', 'pending and resolved', 'resolved and pending', block_index)
@@ -385,6 +389,7 @@ def expire (db, block_index):
         }
         sql = '''INSERT INTO rps_match_expirations VALUES (:rps_match_id, :tx0_address, :tx1_address, :block_index)'''
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'rps_match_expirations', bindings)
 
         # Rematch not expired and not resolved RPS
         if new_rps_match_status == 'expired':
@@ -176,6 +176,7 @@ def parse (db, tx, message):
 
     sql = '''INSERT INTO rpsresolves VALUES (:tx_index, :tx_hash, :block_index, :source, :move, :random, :rps_match_id, :status)'''
     cursor.execute(sql, rpsresolves_bindings)
+    util.message(db, rpsresolves_bindings['block_index'], 'insert', 'rpsresolves', rpsresolves_bindings)
 
     cursor.close()
 
@@ -313,6 +313,7 @@ def create_contract(db, block, tx, msg):
         bindings = {'contract_id': msg.to, 'tx_index': tx.tx_index, 'tx_hash': tx.tx_hash, 'block_index': block.number, 'source': tx.sender, 'code': bytes(dat), 'nonce': nonce}
         sql = '''INSERT INTO contracts VALUES (:contract_id, :tx_index, :tx_hash, :block_index, :source, :code, :nonce)'''
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'contracts', bindings)
         return msg.to, gas, dat
     else:
         if tx.sender != msg.sender:
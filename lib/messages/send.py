@@ -29,6 +29,12 @@ def initialise (db):
     cursor.execute('''CREATE INDEX IF NOT EXISTS
                       asset_idx ON sends (asset)
                    ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      sends_asset_block_index_idx ON sends (asset, block_index)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      sends_block_index_idx ON sends (block_index)
+                   ''')
 
 def validate (db, source, destination, asset, quantity, block_index):
     return send1.validate(db, source, destination, asset, quantity, block_index)
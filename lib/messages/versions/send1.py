@@ -72,9 +72,7 @@ def parse (db, tx, message):
 
     if status == 'valid':
         # Oversend
-        cursor.execute('''SELECT * FROM balances \
-                                     WHERE (address = ? AND asset = ?)''', (tx['source'], asset))
-        balances = cursor.fetchall()
+        balances = util.get_balance_rows(db, tx['source'], asset)
         if not balances:
             status = 'invalid: insufficient funds'
         elif balances[0]['quantity'] < quantity:
@@ -103,6 +101,7 @@ def parse (db, tx, message):
     }
     sql='insert into sends values(:tx_index, :tx_hash, :block_index, :source, :destination, :asset, :quantity, :status)'
     cursor.execute(sql, bindings)
+    util.message(db, bindings['block_index'], 'insert', 'sends', bindings)
 
 
     cursor.close()
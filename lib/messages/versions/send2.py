@@ -100,5 +100,6 @@ def parse (db, tx, message):
         sql='insert into sends values(:tx_index, :tx_hash, :block_index, :source, :destination, :asset, :quantity, :status)'
         cursor = db.cursor()
         cursor.execute(sql, bindings)
+        util.message(db, bindings['block_index'], 'insert', 'sends', bindings)
 
 # vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
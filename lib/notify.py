@@ -0,0 +1,83 @@
+"""Notifications of new blocks and transactions.
+
+Bitcoin Core can run a command for every new block (`-blocknotify`) and every
+transaction that affects its wallet (`-walletnotify`). Set to
+`counterpartyd.py notify block %s` and `counterpartyd.py notify tx %s`, they
+send a datagram to the server on this host, which then asks the backend for
+the new block or mempool at once, instead of at its next poll. Polling goes on
+regardless, so notifications are only ever an optimisation.
+
+The parser in turn notifies the API server, in the same process, of the
+messages it commits (`LEDGER`).
+"""
+import socket
+import logging
+import threading
+
+from lib import config
+
+HOST = '127.0.0.1'
+KINDS = ('block', 'tx')
+
+class Notifications(object):
+    """A count of notifications, that threads can wait on."""
+    def __init__(self):
+        self.count = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.count += 1
+            self.condition.notify_all()
+
+    def wait(self, count, timeout):
+        """Wait, for at most `timeout` seconds, for the count to differ from
+        `count` (read before checking for what is awaited), and return it."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.count != count, timeout)
+            return self.count
+
+BACKEND = Notifications()   # New blocks and transactions in the backend.
+LEDGER = Notifications()    # New messages, or changes to the mempool, in the database.
+
+def send(kind, value):
+    """Notify the server listening on `config.NOTIFY_PORT`."""
+    assert kind in KINDS
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.sendto('{} {}'.format(kind, value).encode('utf-8'), (HOST, config.NOTIFY_PORT))
+    finally:
+        sock.close()
+
+class Listener(threading.Thread):
+    """Receive the notifications sent with `send()`."""
+    def __init__(self, port=None):
+        # Bind here, so that the caller sees the errors.
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((HOST, port or config.NOTIFY_PORT))
+        self.socket.settimeout(1)
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.stop_event = threading.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                data, address = self.socket.recvfrom(1024)
+            except socket.timeout:
+                continue
+            try:
+                kind, value = data.decode('utf-8').split(' ', 1)
+            except (UnicodeDecodeError, ValueError):
+                kind, value = None, None
+            if kind not in KINDS:
+                logging.debug('Status: Ignoring malformed notification.')
+                continue
+            logging.debug('Status: Notified of {} {}.'.format(kind, value))
+            BACKEND.notify()
+        self.socket.close()
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
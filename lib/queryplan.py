@@ -0,0 +1,115 @@
+"""Query plans of API calls.
+
+`get_{table}` calls filter any API table by arbitrary fields. The audit
+replays a corpus of such calls through `EXPLAIN QUERY PLAN`, and reports
+those that read a whole table, or sort their results without an index.
+"""
+import re
+import json
+import logging
+
+from lib import api
+
+ADDRESS = 'mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc'
+ASSET = 'DIVISIBLE'
+
+# Common shapes of API calls, as (method, params).
+CORPUS = [
+    ('get_balances', {'filters': [{'field': 'address', 'op': '==', 'value': ADDRESS}]}),
+    ('get_balances', {'filters': [{'field': 'address', 'op': 'IN', 'value': [ADDRESS, ADDRESS]}]}),
+    ('get_balances', {'filters': [{'field': 'asset', 'op': '==', 'value': ASSET}, {'field': 'quantity', 'op': '>', 'value': 0}]}),
+    ('get_credits', {'filters': [{'field': 'address', 'op': '==', 'value': ADDRESS}], 'order_by': 'block_index', 'order_dir': 'DESC'}),
+    ('get_credits', {'filters': [{'field': 'address', 'op': '==', 'value': ADDRESS}, {'field': 'asset', 'op': '==', 'value': ASSET}],
+                     'order_by': 'block_index', 'order_dir': 'DESC'}),
+    ('get_credits', {'start_block': 310000, 'end_block': 310100}),
+    ('get_debits', {'filters': [{'field': 'address', 'op': '==', 'value': ADDRESS}], 'order_by': 'block_index', 'order_dir': 'DESC'}),
+    ('get_debits', {'filters': [{'field': 'address', 'op': '==', 'value': ADDRESS}, {'field': 'asset', 'op': '==', 'value': ASSET}],
+                    'order_by': 'block_index', 'order_dir': 'DESC'}),
+    ('get_debits', {'start_block': 310000, 'end_block': 310100}),
+    ('get_sends', {'filters': [{'field': 'source', 'op': '==', 'value': ADDRESS}, {'field': 'destination', 'op': '==', 'value': ADDRESS}],
+                   'filterop': 'OR', 'order_by': 'block_index', 'order_dir': 'DESC'}),
+    ('get_sends', {'filters': [{'field': 'asset', 'op': '==', 'value': ASSET}], 'order_by': 'block_index', 'order_dir': 'DESC'}),
+    ('get_sends', {'start_block': 310000, 'end_block': 310100}),
+    ('get_orders', {'filters': [{'field': 'give_asset', 'op': '==', 'value': ASSET}, {'field': 'get_asset', 'op': '==', 'value': 'XCP'}],
+                    'status': 'open', 'order_by': 'tx_index', 'order_dir': 'ASC', 'show_expired': False}),
+    ('get_orders', {'filters': [{'field': 'source', 'op': '==', 'value': ADDRESS}], 'order_by': 'block_index', 'order_dir': 'DESC'}),
+    ('get_orders', {'start_block': 310000, 'end_block': 310100}),
+    ('get_order_matches', {'filters': [{'field': 'tx0_address', 'op': '==', 'value': ADDRESS}, {'field': 'tx1_address', 'op': '==', 'value': ADDRESS}],
+                           'filterop': 'OR', 'status': 'pending'}),
+    ('get_order_matches', {'filters': [{'field': 'forward_asset', 'op': '==', 'value': ASSET}, {'field': 'backward_asset', 'op': '==', 'value': 'XCP'}],
+                           'status': 'completed', 'order_by': 'tx1_block_index', 'order_dir': 'DESC'}),
+    ('get_btcpays', {'filters': [{'field': 'source', 'op': '==', 'value': ADDRESS}, {'field': 'destination', 'op': '==', 'value': ADDRESS}],
+                     'filterop': 'OR'}),
+    ('get_issuances', {'filters': [{'field': 'asset', 'op': '==', 'value': ASSET}], 'status': 'valid', 'order_by': 'block_index', 'order_dir': 'ASC'}),
+    ('get_issuances', {'filters': [{'field': 'issuer', 'op': '==', 'value': ADDRESS}], 'status': 'valid'}),
+    ('get_issuances', {'start_block': 310000, 'end_block': 310100}),
+    ('get_broadcasts', {'filters': [{'field': 'source', 'op': '==', 'value': ADDRESS}], 'status': 'valid',
+                        'order_by': 'tx_index', 'order_dir': 'DESC', 'limit': 1}),
+    ('get_bets', {'filters': [{'field': 'feed_address', 'op': '==', 'value': ADDRESS}, {'field': 'bet_type', 'op': '==', 'value': 0}],
+                  'status': 'open'}),
+    ('get_bets', {'filters': [{'field': 'source', 'op': '==', 'value': ADDRESS}], 'order_by': 'block_index', 'order_dir': 'DESC'}),
+    ('get_bet_matches', {'filters': [{'field': 'tx0_address', 'op': '==', 'value': ADDRESS}, {'field': 'tx1_address', 'op': '==', 'value': ADDRESS}],
+                         'filterop': 'OR', 'status': 'pending'}),
+    ('get_burns', {'filters': [{'field': 'source', 'op': '==', 'value': ADDRESS}], 'status': 'valid'}),
+    ('get_dividends', {'filters': [{'field': 'asset', 'op': '==', 'value': ASSET}], 'status': 'valid'}),
+    ('get_callbacks', {'filters': [{'field': 'asset', 'op': '==', 'value': ASSET}], 'status': 'valid'}),
+    ('get_cancels', {'filters': [{'field': 'source', 'op': '==', 'value': ADDRESS}]}),
+    ('get_rps', {'filters': [{'field': 'source', 'op': '==', 'value': ADDRESS}], 'status': 'open'}),
+    ('get_rps_matches', {'filters': [{'field': 'tx0_address', 'op': '==', 'value': ADDRESS}, {'field': 'tx1_address', 'op': '==', 'value': ADDRESS}],
+                         'filterop': 'OR', 'status': 'pending'}),
+]
+
+def load_corpus(path):
+    """Read a corpus of JSON‐RPC requests (`{"method": …, "params": …}`),
+    one per line or as a single list."""
+    with open(path) as corpus_file:
+        content = corpus_file.read()
+    try:
+        requests = json.loads(content)
+        if isinstance(requests, dict):
+            requests = [requests]
+    except ValueError:
+        requests = [json.loads(line) for line in content.splitlines() if line.strip()]
+    return [(request['method'], request.get('params', {})) for request in requests
+            if request['method'].startswith('get_') and request['method'][4:] in api.API_TABLES]
+
+def explain(db, statement, bindings=()):
+    """Return the steps of the query plan of `statement`."""
+    cursor = db.cursor()
+    plan = [step['detail'] for step in cursor.execute('''EXPLAIN QUERY PLAN {}'''.format(statement), bindings)]
+    cursor.close()
+    return plan
+
+def get_scans(plan):
+    """Steps that read a whole table (or index)."""
+    return [detail for detail in plan if re.match('^SCAN (TABLE )?[a-z_]+', detail)]
+
+def get_sorts(plan):
+    """Steps that sort without an index."""
+    return [detail for detail in plan if 'TEMP B-TREE' in detail]
+
+def audit(db, corpus=CORPUS):
+    """Return a report for each call in `corpus` whose plan scans or sorts."""
+    reports = []
+    for method, params in corpus:
+        statement, bindings = api.get_rows_query(db, method[4:], **params)
+        plan = explain(db, statement, bindings)
+        scans, sorts = get_scans(plan), get_sorts(plan)
+        if scans or sorts:
+            reports.append({'method': method, 'params': params, 'statement': statement,
+                            'plan': plan, 'scans': scans, 'sorts': sorts})
+    return reports
+
+def log_audit(db, corpus=CORPUS):
+    reports = audit(db, corpus=corpus)
+    for report in reports:
+        call = '{}({})'.format(report['method'], json.dumps(report['params'], sort_keys=True))
+        if report['scans']:
+            logging.warning('Query plan: {}: {}'.format(call, '; '.join(report['scans'] + report['sorts'])))
+        else:
+            logging.info('Query plan: {}: {}'.format(call, '; '.join(report['sorts'])))
+    scans = len([report for report in reports if report['scans']])
+    logging.info('Status: {} of {} API calls read whole tables.'.format(scans, len(corpus)))
+    return reports
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
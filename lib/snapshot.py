@@ -0,0 +1,158 @@
+"""Ledger snapshots.
+
+Every `config.SNAPSHOT_INTERVAL` blocks, and at every checkpoint, once caught
+up, the tables that parsing derives from blocks are copied to a database of
+their own, tagged with the block’s consensus hashes. Reparses and rollbacks
+then start from the newest snapshot at or below their target, instead of from
+the first block, and verification reparses the intervals between snapshots in
+parallel.
+"""
+import os
+import logging
+import collections
+
+import apsw
+
+from lib import config, check
+
+SCHEMA = 'snapshot'     # Name of the attached snapshot.
+
+def get_directory():
+    return config.DATABASE + '.snapshots'
+
+def get_path(block_index):
+    return os.path.join(get_directory(), '{}.db'.format(block_index))
+
+def list_block_indexes():
+    """Return the indexes of the blocks with a snapshot, newest first."""
+    if config.DATABASE == ':memory:' or not os.path.isdir(get_directory()):
+        return []
+    block_indexes = []
+    for filename in os.listdir(get_directory()):
+        name, extension = os.path.splitext(filename)
+        if extension == '.db' and name.isdigit():
+            block_indexes.append(int(name))
+    return sorted(block_indexes, reverse=True)
+
+def create(db, block_index, tables):
+    """Snapshot `tables` at the end of block `block_index`.
+
+    Only the results of parsing are copied (blocks and transactions stay in
+    the database), without indexes, and read in a single transaction.
+    """
+    if config.DATABASE == ':memory:':
+        return
+    os.makedirs(get_directory(), exist_ok=True)
+    path = get_path(block_index)
+    temp_path = path + '.tmp'
+    if os.path.isfile(temp_path):
+        os.remove(temp_path)
+
+    snapshot_db = apsw.Connection(temp_path)
+    cursor = snapshot_db.cursor()
+    cursor.execute('''PRAGMA synchronous = OFF''')   # Renamed once complete.
+    cursor.execute('''ATTACH DATABASE ? AS source''', (db.filename,))
+    with snapshot_db:
+        for table in tables:
+            statement = list(cursor.execute('''SELECT sql FROM source.sqlite_master WHERE type = ? AND name = ?''', ('table', table)))[0][0]
+            cursor.execute(statement)
+            columns = ','.join(['"{}"'.format(column[1]) for column in cursor.execute('''PRAGMA source.table_info({})'''.format(table))])
+            cursor.execute('''INSERT INTO main.{0}(rowid,{1}) SELECT rowid,{1} FROM source.{0}'''.format(table, columns))
+
+        # Tag.
+        ledger_hash, txlist_hash = list(cursor.execute('''SELECT ledger_hash, txlist_hash FROM source.blocks
+                                                          WHERE block_index = ?''', (block_index,)))[0]
+        cursor.execute('''CREATE TABLE snapshot_tag(
+                          block_index INTEGER,
+                          ledger_hash TEXT,
+                          txlist_hash TEXT,
+                          version_minor INTEGER)
+                       ''')
+        cursor.execute('''INSERT INTO snapshot_tag VALUES(?,?,?,?)''', (block_index, ledger_hash, txlist_hash, config.VERSION_MINOR))
+    cursor.execute('''DETACH DATABASE source''')
+    cursor.close()
+    snapshot_db.close()
+    os.rename(temp_path, path)
+    logging.info('Status: Snapshot of block {} saved.'.format(block_index))
+
+    # Only keep the newest ones, and those at checkpoints.
+    checkpoints = check.CHECKPOINTS_TESTNET if config.TESTNET else check.CHECKPOINTS_MAINNET
+    block_indexes = [old_block_index for old_block_index in list_block_indexes() if old_block_index not in checkpoints]
+    for old_block_index in block_indexes[config.SNAPSHOTS_KEPT:]:
+        if os.path.exists(get_path(old_block_index)):   # Verification workers prune too.
+            os.remove(get_path(old_block_index))
+
+def get_tag(path):
+    snapshot_db = apsw.Connection(path, flags=apsw.SQLITE_OPEN_READONLY)
+    cursor = snapshot_db.cursor()
+    try:
+        block_index, ledger_hash, txlist_hash, version_minor = list(cursor.execute('''SELECT * FROM snapshot_tag'''))[0]
+    except (apsw.SQLError, IndexError):
+        return None
+    finally:
+        cursor.close()
+        snapshot_db.close()
+    return {'block_index': block_index, 'ledger_hash': ledger_hash,
+            'txlist_hash': txlist_hash, 'version_minor': version_minor}
+
+def list_usable(db, block_index):
+    """Return the paths of the usable snapshots at or below block
+    `block_index`, keyed by block index.
+
+    A snapshot is usable if it was made by this version, and its consensus
+    hashes are those of the same block in the database.
+    """
+    cursor = db.cursor()
+    usable = collections.OrderedDict()
+    for snapshot_block_index in reversed(list_block_indexes()):
+        if snapshot_block_index > block_index:
+            continue
+        path = get_path(snapshot_block_index)
+        tag = get_tag(path)
+        if not tag or tag['version_minor'] != config.VERSION_MINOR or not tag['ledger_hash']:
+            continue
+        blocks = list(cursor.execute('''SELECT * FROM blocks WHERE block_index = ?''', (snapshot_block_index,)))
+        if blocks and (blocks[0]['ledger_hash'], blocks[0]['txlist_hash']) == (tag['ledger_hash'], tag['txlist_hash']):
+            usable[snapshot_block_index] = path
+        else:
+            logging.debug('Status: Skipping stale snapshot of block {}.'.format(snapshot_block_index))
+    cursor.close()
+    return usable
+
+def find(db, block_index):
+    """Return the path of the newest usable snapshot at or below block
+    `block_index`, or None.
+    """
+    usable = list_usable(db, block_index)
+    if usable:
+        return list(usable.values())[-1]
+    return None
+
+def attach(db, path):
+    """`ATTACH` can’t be run inside a transaction."""
+    cursor = db.cursor()
+    cursor.execute('''ATTACH DATABASE ? AS {}'''.format(SCHEMA), (path,))
+    cursor.close()
+
+def detach(db):
+    cursor = db.cursor()
+    cursor.execute('''DETACH DATABASE {}'''.format(SCHEMA))
+    cursor.close()
+
+def restore(db, tables):
+    """Replace the contents of `tables` with those in the attached snapshot
+    (keeping rowids), and return the index of the snapshot’s block.
+
+    `tables` must be ordered for FOREIGN KEY constraints.
+    """
+    cursor = db.cursor()
+    for table in tables:
+        cursor.execute('''DELETE FROM main.{}'''.format(table))
+    for table in reversed(tables):
+        columns = ','.join(['"{}"'.format(column['name']) for column in cursor.execute('''PRAGMA main.table_info({})'''.format(table))])
+        cursor.execute('''INSERT INTO main.{0}(rowid,{1}) SELECT rowid,{1} FROM {2}.{0}'''.format(table, columns, SCHEMA))
+    block_index = list(cursor.execute('''SELECT block_index FROM {}.snapshot_tag'''.format(SCHEMA)))[0]['block_index']
+    cursor.close()
+    return block_index
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
@@ -0,0 +1,123 @@
+"""Undo log for chain reorganisations.
+
+While following the blockchain, TEMP triggers record, for every row
+inserted, updated or deleted in the parsed tables, the SQL statement that
+reverses the change, along with the index of the block being parsed. Rolling
+back to block N then replays the statements for the blocks after N in reverse
+order, instead of reparsing the whole chain.
+"""
+import logging
+
+from lib import config
+
+def get_columns(db, table):
+    cursor = db.cursor()
+    columns = [column['name'] for column in cursor.execute('''PRAGMA table_info({})'''.format(table))]
+    cursor.close()
+    return columns
+
+def install_triggers(db, tables):
+    """TEMP triggers only fire for this connection."""
+    cursor = db.cursor()
+    # The block being parsed is the last one listed.
+    block_index = '(SELECT MAX(block_index) FROM blocks)'
+    for table in tables:
+        columns = get_columns(db, table)
+        old_values = "||','||".join(['quote(old."{}")'.format(column) for column in columns])
+        old_assignments = "||','||".join(['\'"{}"=\'||quote(old."{}")'.format(column, column) for column in columns])
+        cursor.execute('''CREATE TEMP TRIGGER IF NOT EXISTS undolog_{0}_insert AFTER INSERT ON {0} BEGIN
+                            INSERT INTO undolog(block_index, sql) VALUES({1}, 'DELETE FROM {0} WHERE rowid='||new.rowid);
+                          END'''.format(table, block_index))
+        cursor.execute('''CREATE TEMP TRIGGER IF NOT EXISTS undolog_{0}_update AFTER UPDATE ON {0} BEGIN
+                            INSERT INTO undolog(block_index, sql) VALUES({1}, 'UPDATE {0} SET '||{2}||' WHERE rowid='||old.rowid);
+                          END'''.format(table, block_index, old_assignments))
+        cursor.execute('''CREATE TEMP TRIGGER IF NOT EXISTS undolog_{0}_delete BEFORE DELETE ON {0} BEGIN
+                            INSERT INTO undolog(block_index, sql) VALUES({1}, 'INSERT INTO {0}(rowid,{2}) VALUES('||old.rowid||','||{3}||')');
+                          END'''.format(table, block_index, ','.join(['"{}"'.format(column) for column in columns]), old_values))
+    cursor.close()
+
+def uninstall_triggers(db, tables):
+    cursor = db.cursor()
+    for table in tables:
+        for action in ('insert', 'update', 'delete'):
+            cursor.execute('''DROP TRIGGER IF EXISTS temp.undolog_{}_{}'''.format(table, action))
+    cursor.close()
+
+def initialise(db, tables):
+    """Start recording changes to `tables`, keeping whatever was recorded
+    previously."""
+    cursor = db.cursor()
+    cursor.execute('''CREATE TABLE IF NOT EXISTS undolog(
+                      undo_index INTEGER PRIMARY KEY AUTOINCREMENT,
+                      block_index INTEGER,
+                      sql TEXT)
+                   ''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS
+                      undolog_block_index_idx ON undolog (block_index)
+                   ''')
+    # First block whose changes are all recorded.
+    cursor.execute('''CREATE TABLE IF NOT EXISTS undolog_start(
+                      block_index INTEGER)
+                   ''')
+    if not list(cursor.execute('''SELECT * FROM undolog_start''')):
+        last_block = list(cursor.execute('''SELECT MAX(block_index) AS block_index FROM blocks'''))[0]['block_index']
+        start = last_block + 1 if last_block is not None else config.BLOCK_FIRST
+        cursor.execute('''INSERT INTO undolog_start VALUES(?)''', (start,))
+    cursor.close()
+    install_triggers(db, tables)
+
+def clear(db, tables):
+    """Stop recording and forget everything."""
+    uninstall_triggers(db, tables)
+    cursor = db.cursor()
+    cursor.execute('''DROP TABLE IF EXISTS undolog''')
+    cursor.execute('''DROP TABLE IF EXISTS undolog_start''')
+    cursor.close()
+
+def get_start(db):
+    """Return the first block that can be undone, or None if nothing is
+    being recorded."""
+    cursor = db.cursor()
+    if not list(cursor.execute('''SELECT * FROM sqlite_master WHERE type = ? AND name = ?''', ('table', 'undolog_start'))):
+        cursor.close()
+        return None
+    start = list(cursor.execute('''SELECT * FROM undolog_start'''))[0]['block_index']
+    cursor.close()
+    return start
+
+def prune(db, block_index):
+    """Forget changes older than `config.UNDOLOG_MAX_PAST_BLOCKS` blocks."""
+    start = block_index - config.UNDOLOG_MAX_PAST_BLOCKS + 1
+    if start <= get_start(db):
+        return
+    cursor = db.cursor()
+    cursor.execute('''DELETE FROM undolog WHERE block_index < ?''', (start,))
+    cursor.execute('''UPDATE undolog_start SET block_index = ?''', (start,))
+    cursor.close()
+
+def can_rollback(db, block_index):
+    """Whether every change made after block `block_index` is recorded."""
+    start = get_start(db)
+    return start is not None and start <= block_index + 1
+
+def rollback(db, block_index, tables):
+    """Undo every change made after block `block_index`, and return the
+    number of statements replayed."""
+    assert can_rollback(db, block_index)
+    cursor = db.cursor()
+
+    # Don’t record the undoing.
+    uninstall_triggers(db, tables)
+
+    undo_statements = list(cursor.execute('''SELECT * FROM undolog WHERE block_index > ?
+                                             ORDER BY undo_index DESC''', (block_index,)))
+    for undo in undo_statements:
+        cursor.execute(undo['sql'])
+    cursor.execute('''DELETE FROM undolog WHERE block_index > ?''', (block_index,))
+    logging.debug('Status: Replayed {} undo statements.'.format(len(undo_statements)))
+
+    cursor.close()
+    install_triggers(db, tables)
+    return len(undo_statements)
+
+# vim: tabstop=8 expandtab shiftwidth=4 softtabstop=4
@@ -19,6 +19,7 @@ from functools import lru_cache
 import getpass
 import bitcoin as bitcoinlib
 import os
+import contextlib
 
 from . import (config, exceptions, backend)
 from .exceptions import DecodeError
@@ -35,7 +36,7 @@ json_print = lambda x: print(json.dumps(x, sort_keys=True, indent=4))
 BET_TYPE_NAME = {0: 'BullCFD', 1: 'BearCFD', 2: 'Equal', 3: 'NotEqual'}
 BET_TYPE_ID = {'BullCFD': 0, 'BearCFD': 1, 'Equal': 2, 'NotEqual': 3}
 
-BLOCK_LEDGER = []
+LEDGER_HASHER = None   # `check.ConsensusHasher` of the block being parsed.
 
 CURR_DIR = os.path.dirname(os.path.realpath(__file__))
 with open(CURR_DIR + '/../protocol_changes.json') as f:
@@ -80,7 +81,31 @@ def price (numerator, denominator, block_index):
         denominator = D(denominator)
         return D(numerator / denominator)
 
+# Divisibility of the assets named in log lines, memoised for the block
+# being parsed. (Only used for logging.)
+LOG_DIVISIBILITY = {}
+
+def clear_log_divisibility():
+    LOG_DIVISIBILITY.clear()
+
+def log_divisibility(db, asset):
+    if asset in ('fraction', 'leverage', 'value', 'price', 'odds'):
+        return None
+    if asset not in LOG_DIVISIBILITY:
+        LOG_DIVISIBILITY[asset] = is_divisible(db, asset)
+    return LOG_DIVISIBILITY[asset]
+
+def log_level (command, category):
+    if command == 'update' or category in ('credits', 'debits'):
+        return logging.DEBUG
+    else:
+        return logging.INFO
+
 def log (db, command, category, bindings):
+    # Don’t format (or look up divisibility for) discarded lines.
+    if not logging.getLogger().isEnabledFor(log_level(command, category)):
+        return
+
     cursor = db.cursor()
 
     for element in bindings.keys():
@@ -89,13 +114,13 @@ def log (db, command, category, bindings):
         except Exception:
             bindings[element] = '<Error>'
 
-    # Slow?!
     def output (quantity, asset):
         try:
+            divisible = log_divisibility(db, asset)
             if asset not in ('fraction', 'leverage'):
-                return str(value_out(db, quantity, asset)) + ' ' + asset
+                return str(value_out(db, quantity, asset, divisible=divisible)) + ' ' + asset
             else:
-                return str(value_out(db, quantity, asset))
+                return str(value_out(db, quantity, asset, divisible=divisible))
         except exceptions.AssetError:
             return '<AssetError>'
         except decimal.DivisionByZero:
@@ -263,17 +288,74 @@ def log (db, command, category, bindings):
     cursor.close()
 
 
-def message (db, block_index, command, category, bindings, tx_hash=None):
-    cursor = db.cursor()
+### Message Journal ###
+
+# While a block is being parsed, messages are numbered from an in-memory
+# counter and written to the table `messages` in one batch at the end of the
+# block. (They are logged immediately.)
+class MessageJournal(object):
+    def __init__(self, db, message_index):
+        self.db = db
+        self.message_index = message_index      # Next message index.
+        self.messages = []
 
-    # Get last message index.
+MESSAGE_JOURNAL = None
+
+def get_next_message_index(db):
+    cursor = db.cursor()
     messages = list(cursor.execute('''SELECT * FROM messages
                                       WHERE message_index = (SELECT MAX(message_index) from messages)'''))
+    cursor.close()
     if messages:
         assert len(messages) == 1
-        message_index = messages[0]['message_index'] + 1
+        return messages[0]['message_index'] + 1
     else:
-        message_index = 0
+        return 0
+
+def start_message_journal(db):
+    global MESSAGE_JOURNAL
+    MESSAGE_JOURNAL = MessageJournal(db, get_next_message_index(db))
+
+def stop_message_journal():
+    """Drop the journal, without writing anything."""
+    global MESSAGE_JOURNAL
+    MESSAGE_JOURNAL = None
+
+def get_message_journal(db):
+    if MESSAGE_JOURNAL is not None and MESSAGE_JOURNAL.db is db:
+        return MESSAGE_JOURNAL
+    return None
+
+def flush_message_journal(db):
+    journal = get_message_journal(db)
+    if not journal or not journal.messages: return
+    cursor = db.cursor()
+    cursor.executemany('insert into messages values(:message_index, :block_index, :command, :category, :bindings, :timestamp)',
+                       journal.messages)
+    cursor.close()
+    journal.messages = []
+
+@contextlib.contextmanager
+def message_journal_suspended(db):
+    """Write messages straight to the database, e.g. around savepoints,
+    which the journal can’t follow."""
+    journal = get_message_journal(db)
+    if journal:
+        flush_message_journal(db)
+        stop_message_journal()
+    try:
+        yield
+    finally:
+        if journal:
+            start_message_journal(db)
+
+def message (db, block_index, command, category, bindings, tx_hash=None):
+    journal = get_message_journal(db)
+    if journal:
+        message_index = journal.message_index
+        journal.message_index += 1
+    else:
+        message_index = get_next_message_index(db)
 
     # Not to be misleading…
     if block_index == config.MEMPOOL_BLOCK_INDEX:
@@ -293,15 +375,19 @@ def message (db, block_index, command, category, bindings, tx_hash=None):
             items.append(item)
 
     bindings_string = json.dumps(collections.OrderedDict(items))
-    cursor.execute('insert into messages values(:message_index, :block_index, :command, :category, :bindings, :timestamp)',
-                   (message_index, block_index, command, category, bindings_string, curr_time()))
+    message_row = (message_index, block_index, command, category, bindings_string, curr_time())
+    if journal:
+        journal.messages.append(message_row)
+    else:
+        cursor = db.cursor()
+        cursor.execute('insert into messages values(:message_index, :block_index, :command, :category, :bindings, :timestamp)',
+                       message_row)
+        cursor.close()
 
     # Log only real transactions.
     if block_index != config.MEMPOOL_BLOCK_INDEX:
         log(db, command, category, bindings)
 
-    cursor.close()
-
 
 def isodt (epoch_time):
     try:
@@ -445,6 +531,113 @@ def get_asset_name (db, asset_id, block_index):
         return 0    # Strange, I know…
 
 
+### Balance Cache ###
+
+# While a block is being parsed, balances are read and written through an
+# in-memory cache, and changed rows are written back in one batch at the end
+# of the block (in the order in which they would have been inserted).
+class BalanceCache(object):
+    def __init__(self, db):
+        self.db = db
+        self.balances = {}      # (address, asset): {'quantity', 'exists', 'dirty'}
+        self.inserted = []      # (address, asset), in order of insertion
+
+BALANCE_CACHE = None
+
+def start_balance_cache(db):
+    global BALANCE_CACHE
+    BALANCE_CACHE = BalanceCache(db)
+
+def stop_balance_cache():
+    """Drop the cache, without writing anything back."""
+    global BALANCE_CACHE
+    BALANCE_CACHE = None
+
+def get_balance_cache(db):
+    if BALANCE_CACHE is not None and BALANCE_CACHE.db is db:
+        return BALANCE_CACHE
+    return None
+
+def flush_balance_cache(db):
+    cache = get_balance_cache(db)
+    if not cache: return
+
+    inserted = set(cache.inserted)
+    updates, inserts = [], []
+    for (address, asset), balance in cache.balances.items():
+        if balance['dirty'] and (address, asset) not in inserted:
+            updates.append({'quantity': balance['quantity'], 'address': address, 'asset': asset})
+        balance['dirty'] = False
+    for address, asset in cache.inserted:
+        inserts.append({'address': address, 'asset': asset, 'quantity': cache.balances[(address, asset)]['quantity']})
+    cache.inserted = []
+
+    cursor = db.cursor()
+    if updates:
+        cursor.executemany('''update balances set quantity = :quantity where (address = :address and asset = :asset)''', updates)
+    if inserts:
+        cursor.executemany('''insert into balances values(:address, :asset, :quantity)''', inserts)
+    cursor.close()
+
+@contextlib.contextmanager
+def balance_cache_suspended(db):
+    """Write balances straight to the database, e.g. around savepoints,
+    which the cache can’t follow."""
+    cache = get_balance_cache(db)
+    if cache:
+        flush_balance_cache(db)
+        stop_balance_cache()
+    try:
+        yield
+    finally:
+        if cache:
+            start_balance_cache(db)
+
+def read_balance(db, address, asset):
+    """Return whether the balance exists, and its quantity."""
+    cache = get_balance_cache(db)
+    if cache and (address, asset) in cache.balances:
+        balance = cache.balances[(address, asset)]
+        return balance['exists'], balance['quantity']
+
+    cursor = db.cursor()
+    balances = list(cursor.execute('''SELECT * FROM balances \
+                                      WHERE (address = ? AND asset = ?)''', (address, asset)))
+    cursor.close()
+    assert len(balances) <= 1
+    exists, quantity = bool(balances), balances[0]['quantity'] if balances else 0
+
+    if cache:
+        cache.balances[(address, asset)] = {'quantity': quantity, 'exists': exists, 'dirty': False}
+    return exists, quantity
+
+def write_balance(db, address, asset, quantity, exists):
+    cache = get_balance_cache(db)
+    if cache:
+        balance = cache.balances[(address, asset)]
+        if not exists:
+            cache.inserted.append((address, asset))
+        balance['quantity'], balance['exists'], balance['dirty'] = quantity, True, True
+        return
+
+    cursor = db.cursor()
+    if not exists:
+        bindings = {
+            'address': address,
+            'asset': asset,
+            'quantity': quantity,
+        }
+        sql='insert into balances values(:address, :asset, :quantity)'
+    else:
+        bindings = {
+            'quantity': quantity,
+            'address': address,
+            'asset': asset
+        }
+        sql='update balances set quantity = :quantity where (address = :address and asset = :asset)'
+    cursor.execute(sql, bindings)
+    cursor.close()
+
 class DebitError (Exception): pass
 def debit (db, block_index, address, asset, quantity, action=None, event=None):
     if type(quantity) != int:
@@ -464,11 +657,7 @@ def debit (db, block_index, address, asset, quantity, action=None, event=None):
     if asset == config.BTC:
         raise exceptions.BalanceError('Cannot debit bitcoins from a {} address!'.format(config.XCP_NAME))
 
-    debit_cursor.execute('''SELECT * FROM balances \
-                            WHERE (address = ? AND asset = ?)''', (address, asset))
-    balances = debit_cursor.fetchall()
-    if not len(balances) == 1: old_balance = 0
-    else: old_balance = balances[0]['quantity']
+    exists, old_balance = read_balance(db, address, asset)
 
     if old_balance < quantity:
         raise DebitError('Insufficient funds.')
@@ -477,13 +666,8 @@ def debit (db, block_index, address, asset, quantity, action=None, event=None):
     balance = min(balance, config.MAX_INT)
     assert balance >= 0
 
-    bindings = {
-        'quantity': balance,
-        'address': address,
-        'asset': asset
-    }
-    sql='update balances set quantity = :quantity where (address = :address and asset = :asset)'
-    debit_cursor.execute(sql, bindings)
+    if exists:
+        write_balance(db, address, asset, balance, exists)
 
     # Record debit.
     bindings = {
@@ -496,9 +680,11 @@ def debit (db, block_index, address, asset, quantity, action=None, event=None):
     }
     sql='insert into debits values(:block_index, :address, :asset, :quantity, :action, :event)'
     debit_cursor.execute(sql, bindings)
+    message(db, block_index, 'insert', 'debits', bindings)
     debit_cursor.close()
 
-    BLOCK_LEDGER.append('{}{}{}{}'.format(block_index, address, asset, quantity))
+    if LEDGER_HASHER:
+        LEDGER_HASHER.update('{}{}{}{}'.format(block_index, address, asset, quantity))
 
 class CreditError (Exception): pass
 def credit (db, block_index, address, asset, quantity, action=None, event=None):
@@ -516,35 +702,15 @@ def credit (db, block_index, address, asset, quantity, action=None, event=None):
         if len(address) == 40:
             assert asset == config.XCP
 
-    credit_cursor.execute('''SELECT * FROM balances \
-                             WHERE (address = ? AND asset = ?)''', (address, asset))
-    balances = credit_cursor.fetchall()
-    if len(balances) == 0:
-        assert balances == []
-
+    exists, old_balance = read_balance(db, address, asset)
+    if not exists:
         #update balances table with new balance
-        bindings = {
-            'address': address,
-            'asset': asset,
-            'quantity': quantity,
-        }
-        sql='insert into balances values(:address, :asset, :quantity)'
-        credit_cursor.execute(sql, bindings)
-    elif len(balances) > 1:
-        assert False
+        write_balance(db, address, asset, quantity, exists)
     else:
-        old_balance = balances[0]['quantity']
         assert type(old_balance) == int
         balance = round(old_balance + quantity)
         balance = min(balance, config.MAX_INT)
-
-        bindings = {
-            'quantity': balance,
-            'address': address,
-            'asset': asset
-        }
-        sql='update balances set quantity = :quantity where (address = :address and asset = :asset)'
-        credit_cursor.execute(sql, bindings)
+        write_balance(db, address, asset, balance, exists)
 
     # Record credit.
     bindings = {
@@ -557,9 +723,11 @@ def credit (db, block_index, address, asset, quantity, action=None, event=None):
     }
     sql='insert into credits values(:block_index, :address, :asset, :quantity, :action, :event)'
     credit_cursor.execute(sql, bindings)
+    message(db, block_index, 'insert', 'credits', bindings)
     credit_cursor.close()
 
-    BLOCK_LEDGER.append('{}{}{}{}'.format(block_index, address, asset, quantity))
+    if LEDGER_HASHER:
+        LEDGER_HASHER.update('{}{}{}{}'.format(block_index, address, asset, quantity))
 
 class QuantityError(Exception): pass
 
@@ -633,6 +801,7 @@ def value_out (db, quantity, asset, divisible=None):
 
 def holders(db, asset):
     holders = []
+    flush_balance_cache(db)
     cursor = db.cursor()
     # Balances
     cursor.execute('''SELECT * FROM balances \
@@ -707,46 +876,30 @@ def xcp_destroyed (db):
     cursor.close()
     return destroyed_total + issuance_fee_total + dividend_fee_total
 def xcp_supply (db):
-    return xcp_created(db) - xcp_destroyed(db)
+    return asset_supply(db, config.XCP)
 def creations (db):
     cursor = db.cursor()
-    creations = {config.XCP: xcp_created(db)}
-    cursor.execute('''SELECT * from issuances \
-                      WHERE status = ?''', ('valid',))
-    for issuance in list(cursor):
-        asset = issuance['asset']
-        quantity = issuance['quantity']
-        if asset in creations.keys():
-            creations[asset] += quantity
-        else:
-            creations[asset] = quantity
-
+    creations = {supply['asset']: supply['issued'] for supply in cursor.execute('''SELECT * FROM supplies''')}
     cursor.close()
     return creations
 def destructions (db):
     cursor = db.cursor()
-    destructions = {config.XCP: xcp_destroyed(db)}
-    cursor.execute('''SELECT * from destructions \
-                      WHERE (status = ? AND asset != ?)''', ('valid', config.XCP))
-    for destruction in list(cursor):
-        asset = destruction['asset']
-        quantity = destruction['burned']
-        if asset in destructions.keys():
-            destructions[asset] += quantity
-        else:
-            destructions[asset] = quantity
+    destructions = {supply['asset']: supply['destroyed'] for supply in cursor.execute('''SELECT * FROM supplies''')}
     cursor.close()
     return destructions
 def asset_supply (db, asset):
-    supply = creations(db)[asset]
-    destroyed = destructions(db)
-    if asset in destroyed:
-        supply -= destroyed[asset]
-    return supply
+    """The totals in `supplies` are maintained by triggers (see `blocks.initialise`)."""
+    cursor = db.cursor()
+    supplies = list(cursor.execute('''SELECT * FROM supplies WHERE asset = ?''', (asset,)))
+    cursor.close()
+    if not supplies:
+        raise KeyError(asset)
+    return supplies[0]['issued'] - supplies[0]['destroyed']
 def supplies (db):
-    d1 = creations(db)
-    d2 = destructions(db)
-    return {key: d1[key] - d2.get(key, 0) for key in d1.keys()}
+    cursor = db.cursor()
+    supplies = {supply['asset']: supply['issued'] - supply['destroyed'] for supply in cursor.execute('''SELECT * FROM supplies''')}
+    cursor.close()
+    return supplies
 
 ### SUPPLIES ###
 
@@ -899,14 +1052,6 @@ def pubkeyhash_array(address):
 
 ### Multi‐signature Addresses ###
 
-def get_balance (db, address, asset):
-    # Get balance of contract or address.
-    cursor = db.cursor()
-    balances = list(cursor.execute('''SELECT * FROM balances WHERE (address = ? AND asset = ?)''', (address, asset)))
-    cursor.close()
-    if not balances: return 0
-    else: return balances[0]['quantity']
-
 # Why on Earth does `binascii.hexlify()` return bytes?!
 def hexlify(x):
     return binascii.hexlify(x).decode('ascii')
@@ -983,11 +1128,15 @@ def transfer(db, block_index, source, destination, asset, quantity, action, even
 
 def get_balance (db, address, asset):
     # Get balance of contract or address.
-    cursor = db.cursor()
-    balances = list(cursor.execute('''SELECT * FROM balances WHERE (address = ? AND asset = ?)''', (address, asset)))
-    cursor.close()
-    if not balances: return 0
-    else: return balances[0]['quantity']
+    exists, quantity = read_balance(db, address, asset)
+    return quantity
+
+def get_balance_rows (db, address, asset):
+    """Like `SELECT * FROM balances WHERE (address = ? AND asset = ?)`, but
+    aware of the balance cache."""
+    exists, quantity = read_balance(db, address, asset)
+    if not exists: return []
+    return [{'address': address, 'asset': asset, 'quantity': quantity}]
 
 ID_SEPARATOR = '_'
 def make_id(hash_1, hash_2):
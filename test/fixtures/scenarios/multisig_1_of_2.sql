@@ -33,6 +33,7 @@ INSERT INTO balances VALUES('1_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB
 INSERT INTO balances VALUES('1_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','BBBC',7369);
 -- Triggers and indices on  balances
 CREATE INDEX address_asset_idx ON balances (address, asset);
+CREATE INDEX balances_asset_idx ON balances (asset);
 
 -- Table  bet_expirations
 DROP TABLE IF EXISTS bet_expirations;
@@ -106,6 +107,8 @@ INSERT INTO bet_matches VALUES('4c601826f72f2613c1b2c90e8e649981c005d4d895ae3bb5
 INSERT INTO bet_matches VALUES('fbde9d64afd3d06f574b781dd01124fb63914494f516e7505c158e839a38006e_37a6cd57ea0d3510c605a07c7c13dd7c65969bad764a8f394d06ab170ddb53c9',15,'fbde9d64afd3d06f574b781dd01124fb63914494f516e7505c158e839a38006e','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',16,'37a6cd57ea0d3510c605a07c7c13dd7c65969bad764a8f394d06ab170ddb53c9','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',0,1,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',100,1388000100,0.0,5040,150000000,350000000,310014,310015,310015,10,10,310024,5000000,'expired');
 INSERT INTO bet_matches VALUES('766f83995b009b0d4a912b233489231fd23e6232c4c1f2caaafa3c5c1a5cae70_484194c207ccc7e72b0232c23d32e20635295198d98553017974849c7c36b473',17,'766f83995b009b0d4a912b233489231fd23e6232c4c1f2caaafa3c5c1a5cae70','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',18,'484194c207ccc7e72b0232c23d32e20635295198d98553017974849c7c36b473','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',2,3,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',100,1388000200,1.0,5040,750000000,650000000,310016,310017,310017,10,10,310026,5000000,'expired');
 -- Triggers and indices on  bet_matches
+CREATE INDEX bet_matches_tx0_address_idx ON bet_matches (tx0_address);
+CREATE INDEX bet_matches_tx1_address_idx ON bet_matches (tx1_address);
 CREATE INDEX valid_feed_idx ON bet_matches (feed_address, status);
 
 -- Table  bets
@@ -137,6 +140,7 @@ INSERT INTO bets VALUES(16,'37a6cd57ea0d3510c605a07c7c13dd7c65969bad764a8f394d06
 INSERT INTO bets VALUES(17,'766f83995b009b0d4a912b233489231fd23e6232c4c1f2caaafa3c5c1a5cae70',310016,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',2,1388000200,750000000,0,650000000,0,1.0,5040,10,310026,5000000,'filled');
 INSERT INTO bets VALUES(18,'484194c207ccc7e72b0232c23d32e20635295198d98553017974849c7c36b473',310017,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',3,1388000200,650000000,0,750000000,0,1.0,5040,10,310027,5000000,'filled');
 -- Triggers and indices on  bets
+CREATE INDEX bets_source_idx ON bets (source);
 CREATE INDEX feed_valid_bettype_idx ON bets (feed_address, status, bet_type);
 
 -- Table  blocks
@@ -291,6 +295,9 @@ CREATE TABLE btcpays(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO btcpays VALUES(5,'186f3db77952b50220f20fb875f65eb63064a9c73436dc4fc6a182e0a7e00d6d',310004,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',50000000,'2593e61dff78d2397647bfa9c14c7b17b23b2bb1b446bde8dd23f537b56870df_dda95fb9e4ccadc9e511622585ff74889c8f76dd572f9b40bb5af1242b1e6f30','valid');
+-- Triggers and indices on  btcpays
+CREATE INDEX btcpays_destination_idx ON btcpays (destination);
+CREATE INDEX btcpays_source_idx ON btcpays (source);
 
 -- Table  burns
 DROP TABLE IF EXISTS burns;
@@ -305,6 +312,14 @@ CREATE TABLE burns(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO burns VALUES(1,'1b8787f4111f7dd95d56168e3ada0a36c9ac88bb86908b9f921e33d12bd88a37',310000,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',62000000,93000000000,'valid');
 INSERT INTO burns VALUES(23,'5d015bfc17193c05376698968fd0474269dc496f4ee1e7e989b91b6b7bd8fde1',310022,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',38000000,56999887262,'valid');
+-- Triggers and indices on  burns
+CREATE INDEX burns_source_idx ON burns (source);
+CREATE TRIGGER supplies_burns_delete AFTER DELETE ON burns WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued - old.earned WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_burns_insert AFTER INSERT ON burns WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued + new.earned WHERE asset = 'XCP';
+                          END;
 
 -- Table  callbacks
 DROP TABLE IF EXISTS callbacks;
@@ -318,6 +333,8 @@ CREATE TABLE callbacks(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO callbacks VALUES(25,'5ba45d0164b830fa68c8d89c2d46e6d0342d78c2385d30b47f85536e8a9c3561',310024,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','0.3','BBBC','valid');
+-- Triggers and indices on  callbacks
+CREATE INDEX callbacks_asset_idx ON callbacks (asset);
 
 -- Table  cancels
 DROP TABLE IF EXISTS cancels;
@@ -331,6 +348,7 @@ CREATE TABLE cancels(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  cancels
 CREATE INDEX cancels_block_index_idx ON cancels (block_index);
+CREATE INDEX cancels_source_idx ON cancels (source);
 
 -- Table  contracts
 DROP TABLE IF EXISTS contracts;
@@ -388,6 +406,11 @@ INSERT INTO credits VALUES(310040,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaS
 INSERT INTO credits VALUES(310069,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','XCP',11021664,'recredit wager','e7bbfbfddaeca098353523a86949173744949dc38820bac7af16b8197c1f9a9f_fdbbcd99852edec0f522709ac3baa887e8b2586a11fe9f11e4ca7e867623c787');
 INSERT INTO credits VALUES(310069,'1_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','XCP',11021664,'recredit wager','e7bbfbfddaeca098353523a86949173744949dc38820bac7af16b8197c1f9a9f_fdbbcd99852edec0f522709ac3baa887e8b2586a11fe9f11e4ca7e867623c787');
 INSERT INTO credits VALUES(310096,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','XCP',22043330,'wins','71da68e9b75cbb99814fe92b9412d145461bd3edbe8d117bdf72eea40feecf47_92d92ee63d3e4eb1e51a3672eae30aee6a81672f88da24cc5a18376b88e5af00');
+-- Triggers and indices on  credits
+CREATE INDEX credits_address_asset_block_index_idx ON credits (address, asset, block_index);
+CREATE INDEX credits_address_block_index_idx ON credits (address, block_index);
+CREATE INDEX credits_address_idx ON credits (address);
+CREATE INDEX credits_block_index_idx ON credits (block_index);
 
 -- Table  debits
 DROP TABLE IF EXISTS debits;
@@ -429,6 +452,9 @@ INSERT INTO debits VALUES(310075,'1_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSf
 -- Triggers and indices on  debits
 CREATE INDEX address_idx ON debits (address);
 CREATE INDEX asset_idx ON debits (asset);
+CREATE INDEX debits_address_asset_block_index_idx ON debits (address, asset, block_index);
+CREATE INDEX debits_address_block_index_idx ON debits (address, block_index);
+CREATE INDEX debits_block_index_idx ON debits (block_index);
 
 -- Table  destructions
 DROP TABLE IF EXISTS destructions;
@@ -444,6 +470,14 @@ CREATE TABLE destructions(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  destructions
 CREATE INDEX status_idx ON destructions (status);
+CREATE TRIGGER supplies_destructions_delete AFTER DELETE ON destructions WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed - old.quantity WHERE asset = old.asset;
+                          END;
+CREATE TRIGGER supplies_destructions_insert AFTER INSERT ON destructions WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed + new.quantity WHERE asset = new.asset;
+                          END;
 
 -- Table  dividends
 DROP TABLE IF EXISTS dividends;
@@ -460,6 +494,14 @@ CREATE TABLE dividends(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO dividends VALUES(10,'2e28d83564e7a67f0b7e9c34653cd7e4ed9b063ce1cd5b102cbbed4001ad7241',310009,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','BBBB','XCP',600,20000,'valid');
 INSERT INTO dividends VALUES(11,'7d57cdc8d7a20c3938c82fb81bdf43878ee0d6f3a70a93098c9f339508abcde8',310010,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','BBBC','XCP',800,20000,'valid');
+-- Triggers and indices on  dividends
+CREATE INDEX dividends_asset_idx ON dividends (asset);
+CREATE TRIGGER supplies_dividends_delete AFTER DELETE ON dividends WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_dividends_insert AFTER INSERT ON dividends WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 
 -- Table  executions
 DROP TABLE IF EXISTS executions;
@@ -502,6 +544,18 @@ CREATE TABLE issuances(
 INSERT INTO issuances VALUES(6,'91182e55e74dfc06bb108545f2aeb827cb812834b125d3c994bed56b291b5216',310005,'BBBB',1000000000,1,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',0,0,0,0.0,'',50000000,0,'valid');
 INSERT INTO issuances VALUES(7,'a2b4ba345a6906fbdb7d9d24bb17e3fac8dc283354127ac3c1d5b38cb602d1a6',310006,'BBBC',100000,0,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',0,1,17,0.015,'foobar',50000000,0,'valid');
 -- Triggers and indices on  issuances
+CREATE INDEX issuances_block_index_idx ON issuances (block_index);
+CREATE INDEX issuances_issuer_idx ON issuances (issuer);
+CREATE TRIGGER supplies_issuances_delete AFTER DELETE ON issuances WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET issued = issued - old.quantity WHERE asset = old.asset;
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_issuances_insert AFTER INSERT ON issuances WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET issued = issued + new.quantity WHERE asset = new.asset;
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 CREATE INDEX valid_asset_idx ON issuances (asset, status);
 
 -- Table  mempool
@@ -512,6 +566,8 @@ CREATE TABLE mempool(
                       category TEXT,
                       bindings TEXT,
                       timestamp INTEGER);
+-- Triggers and indices on  mempool
+CREATE INDEX mempool_tx_hash_idx ON mempool (tx_hash);
 
 -- Table  messages
 DROP TABLE IF EXISTS messages;
@@ -755,6 +811,7 @@ CREATE INDEX expire_idx ON orders (expire_index, status);
 CREATE INDEX give_asset_idx ON orders (give_asset);
 CREATE INDEX give_get_status_idx ON orders (get_asset, give_asset, status);
 CREATE INDEX give_status_idx ON orders (give_asset, status);
+CREATE INDEX orders_block_index_idx ON orders (block_index);
 CREATE INDEX source_give_status_idx ON orders (source, give_asset, status);
 
 -- Table  postqueue
@@ -786,6 +843,7 @@ INSERT INTO rps VALUES(75,'71da68e9b75cbb99814fe92b9412d145461bd3edbe8d117bdf72e
 INSERT INTO rps VALUES(76,'92d92ee63d3e4eb1e51a3672eae30aee6a81672f88da24cc5a18376b88e5af00',310075,'1_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',5,11021665,'6a886d74c2d4b1d7a35fd9159333ef64ba45a04d7aeeeb4538f958603c16fc5d',10,310085,'matched');
 -- Triggers and indices on  rps
 CREATE INDEX matching_idx ON rps (wager, possible_moves);
+CREATE INDEX rps_source_idx ON rps (source);
 
 -- Table  rps_expirations
 DROP TABLE IF EXISTS rps_expirations;
@@ -877,6 +935,8 @@ INSERT INTO sends VALUES(9,'7c450e1966a44985ee04628e29a238ce73d81e0b0c3d8cfcb988
 INSERT INTO sends VALUES(24,'2cfbac01ae9a33a41fc062446bf8b08d85c6ca5082fb3ce9042f3e323999b88d',310023,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','1_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','BBBC',10000,'valid');
 -- Triggers and indices on  sends
 CREATE INDEX destination_idx ON sends (destination);
+CREATE INDEX sends_asset_block_index_idx ON sends (asset, block_index);
+CREATE INDEX sends_block_index_idx ON sends (block_index);
 CREATE INDEX source_idx ON sends (source);
 
 -- Table  storage
@@ -893,6 +953,16 @@ CREATE TABLE suicides(
                       contract_id TEXT PRIMARY KEY,
                       FOREIGN KEY (contract_id) REFERENCES contracts(contract_id));
 
+-- Table  supplies
+DROP TABLE IF EXISTS supplies;
+CREATE TABLE supplies(
+                      asset TEXT PRIMARY KEY,
+                      issued INTEGER,
+                      destroyed INTEGER);
+INSERT INTO supplies VALUES('XCP',149999887262,100040000);
+INSERT INTO supplies VALUES('BBBB',1000000000,0);
+INSERT INTO supplies VALUES('BBBC',100000,0);
+
 -- Table  transactions
 DROP TABLE IF EXISTS transactions;
 CREATE TABLE transactions(
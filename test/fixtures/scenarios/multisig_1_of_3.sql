@@ -33,6 +33,7 @@ INSERT INTO balances VALUES('1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZN
 INSERT INTO balances VALUES('1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','BBBC',7369);
 -- Triggers and indices on  balances
 CREATE INDEX address_asset_idx ON balances (address, asset);
+CREATE INDEX balances_asset_idx ON balances (asset);
 
 -- Table  bet_expirations
 DROP TABLE IF EXISTS bet_expirations;
@@ -106,6 +107,8 @@ INSERT INTO bet_matches VALUES('0e0de93eee84d5b96c696cf0c3d84b6ff1f197fa13718ea3
 INSERT INTO bet_matches VALUES('11bc78cc61d9ca7cb5fec0bbbe04caeae2037a98bf04cf6d3e0f4a7d98f5707d_c5c6127eb0ba121d4b5d9c7e3b372634e32ac8cc4d4299e6ae9233afe43c5460',15,'11bc78cc61d9ca7cb5fec0bbbe04caeae2037a98bf04cf6d3e0f4a7d98f5707d','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',16,'c5c6127eb0ba121d4b5d9c7e3b372634e32ac8cc4d4299e6ae9233afe43c5460','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,1,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',100,1388000100,0.0,5040,150000000,350000000,310014,310015,310015,10,10,310024,5000000,'expired');
 INSERT INTO bet_matches VALUES('274a5b05b135bd9af40c6c9751d837784f53bcc6cf940e87cee449782de9f4e9_f61ffdef0cb63ea09da9458b028d3d73a918a0f2de9d0e6c02d3e765ea15c50c',17,'274a5b05b135bd9af40c6c9751d837784f53bcc6cf940e87cee449782de9f4e9','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',18,'f61ffdef0cb63ea09da9458b028d3d73a918a0f2de9d0e6c02d3e765ea15c50c','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',2,3,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',100,1388000200,1.0,5040,750000000,650000000,310016,310017,310017,10,10,310026,5000000,'expired');
 -- Triggers and indices on  bet_matches
+CREATE INDEX bet_matches_tx0_address_idx ON bet_matches (tx0_address);
+CREATE INDEX bet_matches_tx1_address_idx ON bet_matches (tx1_address);
 CREATE INDEX valid_feed_idx ON bet_matches (feed_address, status);
 
 -- Table  bets
@@ -137,6 +140,7 @@ INSERT INTO bets VALUES(16,'c5c6127eb0ba121d4b5d9c7e3b372634e32ac8cc4d4299e6ae92
 INSERT INTO bets VALUES(17,'274a5b05b135bd9af40c6c9751d837784f53bcc6cf940e87cee449782de9f4e9',310016,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',2,1388000200,750000000,0,650000000,0,1.0,5040,10,310026,5000000,'filled');
 INSERT INTO bets VALUES(18,'f61ffdef0cb63ea09da9458b028d3d73a918a0f2de9d0e6c02d3e765ea15c50c',310017,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',3,1388000200,650000000,0,750000000,0,1.0,5040,10,310027,5000000,'filled');
 -- Triggers and indices on  bets
+CREATE INDEX bets_source_idx ON bets (source);
 CREATE INDEX feed_valid_bettype_idx ON bets (feed_address, status, bet_type);
 
 -- Table  blocks
@@ -291,6 +295,9 @@ CREATE TABLE btcpays(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO btcpays VALUES(5,'6dff822c561bf6ff5504a16e54cc3bd8a591f294fbd7a404ed60e7a7b7524988',310004,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',50000000,'e1c19fef00aa067d54fcd72239999d499470c41f878807bb67e681a03ee61517_9bc459c9d72bcc916e391d7d393cabb21fb3edb9369837452babc6f0e0c9d83d','valid');
+-- Triggers and indices on  btcpays
+CREATE INDEX btcpays_destination_idx ON btcpays (destination);
+CREATE INDEX btcpays_source_idx ON btcpays (source);
 
 -- Table  burns
 DROP TABLE IF EXISTS burns;
@@ -305,6 +312,14 @@ CREATE TABLE burns(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO burns VALUES(1,'37f2ff45d34097306c63d4cbb9699354bd6ab9cac6cc362eb8be563de3e74981',310000,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',62000000,93000000000,'valid');
 INSERT INTO burns VALUES(23,'5b1c6a89eb129c3193bc6c6e2876f9e5aaff3c65ef58d591fe743a5a59a51e94',310022,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',38000000,56999887262,'valid');
+-- Triggers and indices on  burns
+CREATE INDEX burns_source_idx ON burns (source);
+CREATE TRIGGER supplies_burns_delete AFTER DELETE ON burns WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued - old.earned WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_burns_insert AFTER INSERT ON burns WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued + new.earned WHERE asset = 'XCP';
+                          END;
 
 -- Table  callbacks
 DROP TABLE IF EXISTS callbacks;
@@ -318,6 +333,8 @@ CREATE TABLE callbacks(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO callbacks VALUES(25,'cebab375e734a3b5d87afba9bbcd2d772b0e54fb090f0fc661dc4edab3ed32c4',310024,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','0.3','BBBC','valid');
+-- Triggers and indices on  callbacks
+CREATE INDEX callbacks_asset_idx ON callbacks (asset);
 
 -- Table  cancels
 DROP TABLE IF EXISTS cancels;
@@ -331,6 +348,7 @@ CREATE TABLE cancels(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  cancels
 CREATE INDEX cancels_block_index_idx ON cancels (block_index);
+CREATE INDEX cancels_source_idx ON cancels (source);
 
 -- Table  contracts
 DROP TABLE IF EXISTS contracts;
@@ -388,6 +406,11 @@ INSERT INTO credits VALUES(310040,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmdd
 INSERT INTO credits VALUES(310069,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','XCP',11021664,'recredit wager','fe664cc9870b852ebe839f88a46e0353f3ec3be2f9f27aa1440db4ef778d27ee_91d4b39c005c0a8fb88e55a54f458ea63689a82c0cc205788daaf737e068e0cb');
 INSERT INTO credits VALUES(310069,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','XCP',11021664,'recredit wager','fe664cc9870b852ebe839f88a46e0353f3ec3be2f9f27aa1440db4ef778d27ee_91d4b39c005c0a8fb88e55a54f458ea63689a82c0cc205788daaf737e068e0cb');
 INSERT INTO credits VALUES(310096,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','XCP',22043330,'wins','448a55b6dcfe60bc7d3b3af156d783e084d035e81bcac810185943de4e78e8c8_324aab8528a27eb4c22fce5b7c94a7cd352dae783cf971ffeb4574485bfae1da');
+-- Triggers and indices on  credits
+CREATE INDEX credits_address_asset_block_index_idx ON credits (address, asset, block_index);
+CREATE INDEX credits_address_block_index_idx ON credits (address, block_index);
+CREATE INDEX credits_address_idx ON credits (address);
+CREATE INDEX credits_block_index_idx ON credits (block_index);
 
 -- Table  debits
 DROP TABLE IF EXISTS debits;
@@ -429,6 +452,9 @@ INSERT INTO debits VALUES(310075,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddV
 -- Triggers and indices on  debits
 CREATE INDEX address_idx ON debits (address);
 CREATE INDEX asset_idx ON debits (asset);
+CREATE INDEX debits_address_asset_block_index_idx ON debits (address, asset, block_index);
+CREATE INDEX debits_address_block_index_idx ON debits (address, block_index);
+CREATE INDEX debits_block_index_idx ON debits (block_index);
 
 -- Table  destructions
 DROP TABLE IF EXISTS destructions;
@@ -444,6 +470,14 @@ CREATE TABLE destructions(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  destructions
 CREATE INDEX status_idx ON destructions (status);
+CREATE TRIGGER supplies_destructions_delete AFTER DELETE ON destructions WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed - old.quantity WHERE asset = old.asset;
+                          END;
+CREATE TRIGGER supplies_destructions_insert AFTER INSERT ON destructions WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed + new.quantity WHERE asset = new.asset;
+                          END;
 
 -- Table  dividends
 DROP TABLE IF EXISTS dividends;
@@ -460,6 +494,14 @@ CREATE TABLE dividends(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO dividends VALUES(10,'78f94515b5769fa354cbd5b857e48665f1f826ac65eb18c34ad958f85e29a6dd',310009,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','BBBB','XCP',600,20000,'valid');
 INSERT INTO dividends VALUES(11,'25ec88deb553d89c45619a83794e060a76953a7fefbdbba20df4009300c37550',310010,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','BBBC','XCP',800,20000,'valid');
+-- Triggers and indices on  dividends
+CREATE INDEX dividends_asset_idx ON dividends (asset);
+CREATE TRIGGER supplies_dividends_delete AFTER DELETE ON dividends WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_dividends_insert AFTER INSERT ON dividends WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 
 -- Table  executions
 DROP TABLE IF EXISTS executions;
@@ -502,6 +544,18 @@ CREATE TABLE issuances(
 INSERT INTO issuances VALUES(6,'39dc01835ecabc07f3f7390f692dfbf495adfab0f3bedda4ddc6647904c7e719',310005,'BBBB',1000000000,1,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,0,0,0.0,'',50000000,0,'valid');
 INSERT INTO issuances VALUES(7,'4ef24222ee5648ed2f9c55f853d0fa37cd844e80ffdebaf377b7e5ca6ba2fe42',310006,'BBBC',100000,0,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,1,17,0.015,'foobar',50000000,0,'valid');
 -- Triggers and indices on  issuances
+CREATE INDEX issuances_block_index_idx ON issuances (block_index);
+CREATE INDEX issuances_issuer_idx ON issuances (issuer);
+CREATE TRIGGER supplies_issuances_delete AFTER DELETE ON issuances WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET issued = issued - old.quantity WHERE asset = old.asset;
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_issuances_insert AFTER INSERT ON issuances WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET issued = issued + new.quantity WHERE asset = new.asset;
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 CREATE INDEX valid_asset_idx ON issuances (asset, status);
 
 -- Table  mempool
@@ -512,6 +566,8 @@ CREATE TABLE mempool(
                       category TEXT,
                       bindings TEXT,
                       timestamp INTEGER);
+-- Triggers and indices on  mempool
+CREATE INDEX mempool_tx_hash_idx ON mempool (tx_hash);
 
 -- Table  messages
 DROP TABLE IF EXISTS messages;
@@ -755,6 +811,7 @@ CREATE INDEX expire_idx ON orders (expire_index, status);
 CREATE INDEX give_asset_idx ON orders (give_asset);
 CREATE INDEX give_get_status_idx ON orders (get_asset, give_asset, status);
 CREATE INDEX give_status_idx ON orders (give_asset, status);
+CREATE INDEX orders_block_index_idx ON orders (block_index);
 CREATE INDEX source_give_status_idx ON orders (source, give_asset, status);
 
 -- Table  postqueue
@@ -786,6 +843,7 @@ INSERT INTO rps VALUES(75,'448a55b6dcfe60bc7d3b3af156d783e084d035e81bcac81018594
 INSERT INTO rps VALUES(76,'324aab8528a27eb4c22fce5b7c94a7cd352dae783cf971ffeb4574485bfae1da',310075,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3',5,11021665,'6a886d74c2d4b1d7a35fd9159333ef64ba45a04d7aeeeb4538f958603c16fc5d',10,310085,'matched');
 -- Triggers and indices on  rps
 CREATE INDEX matching_idx ON rps (wager, possible_moves);
+CREATE INDEX rps_source_idx ON rps (source);
 
 -- Table  rps_expirations
 DROP TABLE IF EXISTS rps_expirations;
@@ -877,6 +935,8 @@ INSERT INTO sends VALUES(9,'fe27b3bea249061f253b4219793d244dd41448e8ddff7177d304
 INSERT INTO sends VALUES(24,'07fd8a2913753c3ca53cddc3992bf2be36119b23082ba29a8c33192f09131594',310023,'1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','1_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','BBBC',10000,'valid');
 -- Triggers and indices on  sends
 CREATE INDEX destination_idx ON sends (destination);
+CREATE INDEX sends_asset_block_index_idx ON sends (asset, block_index);
+CREATE INDEX sends_block_index_idx ON sends (block_index);
 CREATE INDEX source_idx ON sends (source);
 
 -- Table  storage
@@ -893,6 +953,16 @@ CREATE TABLE suicides(
                       contract_id TEXT PRIMARY KEY,
                       FOREIGN KEY (contract_id) REFERENCES contracts(contract_id));
 
+-- Table  supplies
+DROP TABLE IF EXISTS supplies;
+CREATE TABLE supplies(
+                      asset TEXT PRIMARY KEY,
+                      issued INTEGER,
+                      destroyed INTEGER);
+INSERT INTO supplies VALUES('XCP',149999887262,100040000);
+INSERT INTO supplies VALUES('BBBB',1000000000,0);
+INSERT INTO supplies VALUES('BBBC',100000,0);
+
 -- Table  transactions
 DROP TABLE IF EXISTS transactions;
 CREATE TABLE transactions(
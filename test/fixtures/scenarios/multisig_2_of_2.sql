@@ -33,6 +33,7 @@ INSERT INTO balances VALUES('2_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB
 INSERT INTO balances VALUES('2_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','BBBC',7369);
 -- Triggers and indices on  balances
 CREATE INDEX address_asset_idx ON balances (address, asset);
+CREATE INDEX balances_asset_idx ON balances (asset);
 
 -- Table  bet_expirations
 DROP TABLE IF EXISTS bet_expirations;
@@ -106,6 +107,8 @@ INSERT INTO bet_matches VALUES('6ec162e8abe733631652b93cb00e1dd6417f68b7205d3c54
 INSERT INTO bet_matches VALUES('a7049b5fa97a608a0b3de5d169a12b8a585e94e038ab89852c630744e9b60f36_07113541fb277906296ecf5be57c45bc01545463bf60f2cc144f2de3e467244f',15,'a7049b5fa97a608a0b3de5d169a12b8a585e94e038ab89852c630744e9b60f36','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',16,'07113541fb277906296ecf5be57c45bc01545463bf60f2cc144f2de3e467244f','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',0,1,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',100,1388000100,0.0,5040,150000000,350000000,310014,310015,310015,10,10,310024,5000000,'expired');
 INSERT INTO bet_matches VALUES('f7463c39fdcf70265fc7e3e1e8418086c6cf3cead714121fdb19f240f47c4868_ed19ce43174e2ed120e1c5cd40ed705630c5cbb01ccc36927bbec56de193fad5',17,'f7463c39fdcf70265fc7e3e1e8418086c6cf3cead714121fdb19f240f47c4868','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',18,'ed19ce43174e2ed120e1c5cd40ed705630c5cbb01ccc36927bbec56de193fad5','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',2,3,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',100,1388000200,1.0,5040,750000000,650000000,310016,310017,310017,10,10,310026,5000000,'expired');
 -- Triggers and indices on  bet_matches
+CREATE INDEX bet_matches_tx0_address_idx ON bet_matches (tx0_address);
+CREATE INDEX bet_matches_tx1_address_idx ON bet_matches (tx1_address);
 CREATE INDEX valid_feed_idx ON bet_matches (feed_address, status);
 
 -- Table  bets
@@ -137,6 +140,7 @@ INSERT INTO bets VALUES(16,'07113541fb277906296ecf5be57c45bc01545463bf60f2cc144f
 INSERT INTO bets VALUES(17,'f7463c39fdcf70265fc7e3e1e8418086c6cf3cead714121fdb19f240f47c4868',310016,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',2,1388000200,750000000,0,650000000,0,1.0,5040,10,310026,5000000,'filled');
 INSERT INTO bets VALUES(18,'ed19ce43174e2ed120e1c5cd40ed705630c5cbb01ccc36927bbec56de193fad5',310017,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',3,1388000200,650000000,0,750000000,0,1.0,5040,10,310027,5000000,'filled');
 -- Triggers and indices on  bets
+CREATE INDEX bets_source_idx ON bets (source);
 CREATE INDEX feed_valid_bettype_idx ON bets (feed_address, status, bet_type);
 
 -- Table  blocks
@@ -291,6 +295,9 @@ CREATE TABLE btcpays(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO btcpays VALUES(5,'0becc70a783b2f5e985ee0fca248152608cae01aa3400cb64f0b31a745b5221c',310004,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',50000000,'21553a43dab2c64ea38eebb4bb68406adabe478ab682a4c57f3f9c38325d4fc7_dabd54da622c526e5e0114734a216530219588c48fde8a2f2b3bf2eb52f4e643','valid');
+-- Triggers and indices on  btcpays
+CREATE INDEX btcpays_destination_idx ON btcpays (destination);
+CREATE INDEX btcpays_source_idx ON btcpays (source);
 
 -- Table  burns
 DROP TABLE IF EXISTS burns;
@@ -305,6 +312,14 @@ CREATE TABLE burns(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO burns VALUES(1,'baf568fd33ac5ee3efa137cd8f9a030a339889a96834134f9e99815447d2c2f6',310000,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',62000000,93000000000,'valid');
 INSERT INTO burns VALUES(23,'702e60afb8f29d914c6d06d44f1e15be1d872c73d0796fe9d29dd5c45b31a5c4',310022,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',38000000,56999887262,'valid');
+-- Triggers and indices on  burns
+CREATE INDEX burns_source_idx ON burns (source);
+CREATE TRIGGER supplies_burns_delete AFTER DELETE ON burns WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued - old.earned WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_burns_insert AFTER INSERT ON burns WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued + new.earned WHERE asset = 'XCP';
+                          END;
 
 -- Table  callbacks
 DROP TABLE IF EXISTS callbacks;
@@ -318,6 +333,8 @@ CREATE TABLE callbacks(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO callbacks VALUES(25,'33b83418204fdcff0b02f1e091af0ccaa05155304e75c11789b86ce3d9fd06c7',310024,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','0.3','BBBC','valid');
+-- Triggers and indices on  callbacks
+CREATE INDEX callbacks_asset_idx ON callbacks (asset);
 
 -- Table  cancels
 DROP TABLE IF EXISTS cancels;
@@ -331,6 +348,7 @@ CREATE TABLE cancels(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  cancels
 CREATE INDEX cancels_block_index_idx ON cancels (block_index);
+CREATE INDEX cancels_source_idx ON cancels (source);
 
 -- Table  contracts
 DROP TABLE IF EXISTS contracts;
@@ -388,6 +406,11 @@ INSERT INTO credits VALUES(310040,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaS
 INSERT INTO credits VALUES(310069,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','XCP',11021664,'recredit wager','326661638941b1257f431958003ab752c079dfe57c6d39723bc5de8b1d61b7d7_40972b9d7b1066384bc24dc7299202ed9a36a3a460eac8e4cc9a8305176cfa97');
 INSERT INTO credits VALUES(310069,'2_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','XCP',11021664,'recredit wager','326661638941b1257f431958003ab752c079dfe57c6d39723bc5de8b1d61b7d7_40972b9d7b1066384bc24dc7299202ed9a36a3a460eac8e4cc9a8305176cfa97');
 INSERT INTO credits VALUES(310096,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','XCP',22043330,'wins','c16a90462b02a2cbc36fe7f6c2a646797e975e2acbef1e2ea2a3d31ed0d08a8e_752e0181ee100e92c4cad221a3110a292ce8673016d86ae60f050f64a192b134');
+-- Triggers and indices on  credits
+CREATE INDEX credits_address_asset_block_index_idx ON credits (address, asset, block_index);
+CREATE INDEX credits_address_block_index_idx ON credits (address, block_index);
+CREATE INDEX credits_address_idx ON credits (address);
+CREATE INDEX credits_block_index_idx ON credits (block_index);
 
 -- Table  debits
 DROP TABLE IF EXISTS debits;
@@ -429,6 +452,9 @@ INSERT INTO debits VALUES(310075,'2_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSf
 -- Triggers and indices on  debits
 CREATE INDEX address_idx ON debits (address);
 CREATE INDEX asset_idx ON debits (asset);
+CREATE INDEX debits_address_asset_block_index_idx ON debits (address, asset, block_index);
+CREATE INDEX debits_address_block_index_idx ON debits (address, block_index);
+CREATE INDEX debits_block_index_idx ON debits (block_index);
 
 -- Table  destructions
 DROP TABLE IF EXISTS destructions;
@@ -444,6 +470,14 @@ CREATE TABLE destructions(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  destructions
 CREATE INDEX status_idx ON destructions (status);
+CREATE TRIGGER supplies_destructions_delete AFTER DELETE ON destructions WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed - old.quantity WHERE asset = old.asset;
+                          END;
+CREATE TRIGGER supplies_destructions_insert AFTER INSERT ON destructions WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed + new.quantity WHERE asset = new.asset;
+                          END;
 
 -- Table  dividends
 DROP TABLE IF EXISTS dividends;
@@ -460,6 +494,14 @@ CREATE TABLE dividends(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO dividends VALUES(10,'606a0e1142b6dc559439d3a7a760ecd1e30fea5b8cd2fa08c9af89117809d41f',310009,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','BBBB','XCP',600,20000,'valid');
 INSERT INTO dividends VALUES(11,'09fc25f258bd33ae01db6e823c084de00790dd74ef89b964e7f3432bff0f83fb',310010,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','BBBC','XCP',800,20000,'valid');
+-- Triggers and indices on  dividends
+CREATE INDEX dividends_asset_idx ON dividends (asset);
+CREATE TRIGGER supplies_dividends_delete AFTER DELETE ON dividends WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_dividends_insert AFTER INSERT ON dividends WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 
 -- Table  executions
 DROP TABLE IF EXISTS executions;
@@ -502,6 +544,18 @@ CREATE TABLE issuances(
 INSERT INTO issuances VALUES(6,'097b59f4e505d7d5013b9656106223be410d094b06f8d8d20774e70b1e70ed70',310005,'BBBB',1000000000,1,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',0,0,0,0.0,'',50000000,0,'valid');
 INSERT INTO issuances VALUES(7,'5e9b8db15e088c8c7cd069dc6f608d1575cbca98a5f5a686ed1836bb8e5df3fe',310006,'BBBC',100000,0,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',0,1,17,0.015,'foobar',50000000,0,'valid');
 -- Triggers and indices on  issuances
+CREATE INDEX issuances_block_index_idx ON issuances (block_index);
+CREATE INDEX issuances_issuer_idx ON issuances (issuer);
+CREATE TRIGGER supplies_issuances_delete AFTER DELETE ON issuances WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET issued = issued - old.quantity WHERE asset = old.asset;
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_issuances_insert AFTER INSERT ON issuances WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET issued = issued + new.quantity WHERE asset = new.asset;
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 CREATE INDEX valid_asset_idx ON issuances (asset, status);
 
 -- Table  mempool
@@ -512,6 +566,8 @@ CREATE TABLE mempool(
                       category TEXT,
                       bindings TEXT,
                       timestamp INTEGER);
+-- Triggers and indices on  mempool
+CREATE INDEX mempool_tx_hash_idx ON mempool (tx_hash);
 
 -- Table  messages
 DROP TABLE IF EXISTS messages;
@@ -755,6 +811,7 @@ CREATE INDEX expire_idx ON orders (expire_index, status);
 CREATE INDEX give_asset_idx ON orders (give_asset);
 CREATE INDEX give_get_status_idx ON orders (get_asset, give_asset, status);
 CREATE INDEX give_status_idx ON orders (give_asset, status);
+CREATE INDEX orders_block_index_idx ON orders (block_index);
 CREATE INDEX source_give_status_idx ON orders (source, give_asset, status);
 
 -- Table  postqueue
@@ -786,6 +843,7 @@ INSERT INTO rps VALUES(75,'c16a90462b02a2cbc36fe7f6c2a646797e975e2acbef1e2ea2a3d
 INSERT INTO rps VALUES(76,'752e0181ee100e92c4cad221a3110a292ce8673016d86ae60f050f64a192b134',310075,'2_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2',5,11021665,'6a886d74c2d4b1d7a35fd9159333ef64ba45a04d7aeeeb4538f958603c16fc5d',10,310085,'matched');
 -- Triggers and indices on  rps
 CREATE INDEX matching_idx ON rps (wager, possible_moves);
+CREATE INDEX rps_source_idx ON rps (source);
 
 -- Table  rps_expirations
 DROP TABLE IF EXISTS rps_expirations;
@@ -877,6 +935,8 @@ INSERT INTO sends VALUES(9,'0d1d40de06a2f09339b68f6e2ee973f07b44530b2ec95012be24
 INSERT INTO sends VALUES(24,'80a30ebcb3366a99961ce3f1f20ce3a66252cb534158154776832d6dac72174b',310023,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','2_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_2','BBBC',10000,'valid');
 -- Triggers and indices on  sends
 CREATE INDEX destination_idx ON sends (destination);
+CREATE INDEX sends_asset_block_index_idx ON sends (asset, block_index);
+CREATE INDEX sends_block_index_idx ON sends (block_index);
 CREATE INDEX source_idx ON sends (source);
 
 -- Table  storage
@@ -893,6 +953,16 @@ CREATE TABLE suicides(
                       contract_id TEXT PRIMARY KEY,
                       FOREIGN KEY (contract_id) REFERENCES contracts(contract_id));
 
+-- Table  supplies
+DROP TABLE IF EXISTS supplies;
+CREATE TABLE supplies(
+                      asset TEXT PRIMARY KEY,
+                      issued INTEGER,
+                      destroyed INTEGER);
+INSERT INTO supplies VALUES('XCP',149999887262,100040000);
+INSERT INTO supplies VALUES('BBBB',1000000000,0);
+INSERT INTO supplies VALUES('BBBC',100000,0);
+
 -- Table  transactions
 DROP TABLE IF EXISTS transactions;
 CREATE TABLE transactions(
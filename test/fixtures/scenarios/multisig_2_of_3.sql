@@ -33,6 +33,7 @@ INSERT INTO balances VALUES('2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZN
 INSERT INTO balances VALUES('2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','BBBC',7369);
 -- Triggers and indices on  balances
 CREATE INDEX address_asset_idx ON balances (address, asset);
+CREATE INDEX balances_asset_idx ON balances (asset);
 
 -- Table  bet_expirations
 DROP TABLE IF EXISTS bet_expirations;
@@ -106,6 +107,8 @@ INSERT INTO bet_matches VALUES('3c721f1d55d6bb3422daea418e5a00b5dbc373df6ef1bbe3
 INSERT INTO bet_matches VALUES('c3d4f3c3bcf02d2146e1ab76437001b1c406f54f603979dbe66d97ba9f59e540_7ea4bcba4018b3b01789aa88489287e6ba8bb5ca13c75880895a8560e35531df',15,'c3d4f3c3bcf02d2146e1ab76437001b1c406f54f603979dbe66d97ba9f59e540','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',16,'7ea4bcba4018b3b01789aa88489287e6ba8bb5ca13c75880895a8560e35531df','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,1,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',100,1388000100,0.0,5040,150000000,350000000,310014,310015,310015,10,10,310024,5000000,'expired');
 INSERT INTO bet_matches VALUES('90196b0aea00ba6b2b83fc709fcd7efbb6708b4d7073b3ec4d5916e2325bf2b5_a0cdb36577e8b47fb08cf7c5bee2fcaac9f41eb34859b2ccca34e9ae673aa7ca',17,'90196b0aea00ba6b2b83fc709fcd7efbb6708b4d7073b3ec4d5916e2325bf2b5','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',18,'a0cdb36577e8b47fb08cf7c5bee2fcaac9f41eb34859b2ccca34e9ae673aa7ca','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',2,3,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',100,1388000200,1.0,5040,750000000,650000000,310016,310017,310017,10,10,310026,5000000,'expired');
 -- Triggers and indices on  bet_matches
+CREATE INDEX bet_matches_tx0_address_idx ON bet_matches (tx0_address);
+CREATE INDEX bet_matches_tx1_address_idx ON bet_matches (tx1_address);
 CREATE INDEX valid_feed_idx ON bet_matches (feed_address, status);
 
 -- Table  bets
@@ -137,6 +140,7 @@ INSERT INTO bets VALUES(16,'7ea4bcba4018b3b01789aa88489287e6ba8bb5ca13c75880895a
 INSERT INTO bets VALUES(17,'90196b0aea00ba6b2b83fc709fcd7efbb6708b4d7073b3ec4d5916e2325bf2b5',310016,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',2,1388000200,750000000,0,650000000,0,1.0,5040,10,310026,5000000,'filled');
 INSERT INTO bets VALUES(18,'a0cdb36577e8b47fb08cf7c5bee2fcaac9f41eb34859b2ccca34e9ae673aa7ca',310017,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',3,1388000200,650000000,0,750000000,0,1.0,5040,10,310027,5000000,'filled');
 -- Triggers and indices on  bets
+CREATE INDEX bets_source_idx ON bets (source);
 CREATE INDEX feed_valid_bettype_idx ON bets (feed_address, status, bet_type);
 
 -- Table  blocks
@@ -291,6 +295,9 @@ CREATE TABLE btcpays(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO btcpays VALUES(5,'5d1094e6926710beba0f2977f8a2ff69db00f732006df421669c7110af837f78',310004,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',50000000,'b898ed7f73ba34981adde222bf27498f66f352254817b0f4d07156a62b387e86_bc36229a30165dd3d5f927646292fa4b1b024c50ed3490ce578946020f4f29ed','valid');
+-- Triggers and indices on  btcpays
+CREATE INDEX btcpays_destination_idx ON btcpays (destination);
+CREATE INDEX btcpays_source_idx ON btcpays (source);
 
 -- Table  burns
 DROP TABLE IF EXISTS burns;
@@ -305,6 +312,14 @@ CREATE TABLE burns(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO burns VALUES(1,'724e5f8f5ffdafe0af9a0dd91151d4db4168c7bc924f8cc63ce07b6edc9e1f6f',310000,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',62000000,93000000000,'valid');
 INSERT INTO burns VALUES(23,'772fe56e3315640fa7c29c6518724801dbd11c0ae3305734d5ad9787fba0580a',310022,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',38000000,56999887262,'valid');
+-- Triggers and indices on  burns
+CREATE INDEX burns_source_idx ON burns (source);
+CREATE TRIGGER supplies_burns_delete AFTER DELETE ON burns WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued - old.earned WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_burns_insert AFTER INSERT ON burns WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued + new.earned WHERE asset = 'XCP';
+                          END;
 
 -- Table  callbacks
 DROP TABLE IF EXISTS callbacks;
@@ -318,6 +333,8 @@ CREATE TABLE callbacks(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO callbacks VALUES(25,'2451efc738f54dcd7ecf316a92d573f0352e9e03a8e6b0eeba95d9718355d5be',310024,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','0.3','BBBC','valid');
+-- Triggers and indices on  callbacks
+CREATE INDEX callbacks_asset_idx ON callbacks (asset);
 
 -- Table  cancels
 DROP TABLE IF EXISTS cancels;
@@ -331,6 +348,7 @@ CREATE TABLE cancels(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  cancels
 CREATE INDEX cancels_block_index_idx ON cancels (block_index);
+CREATE INDEX cancels_source_idx ON cancels (source);
 
 -- Table  contracts
 DROP TABLE IF EXISTS contracts;
@@ -388,6 +406,11 @@ INSERT INTO credits VALUES(310040,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmdd
 INSERT INTO credits VALUES(310069,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','XCP',11021664,'recredit wager','429e8398bff13971315c5fc738ed798797db4541cb87606ad65e24afb62335ea_0c8835870bf2929b60aaafe5c0b7962d0476977638bd564f84e6b3ed73fb194b');
 INSERT INTO credits VALUES(310069,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','XCP',11021664,'recredit wager','429e8398bff13971315c5fc738ed798797db4541cb87606ad65e24afb62335ea_0c8835870bf2929b60aaafe5c0b7962d0476977638bd564f84e6b3ed73fb194b');
 INSERT INTO credits VALUES(310096,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','XCP',22043330,'wins','8dd0a5f27bcb77b5b3f9de3ab2bdb826d6d068e18d0d84e70d72ab24f96537be_ce5b732f98efdc6dd02355f406b521801b1cbe75739f5137217f9deed2419b85');
+-- Triggers and indices on  credits
+CREATE INDEX credits_address_asset_block_index_idx ON credits (address, asset, block_index);
+CREATE INDEX credits_address_block_index_idx ON credits (address, block_index);
+CREATE INDEX credits_address_idx ON credits (address);
+CREATE INDEX credits_block_index_idx ON credits (block_index);
 
 -- Table  debits
 DROP TABLE IF EXISTS debits;
@@ -429,6 +452,9 @@ INSERT INTO debits VALUES(310075,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddV
 -- Triggers and indices on  debits
 CREATE INDEX address_idx ON debits (address);
 CREATE INDEX asset_idx ON debits (asset);
+CREATE INDEX debits_address_asset_block_index_idx ON debits (address, asset, block_index);
+CREATE INDEX debits_address_block_index_idx ON debits (address, block_index);
+CREATE INDEX debits_block_index_idx ON debits (block_index);
 
 -- Table  destructions
 DROP TABLE IF EXISTS destructions;
@@ -444,6 +470,14 @@ CREATE TABLE destructions(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  destructions
 CREATE INDEX status_idx ON destructions (status);
+CREATE TRIGGER supplies_destructions_delete AFTER DELETE ON destructions WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed - old.quantity WHERE asset = old.asset;
+                          END;
+CREATE TRIGGER supplies_destructions_insert AFTER INSERT ON destructions WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed + new.quantity WHERE asset = new.asset;
+                          END;
 
 -- Table  dividends
 DROP TABLE IF EXISTS dividends;
@@ -460,6 +494,14 @@ CREATE TABLE dividends(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO dividends VALUES(10,'5e6f43d92fc0babe165d1ab0bb353702b863f4621666c08adae8860eb7a52650',310009,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','BBBB','XCP',600,20000,'valid');
 INSERT INTO dividends VALUES(11,'c4b27c35656dd09aa90682281ee17f707efd2c93ad1c2418af1d9607b26d700c',310010,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','BBBC','XCP',800,20000,'valid');
+-- Triggers and indices on  dividends
+CREATE INDEX dividends_asset_idx ON dividends (asset);
+CREATE TRIGGER supplies_dividends_delete AFTER DELETE ON dividends WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_dividends_insert AFTER INSERT ON dividends WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 
 -- Table  executions
 DROP TABLE IF EXISTS executions;
@@ -502,6 +544,18 @@ CREATE TABLE issuances(
 INSERT INTO issuances VALUES(6,'909e8134d366b0dc29e0284c4106911fa1c387abac07515329a14c290cf92226',310005,'BBBB',1000000000,1,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,0,0,0.0,'',50000000,0,'valid');
 INSERT INTO issuances VALUES(7,'08eebac7ba1030617c7773b96aaa838a012c2003a8306889a16fbe3359860aa9',310006,'BBBC',100000,0,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,1,17,0.015,'foobar',50000000,0,'valid');
 -- Triggers and indices on  issuances
+CREATE INDEX issuances_block_index_idx ON issuances (block_index);
+CREATE INDEX issuances_issuer_idx ON issuances (issuer);
+CREATE TRIGGER supplies_issuances_delete AFTER DELETE ON issuances WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET issued = issued - old.quantity WHERE asset = old.asset;
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_issuances_insert AFTER INSERT ON issuances WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET issued = issued + new.quantity WHERE asset = new.asset;
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 CREATE INDEX valid_asset_idx ON issuances (asset, status);
 
 -- Table  mempool
@@ -512,6 +566,8 @@ CREATE TABLE mempool(
                       category TEXT,
                       bindings TEXT,
                       timestamp INTEGER);
+-- Triggers and indices on  mempool
+CREATE INDEX mempool_tx_hash_idx ON mempool (tx_hash);
 
 -- Table  messages
 DROP TABLE IF EXISTS messages;
@@ -755,6 +811,7 @@ CREATE INDEX expire_idx ON orders (expire_index, status);
 CREATE INDEX give_asset_idx ON orders (give_asset);
 CREATE INDEX give_get_status_idx ON orders (get_asset, give_asset, status);
 CREATE INDEX give_status_idx ON orders (give_asset, status);
+CREATE INDEX orders_block_index_idx ON orders (block_index);
 CREATE INDEX source_give_status_idx ON orders (source, give_asset, status);
 
 -- Table  postqueue
@@ -786,6 +843,7 @@ INSERT INTO rps VALUES(75,'8dd0a5f27bcb77b5b3f9de3ab2bdb826d6d068e18d0d84e70d72a
 INSERT INTO rps VALUES(76,'ce5b732f98efdc6dd02355f406b521801b1cbe75739f5137217f9deed2419b85',310075,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3',5,11021665,'6a886d74c2d4b1d7a35fd9159333ef64ba45a04d7aeeeb4538f958603c16fc5d',10,310085,'matched');
 -- Triggers and indices on  rps
 CREATE INDEX matching_idx ON rps (wager, possible_moves);
+CREATE INDEX rps_source_idx ON rps (source);
 
 -- Table  rps_expirations
 DROP TABLE IF EXISTS rps_expirations;
@@ -877,6 +935,8 @@ INSERT INTO sends VALUES(9,'366eadd909699c9a9bc129566585c0a5c7fbc8a6f0e9672a1819
 INSERT INTO sends VALUES(24,'427871f2546358fef869b5201c154b33f3c18e8d8f6ab901dfc517f73cad2513',310023,'2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','2_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','BBBC',10000,'valid');
 -- Triggers and indices on  sends
 CREATE INDEX destination_idx ON sends (destination);
+CREATE INDEX sends_asset_block_index_idx ON sends (asset, block_index);
+CREATE INDEX sends_block_index_idx ON sends (block_index);
 CREATE INDEX source_idx ON sends (source);
 
 -- Table  storage
@@ -893,6 +953,16 @@ CREATE TABLE suicides(
                       contract_id TEXT PRIMARY KEY,
                       FOREIGN KEY (contract_id) REFERENCES contracts(contract_id));
 
+-- Table  supplies
+DROP TABLE IF EXISTS supplies;
+CREATE TABLE supplies(
+                      asset TEXT PRIMARY KEY,
+                      issued INTEGER,
+                      destroyed INTEGER);
+INSERT INTO supplies VALUES('XCP',149999887262,100040000);
+INSERT INTO supplies VALUES('BBBB',1000000000,0);
+INSERT INTO supplies VALUES('BBBC',100000,0);
+
 -- Table  transactions
 DROP TABLE IF EXISTS transactions;
 CREATE TABLE transactions(
@@ -33,6 +33,7 @@ INSERT INTO balances VALUES('3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZN
 INSERT INTO balances VALUES('3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','BBBC',7369);
 -- Triggers and indices on  balances
 CREATE INDEX address_asset_idx ON balances (address, asset);
+CREATE INDEX balances_asset_idx ON balances (asset);
 
 -- Table  bet_expirations
 DROP TABLE IF EXISTS bet_expirations;
@@ -106,6 +107,8 @@ INSERT INTO bet_matches VALUES('474650e2d71f27d520c184db31965379c2ae2affe1be9224
 INSERT INTO bet_matches VALUES('71fe2222b0f725e5b85733eaf21827fb072770962e82205315051dc9e6dcbefb_836ee84d52af92779eadc29cb60f73a6476d086bc1e578b690e0a2bb847f15c5',15,'71fe2222b0f725e5b85733eaf21827fb072770962e82205315051dc9e6dcbefb','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',16,'836ee84d52af92779eadc29cb60f73a6476d086bc1e578b690e0a2bb847f15c5','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,1,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',100,1388000100,0.0,5040,150000000,350000000,310014,310015,310015,10,10,310024,5000000,'expired');
 INSERT INTO bet_matches VALUES('39351adb4fef0d137d9ba7f04f1217c2d4af94462072ccc09391effac4cfc12b_0e6f27447aa52690c52831281a9b7f3d1fb9396da2671b31e6c9aa630a6958e0',17,'39351adb4fef0d137d9ba7f04f1217c2d4af94462072ccc09391effac4cfc12b','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',18,'0e6f27447aa52690c52831281a9b7f3d1fb9396da2671b31e6c9aa630a6958e0','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',2,3,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',100,1388000200,1.0,5040,750000000,650000000,310016,310017,310017,10,10,310026,5000000,'expired');
 -- Triggers and indices on  bet_matches
+CREATE INDEX bet_matches_tx0_address_idx ON bet_matches (tx0_address);
+CREATE INDEX bet_matches_tx1_address_idx ON bet_matches (tx1_address);
 CREATE INDEX valid_feed_idx ON bet_matches (feed_address, status);
 
 -- Table  bets
@@ -137,6 +140,7 @@ INSERT INTO bets VALUES(16,'836ee84d52af92779eadc29cb60f73a6476d086bc1e578b690e0
 INSERT INTO bets VALUES(17,'39351adb4fef0d137d9ba7f04f1217c2d4af94462072ccc09391effac4cfc12b',310016,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',2,1388000200,750000000,0,650000000,0,1.0,5040,10,310026,5000000,'filled');
 INSERT INTO bets VALUES(18,'0e6f27447aa52690c52831281a9b7f3d1fb9396da2671b31e6c9aa630a6958e0',310017,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',3,1388000200,650000000,0,750000000,0,1.0,5040,10,310027,5000000,'filled');
 -- Triggers and indices on  bets
+CREATE INDEX bets_source_idx ON bets (source);
 CREATE INDEX feed_valid_bettype_idx ON bets (feed_address, status, bet_type);
 
 -- Table  blocks
@@ -291,6 +295,9 @@ CREATE TABLE btcpays(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO btcpays VALUES(5,'76e0c3747a1537888c0e2b55b6c4b04b7a0bf8a2c616cd48687139b589ed6151',310004,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',50000000,'17500c776ecb9d1aad1cfa0407e2248c890537934132bb6ec52970c3530a157b_89e7f3ea3c4c7bb01ac12d4b4eb8583e8d5351f7d03cf2221c194d324c3ce345','valid');
+-- Triggers and indices on  btcpays
+CREATE INDEX btcpays_destination_idx ON btcpays (destination);
+CREATE INDEX btcpays_source_idx ON btcpays (source);
 
 -- Table  burns
 DROP TABLE IF EXISTS burns;
@@ -305,6 +312,14 @@ CREATE TABLE burns(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO burns VALUES(1,'e99914fcf580f8705559fce8796ffa216d4a3aef2abc95783df5cabea2f0966b',310000,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',62000000,93000000000,'valid');
 INSERT INTO burns VALUES(23,'c56318d85bacc3e96b131ebc4a914d12fa09f2a516b090f04b2f7a1085c1d53f',310022,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',38000000,56999887262,'valid');
+-- Triggers and indices on  burns
+CREATE INDEX burns_source_idx ON burns (source);
+CREATE TRIGGER supplies_burns_delete AFTER DELETE ON burns WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued - old.earned WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_burns_insert AFTER INSERT ON burns WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET issued = issued + new.earned WHERE asset = 'XCP';
+                          END;
 
 -- Table  callbacks
 DROP TABLE IF EXISTS callbacks;
@@ -318,6 +333,8 @@ CREATE TABLE callbacks(
                       status TEXT,
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO callbacks VALUES(25,'ce53d3596a8b8e32c9aa58cbbc3ad7599a16598325e91a49b03961e3a752d133',310024,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','0.3','BBBC','valid');
+-- Triggers and indices on  callbacks
+CREATE INDEX callbacks_asset_idx ON callbacks (asset);
 
 -- Table  cancels
 DROP TABLE IF EXISTS cancels;
@@ -331,6 +348,7 @@ CREATE TABLE cancels(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  cancels
 CREATE INDEX cancels_block_index_idx ON cancels (block_index);
+CREATE INDEX cancels_source_idx ON cancels (source);
 
 -- Table  contracts
 DROP TABLE IF EXISTS contracts;
@@ -388,6 +406,11 @@ INSERT INTO credits VALUES(310040,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmdd
 INSERT INTO credits VALUES(310069,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','XCP',11021664,'recredit wager','5b66069a7dcea8ecdc4972f162d55421ece30249c74b10f7f7845e0be1bb53df_31ff283f9ec1a56b83e18dd5ec8973b6de9b168e7ed2e0ce89c34f5fefd37fb7');
 INSERT INTO credits VALUES(310069,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','XCP',11021664,'recredit wager','5b66069a7dcea8ecdc4972f162d55421ece30249c74b10f7f7845e0be1bb53df_31ff283f9ec1a56b83e18dd5ec8973b6de9b168e7ed2e0ce89c34f5fefd37fb7');
 INSERT INTO credits VALUES(310096,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','XCP',22043330,'wins','6201956b04ed01203fa7b204e1481268e4ac96910a504b4efad382357c6bf18f_d04c381ebded6c49c4e5a0f0b1746d61fb4dcd45c8dc280b29f7a0afa7a7eedc');
+-- Triggers and indices on  credits
+CREATE INDEX credits_address_asset_block_index_idx ON credits (address, asset, block_index);
+CREATE INDEX credits_address_block_index_idx ON credits (address, block_index);
+CREATE INDEX credits_address_idx ON credits (address);
+CREATE INDEX credits_block_index_idx ON credits (block_index);
 
 -- Table  debits
 DROP TABLE IF EXISTS debits;
@@ -429,6 +452,9 @@ INSERT INTO debits VALUES(310075,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddV
 -- Triggers and indices on  debits
 CREATE INDEX address_idx ON debits (address);
 CREATE INDEX asset_idx ON debits (asset);
+CREATE INDEX debits_address_asset_block_index_idx ON debits (address, asset, block_index);
+CREATE INDEX debits_address_block_index_idx ON debits (address, block_index);
+CREATE INDEX debits_block_index_idx ON debits (block_index);
 
 -- Table  destructions
 DROP TABLE IF EXISTS destructions;
@@ -444,6 +470,14 @@ CREATE TABLE destructions(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 -- Triggers and indices on  destructions
 CREATE INDEX status_idx ON destructions (status);
+CREATE TRIGGER supplies_destructions_delete AFTER DELETE ON destructions WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed - old.quantity WHERE asset = old.asset;
+                          END;
+CREATE TRIGGER supplies_destructions_insert AFTER INSERT ON destructions WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET destroyed = destroyed + new.quantity WHERE asset = new.asset;
+                          END;
 
 -- Table  dividends
 DROP TABLE IF EXISTS dividends;
@@ -460,6 +494,14 @@ CREATE TABLE dividends(
                       FOREIGN KEY (tx_index, tx_hash, block_index) REFERENCES transactions(tx_index, tx_hash, block_index));
 INSERT INTO dividends VALUES(10,'5e2e7a2b1d5348a5d53e3dd031190448091a67f0ba8e84175de2de2be6192845',310009,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','BBBB','XCP',600,20000,'valid');
 INSERT INTO dividends VALUES(11,'74fb6e695c2769d8a2a0ce715a9d70138eed6887b0ebb9919b402b034ee4e54b',310010,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','BBBC','XCP',800,20000,'valid');
+-- Triggers and indices on  dividends
+CREATE INDEX dividends_asset_idx ON dividends (asset);
+CREATE TRIGGER supplies_dividends_delete AFTER DELETE ON dividends WHEN old.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_dividends_insert AFTER INSERT ON dividends WHEN new.status = 'valid' BEGIN
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 
 -- Table  executions
 DROP TABLE IF EXISTS executions;
@@ -502,6 +544,18 @@ CREATE TABLE issuances(
 INSERT INTO issuances VALUES(6,'44eb0557f8ce3d042d0e3fe0b0a0db98b12ffa20a95d3c17012a042583ecf60c',310005,'BBBB',1000000000,1,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,0,0,0.0,'',50000000,0,'valid');
 INSERT INTO issuances VALUES(7,'141c41876e122517c87eaf5b7918ce731d191aa06f80669d656faba13a4ecd15',310006,'BBBC',100000,0,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3',0,1,17,0.015,'foobar',50000000,0,'valid');
 -- Triggers and indices on  issuances
+CREATE INDEX issuances_block_index_idx ON issuances (block_index);
+CREATE INDEX issuances_issuer_idx ON issuances (issuer);
+CREATE TRIGGER supplies_issuances_delete AFTER DELETE ON issuances WHEN old.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(old.asset, 0, 0);
+                            UPDATE supplies SET issued = issued - old.quantity WHERE asset = old.asset;
+                            UPDATE supplies SET destroyed = destroyed - old.fee_paid WHERE asset = 'XCP';
+                          END;
+CREATE TRIGGER supplies_issuances_insert AFTER INSERT ON issuances WHEN new.status = 'valid' BEGIN
+                            INSERT OR IGNORE INTO supplies VALUES(new.asset, 0, 0);
+                            UPDATE supplies SET issued = issued + new.quantity WHERE asset = new.asset;
+                            UPDATE supplies SET destroyed = destroyed + new.fee_paid WHERE asset = 'XCP';
+                          END;
 CREATE INDEX valid_asset_idx ON issuances (asset, status);
 
 -- Table  mempool
@@ -512,6 +566,8 @@ CREATE TABLE mempool(
                       category TEXT,
                       bindings TEXT,
                       timestamp INTEGER);
+-- Triggers and indices on  mempool
+CREATE INDEX mempool_tx_hash_idx ON mempool (tx_hash);
 
 -- Table  messages
 DROP TABLE IF EXISTS messages;
@@ -755,6 +811,7 @@ CREATE INDEX expire_idx ON orders (expire_index, status);
 CREATE INDEX give_asset_idx ON orders (give_asset);
 CREATE INDEX give_get_status_idx ON orders (get_asset, give_asset, status);
 CREATE INDEX give_status_idx ON orders (give_asset, status);
+CREATE INDEX orders_block_index_idx ON orders (block_index);
 CREATE INDEX source_give_status_idx ON orders (source, give_asset, status);
 
 -- Table  postqueue
@@ -786,6 +843,7 @@ INSERT INTO rps VALUES(75,'6201956b04ed01203fa7b204e1481268e4ac96910a504b4efad38
 INSERT INTO rps VALUES(76,'d04c381ebded6c49c4e5a0f0b1746d61fb4dcd45c8dc280b29f7a0afa7a7eedc',310075,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3',5,11021665,'6a886d74c2d4b1d7a35fd9159333ef64ba45a04d7aeeeb4538f958603c16fc5d',10,310085,'matched');
 -- Triggers and indices on  rps
 CREATE INDEX matching_idx ON rps (wager, possible_moves);
+CREATE INDEX rps_source_idx ON rps (source);
 
 -- Table  rps_expirations
 DROP TABLE IF EXISTS rps_expirations;
@@ -877,6 +935,8 @@ INSERT INTO sends VALUES(9,'cea6cfb79722c19ef2198328534d6a02cef6ca1f662a79edf69a
 INSERT INTO sends VALUES(24,'aacc38b5a85e03ed4c215777292043d348303a7811d67acfa57f6b545a6c6fc7',310023,'3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns_3','3_mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc_mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH_mqPCfvqTfYctXMUfmniXeG2nyaN8w6tPmj_3','BBBC',10000,'valid');
 -- Triggers and indices on  sends
 CREATE INDEX destination_idx ON sends (destination);
+CREATE INDEX sends_asset_block_index_idx ON sends (asset, block_index);
+CREATE INDEX sends_block_index_idx ON sends (block_index);
 CREATE INDEX source_idx ON sends (source);
 
 -- Table  storage
@@ -893,6 +953,16 @@ CREATE TABLE suicides(
                       contract_id TEXT PRIMARY KEY,
                       FOREIGN KEY (contract_id) REFERENCES contracts(contract_id));
 
+-- Table  supplies
+DROP TABLE IF EXISTS supplies;
+CREATE TABLE supplies(
+                      asset TEXT PRIMARY KEY,
+                      issued INTEGER,
+                      destroyed INTEGER);
+INSERT INTO supplies VALUES('XCP',149999887262,100040000);
+INSERT INTO supplies VALUES('BBBB',1000000000,0);
+INSERT INTO supplies VALUES('BBBC',100000,0);
+
 -- Table  transactions
 DROP TABLE IF EXISTS transactions;
 CREATE TABLE transactions(
@@ -1,6 +1,9 @@
 #! /usr/bin/python3
 import pytest
 import util_test
+from fixtures.scenarios import INTEGRATION_SCENARIOS
+
+from lib import config
 
 def test_scenario(scenario_name, base_scenario_name, transactions, rawtransactions_db):
     if pytest.config.option.savescenarios:
@@ -19,6 +22,17 @@ def test_scenario(scenario_name, base_scenario_name, transactions, rawtransactio
         clean_base_dump = util_test.clean_scenario_dump(base_scenario_name, base_dump)
         assert util_test.compare_strings(clean_new_dump, clean_base_dump) == 0
 
+def test_rollback(rawtransactions_db):
+    # Roll back expirations, matches and settlements, through the undo log.
+    transactions = INTEGRATION_SCENARIOS['simplesig'][0]
+    rollback_block_index = config.BURN_START_TESTNET + 17
+    partial_transactions = transactions[:rollback_block_index - config.BURN_START_TESTNET + 1]
+    assert 'create_next_block' not in [transaction[0] for transaction in partial_transactions]
+
+    partial_dump, partial_log, partial_raw_transactions = util_test.run_scenario(partial_transactions, rawtransactions_db)
+    rollback_dump, rollback_log, rollback_raw_transactions = util_test.run_scenario(transactions, rawtransactions_db, rollback_block_index=rollback_block_index)
+    assert util_test.compare_strings(rollback_dump, partial_dump) == 0
+
 def test_book(testnet):
     util_test.reparse(testnet=testnet)
 
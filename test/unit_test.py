@@ -1,12 +1,16 @@
 #! /usr/bin/python3
-import sys, os, time, tempfile
+import sys, os, time, tempfile, shutil, json, struct, threading, multiprocessing, collections
+import requests
+import apsw
+import bitcoin as bitcoinlib
 import pytest
+from tornado import gen, httpclient, ioloop, websocket
 import util_test
 from util_test import CURR_DIR
 from fixtures.vectors import UNITTEST_VECTOR
 from fixtures.params import DEFAULT_PARAMS as DP
 
-from lib import (config, util, api, database)
+from lib import (config, util, api, database, blocks, snapshot, check, queryplan, notify)
 import counterpartyd
 
 def setup_module():
@@ -24,6 +28,9 @@ def setup_module():
             raise Exception("Timeout: RPC server not ready after 5s")
         else:
             time.sleep(0.001)
+    # Let the message feed read the database, before the tests switch it to WAL.
+    requests.get('http://{}:{}/subscribe'.format(config.RPC_HOST, config.RPC_PORT), params={'after': -1},
+                 auth=(config.RPC_USER, config.RPC_PASSWORD))
 
 def teardown_module(function):
     util_test.remove_database_files(config.DATABASE)
@@ -41,3 +48,584 @@ def test_vector(tx_name, method, inputs, outputs, error, records, counterpartyd_
         util_test.insert_transaction(inputs[0], counterpartyd_db)
         inputs += (inputs[0]['data'][4:],) # message arg
     util_test.check_ouputs(tx_name, method, inputs, outputs, error, records, counterpartyd_db)
+
+def test_reparse_from_snapshot():
+    db = database.get_connection(read_only=False)
+    cursor = db.cursor()
+    cursor.execute('''PRAGMA user_version = {}'''.format(config.VERSION_MINOR))   # As set by reparse.
+    dump = util_test.dump_database(db)
+    block_index = util.last_block(db)['block_index']
+    snapshot.create(db, block_index, blocks.SNAPSHOT_TABLES)
+    try:
+        assert snapshot.find(db, block_index - 1) is None
+        assert snapshot.find(db, block_index) == snapshot.get_path(block_index)
+        # Only the results of parsing.
+        snapshot_db = apsw.Connection(snapshot.get_path(block_index))
+        tables = [table for (table,) in snapshot_db.cursor().execute('''SELECT name FROM sqlite_master WHERE type = ?''', ('table',))]
+        snapshot_db.close()
+        assert sorted(tables) == sorted(blocks.SNAPSHOT_TABLES + ['snapshot_tag'])
+        cursor.execute('''UPDATE balances SET quantity = 0''')
+        cursor.execute('''DELETE FROM messages''')
+        blocks.reparse(db)
+        assert util_test.compare_strings(util_test.dump_database(db), dump) == 0
+    finally:
+        shutil.rmtree(snapshot.get_directory(), ignore_errors=True)
+        cursor.close()
+        db.close()
+        util_test.restore_database(config.DATABASE, CURR_DIR + '/fixtures/scenarios/unittest_fixture.sql')
+
+def test_verify(monkeypatch):
+    db = database.get_connection(read_only=False)
+    cursor = db.cursor()
+    checkpoint = list(cursor.execute('''SELECT * FROM blocks WHERE block_index = ?''', (config.BURN_START + 10,)))[0]
+    monkeypatch.setattr(check, 'CHECKPOINTS_TESTNET', {checkpoint['block_index']: checkpoint})
+    try:
+        # The first pass snapshots the checkpoint; the second one starts from it too, in parallel.
+        blocks.verify(db)
+        assert snapshot.list_block_indexes() == [checkpoint['block_index']]
+        blocks.verify(db, jobs=2)
+
+        cursor.execute('''UPDATE blocks SET ledger_hash = ? WHERE block_index = ?''', ('0' * 64, config.BURN_START + 20))
+        with pytest.raises(check.ConsensusError):
+            blocks.verify(db)
+    finally:
+        shutil.rmtree(snapshot.get_directory(), ignore_errors=True)
+        cursor.close()
+        db.close()
+        util_test.restore_database(config.DATABASE, CURR_DIR + '/fixtures/scenarios/unittest_fixture.sql')
+
+def test_check_integrity():
+    db = database.get_connection(read_only=False, tuned=True)
+    database.check_integrity(db)
+    db.close()
+
+def test_query_plans():
+    db = database.get_connection(read_only=True)
+    reports = queryplan.audit(db)
+    db.close()
+    assert [(report['method'], report['scans']) for report in reports if report['scans']] == []
+
+def test_get_rows_after():
+    db = database.get_connection(read_only=True)
+    for table, order_by, order_dir in [('credits', None, None), ('credits', 'block_index', 'DESC'),
+                                       ('balances', 'asset', 'ASC'), ('issuances', 'call_date', 'DESC'),
+                                       ('issuances', 'call_date', 'ASC')]:
+        rows, after = [], ''
+        while after is not None:
+            page = api.get_rows(db, table=table, order_by=order_by, order_dir=order_dir, limit=3, after=after)
+            rows += page['rows']
+            after = page['next']
+        statement = 'SELECT * FROM {} ORDER BY {}'.format(table, '{0} {1}, rowid {1}'.format(order_by, order_dir) if order_by else 'rowid')
+        assert rows == api.db_query(db, statement)
+
+    # A deep page of an address’s credits or debits reads a range of an index, without sorting.
+    address = api.db_query(db, 'SELECT address FROM credits GROUP BY address ORDER BY COUNT(*) DESC LIMIT 1')[0]['address']
+    filters = [{'field': 'address', 'op': '==', 'value': address}]
+    for table in ('credits', 'debits'):
+        for order_by, order_dir in [(None, None), (None, 'DESC'), ('block_index', 'ASC'), ('block_index', 'DESC')]:
+            page = api.get_rows(db, table=table, filters=filters, order_by=order_by, order_dir=order_dir, limit=2, after='')
+            assert page['next']
+            statement, bindings = api.get_rows_query(db, table, filters=filters, order_by=order_by, order_dir=order_dir,
+                                                     limit=2, after=page['next'])
+            plan = queryplan.explain(db, statement, bindings)
+            assert queryplan.get_sorts(plan) == [] and queryplan.get_scans(plan) == [], plan
+    # Tokens are only valid for the same order.
+    after = api.encode_page_token('asset', 'ASC', {'asset': 'XCP', '_rowid': 1})
+    with pytest.raises(Exception):
+        api.get_rows(db, table='credits', order_by='block_index', after=after)
+    db.close()
+
+def test_export(monkeypatch):
+    db = database.get_connection(read_only=True)
+    url = 'http://{}:{}/export/'.format(config.RPC_HOST, config.RPC_PORT)
+    auth = (config.RPC_USER, config.RPC_PASSWORD)
+    response = requests.get(url + 'credits', auth=auth)
+    assert response.headers['Content-Type'] == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.text.splitlines()] == api.get_rows(db, table='credits', limit=0)
+    response = requests.get(url + 'messages', params={'start_block': 310001, 'end_block': 310002}, auth=auth)
+    messages = api.db_query(db, 'SELECT * FROM messages WHERE block_index IN (310001, 310002) ORDER BY message_index')
+    assert messages and [json.loads(line) for line in response.text.splitlines()] == messages
+    # Block ranges read a range of an index, without sorting.
+    for start_block, end_block in [(310001, None), (310001, 310002), (None, 310002)]:
+        statement, bindings = api.ExportHandler.get_statement(db, 'messages', start_block, end_block)
+        plan = queryplan.explain(db, statement, bindings)
+        assert queryplan.get_sorts(plan) == [] and queryplan.get_scans(plan) == [], plan
+    # In several batches.
+    monkeypatch.setattr(api, 'API_EXPORT_FLUSH_ROWS', 7)
+    response = requests.get(url + 'messages', auth=auth)
+    messages = api.db_query(db, 'SELECT * FROM messages ORDER BY message_index')
+    assert len(messages) > 7
+    assert [json.loads(line) for line in response.text.splitlines()] == messages
+    assert requests.get(url + 'credits').status_code == 401
+    assert requests.get(url + 'transactions', auth=auth).status_code == 404
+    db.close()
+
+def test_supplies(counterpartyd_db):
+    cursor = counterpartyd_db.cursor()
+    supplies = {config.XCP: util.xcp_created(counterpartyd_db) - util.xcp_destroyed(counterpartyd_db)}
+    for issuance in cursor.execute('''SELECT * FROM issuances WHERE status = ?''', ('valid',)):
+        supplies[issuance['asset']] = supplies.get(issuance['asset'], 0) + issuance['quantity']
+    for destruction in cursor.execute('''SELECT * FROM destructions WHERE (status = ? AND asset != ?)''', ('valid', config.XCP)):
+        supplies[destruction['asset']] -= destruction['quantity']
+    assert util.supplies(counterpartyd_db) == supplies
+
+    # Undoing an issuance undoes its supply.
+    issuance = list(cursor.execute('''SELECT * FROM issuances WHERE (status = ? AND asset = ?)''', ('valid', 'DIVISIBLE')))[0]
+    cursor.execute('''DELETE FROM issuances WHERE tx_index = ?''', (issuance['tx_index'],))
+    assert util.asset_supply(counterpartyd_db, 'DIVISIBLE') == supplies['DIVISIBLE'] - issuance['quantity']
+    assert util.xcp_supply(counterpartyd_db) == supplies[config.XCP] + issuance['fee_paid']
+    cursor.close()
+
+class MempoolProxy(object):
+    """A backend whose mempool is set by the test, and which only answers
+    batched `getrawtransaction` calls."""
+    def __init__(self):
+        self.mempool = []
+        self.raw_transactions = {}
+        self.batches = 0
+        with open(CURR_DIR + '/fixtures/unspent_outputs.json') as unspent_outputs_file:
+            for output in json.load(unspent_outputs_file):
+                self.raw_transactions[output['txid']] = output['txhex']
+
+    def add(self, tx_hex):
+        tx_hash = bitcoinlib.core.b2lx(blocks.backend.deserialize(tx_hex).GetHash())
+        self.raw_transactions[tx_hash] = tx_hex
+        return tx_hash
+
+    def getrawmempool(self):
+        return [bitcoinlib.core.lx(tx_hash) for tx_hash in self.mempool]
+
+    def _batch(self, calls):
+        self.batches += 1
+        responses = []
+        for call in calls:
+            tx_hex = self.raw_transactions.get(call['params'][0])
+            if tx_hex is None:
+                responses.append({'id': call['id'], 'result': None, 'error': {'code': -5, 'message': 'No information available about transaction'}})
+            else:
+                responses.append({'id': call['id'], 'result': tx_hex, 'error': None})
+        return responses
+
+def get_mempool_proxy(monkeypatch):
+    proxy = MempoolProxy()
+    monkeypatch.setattr(blocks.backend, 'get_proxy', lambda: proxy)
+    monkeypatch.setattr(blocks.backend, 'raw_transactions_cache', collections.OrderedDict())
+    return proxy
+
+def compose_send(db, quantity):
+    return api.compose_transaction(db, 'send', {'source': 'mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc', 'destination': 'mnfAHmddVibnZNSkh8DvKaQoiEfNsxjXzH',
+                                                'asset': 'XCP', 'quantity': quantity})
+
+def get_contents(db):
+    cursor = db.cursor()
+    tables = [row['name'] for row in cursor.execute('''SELECT name FROM sqlite_master WHERE type = ?''', ('table',))]
+    contents = {table: list(cursor.execute('''SELECT * FROM {}'''.format(table))) for table in tables}
+    cursor.close()
+    return contents
+
+# (Tests run in reverse order: see conftest.py. These switch the database to
+# WAL, so they run after the tests of the API server, whose connections
+# wouldn’t survive the database files being replaced by `restore_database`.)
+def test_mempool_savepoints(counterpartyd_db, monkeypatch):
+    db = counterpartyd_db
+    cursor = db.cursor()
+    balance = util.get_balance(db, 'mn6q3dS2EnDUx3bmyWc6D4szJNVGtaR7zc', 'XCP')
+    # Each is only valid if parsed without the other.
+    sends = [compose_send(db, balance), compose_send(db, balance - 1)]
+    proxy = get_mempool_proxy(monkeypatch)
+    first, second = [proxy.add(tx_hex) for tx_hex in sends]
+    proxy.mempool = [first, second]
+    cursor.execute('''DELETE FROM mempool''')
+    contents = get_contents(db)
+
+    mempool = blocks.Mempool()
+    new_tx_hashes, evicted_tx_hashes = mempool.update(db, proxy, util.last_block(db)['block_index'] + 1, blocks.get_next_tx_index(db))
+    assert new_tx_hashes == [first, second] and evicted_tx_hashes == []
+    assert proxy.batches == 2  # The transactions, then their inputs.
+    debits = [(row['tx_hash'], json.loads(row['bindings'])['quantity']) for row in cursor.execute('''SELECT * FROM mempool WHERE category = ?''', ('debits',))]
+    assert debits == [(first, balance), (second, balance - 1)]
+    # Nothing else is left of the parsing, nor of the fake block.
+    cursor.execute('''DELETE FROM mempool''')
+    assert get_contents(db) == contents
+    cursor.close()
+
+def test_mempool_update(counterpartyd_db, monkeypatch):
+    db = counterpartyd_db
+    cursor = db.cursor()
+    sends = [compose_send(db, 1), compose_send(db, 2)]
+    proxy = get_mempool_proxy(monkeypatch)
+    first, second = [proxy.add(tx_hex) for tx_hex in sends]
+    block_index, tx_index = util.last_block(db)['block_index'] + 1, blocks.get_next_tx_index(db)
+    other = [tx_hash for tx_hash, tx_hex in proxy.raw_transactions.items()
+             if not blocks.is_candidate_tx(blocks.backend.deserialize(tx_hex), block_index)][0]
+    parsed = []
+    parse_tx = blocks.parse_tx
+    def record_parse_tx(db, tx):
+        parsed.append(tx['tx_hash'])
+        return parse_tx(db, tx)
+    monkeypatch.setattr(blocks, 'parse_tx', record_parse_tx)
+    def get_mempool():
+        return [(row['tx_hash'], row['category']) for row in cursor.execute('''SELECT * FROM mempool''')]
+    cursor.execute('''INSERT INTO mempool VALUES(?,?,?,?,?)''', ('stale', 'insert', 'sends', '{}', 0))   # From another session.
+
+    mempool = blocks.Mempool()
+    proxy.mempool = [first, other]
+    assert mempool.update(db, proxy, block_index, tx_index) == ([first], [])
+    assert get_mempool() == [(first, 'debits'), (first, 'credits'), (first, 'sends')]
+    assert parsed == [first] and other in mempool.not_supported
+    # A new transaction.
+    proxy.mempool = [first, other, second]
+    assert mempool.update(db, proxy, block_index, tx_index) == ([second], [])
+    assert get_mempool() == [(first, 'debits'), (first, 'credits'), (first, 'sends'),
+                             (second, 'debits'), (second, 'credits'), (second, 'sends')]
+    assert parsed == [first, second]
+    # An evicted one.
+    proxy.mempool = [second]
+    assert mempool.update(db, proxy, block_index, tx_index) == ([], [first])
+    assert get_mempool() == [(second, 'debits'), (second, 'credits'), (second, 'sends')]
+    assert parsed == [first, second]
+    cursor.close()
+
+def test_block_cache(counterpartyd_db):
+    cache = api.BlockCache()
+    computed = []
+    def compute():
+        computed.append(True)
+        return len(computed)
+    assert cache.get(counterpartyd_db, 'key', compute) == 1
+    assert cache.get(counterpartyd_db, 'key', compute) == 1
+    util_test.create_next_block(counterpartyd_db)
+    assert cache.get(counterpartyd_db, 'key', compute) == 2
+
+def test_notify():
+    listener = notify.Listener()
+    listener.start()
+    try:
+        count = notify.BACKEND.count
+        notify.send('block', '0' * 64)
+        start = time.time()
+        assert notify.BACKEND.wait(count, 5) == count + 1
+        assert time.time() - start < 5
+        # Timeout
+        assert notify.BACKEND.wait(count + 1, 0.01) == count + 1
+    finally:
+        listener.stop()
+        listener.join()
+
+def test_subscribe():
+    db = apsw.Connection(config.DATABASE)
+    # The feed reads concurrently. (apsw holds the GIL while SQLite’s own
+    # busy handler waits, so the feed couldn’t finish reading.)
+    db.setbusyhandler(lambda tries: time.sleep(0.01) or tries < 500)
+    db.setrowtrace(database.rowtracer)
+    url = 'http://{}:{}/subscribe'.format(config.RPC_HOST, config.RPC_PORT)
+    auth = (config.RPC_USER, config.RPC_PASSWORD)
+    messages = api.db_query(db, 'SELECT * FROM messages ORDER BY message_index')
+    last = messages[-1]['message_index']
+
+    # Catch up.
+    update = requests.get(url, params={'after': last - 2}, auth=auth).json()
+    assert update['messages'] == messages[-2:] and update['last'] == last
+    assert update['mempool'] == api.db_query(db, 'SELECT * FROM mempool')
+    # Nothing new.
+    update = requests.get(url, params={'after': last, 'timeout': 0}, auth=auth).json()
+    assert update['messages'] == [] and update['last'] == last
+    assert requests.get(url).status_code == 401
+
+    # WebSocket, then a new message.
+    @gen.coroutine
+    def subscribe():
+        request = httpclient.HTTPRequest('ws://{}:{}/subscribe/websocket?after={}'.format(config.RPC_HOST, config.RPC_PORT, last - 1),
+                                         auth_username=config.RPC_USER, auth_password=config.RPC_PASSWORD)
+        connection = yield websocket.websocket_connect(request)
+        updates = [json.loads((yield connection.read_message()))]
+        message = dict(messages[-1], message_index=last + 1)
+        cursor = db.cursor()
+        cursor.execute('''INSERT INTO messages VALUES(:message_index, :block_index, :command, :category, :bindings, :timestamp)''', message)
+        cursor.close()
+        notify.LEDGER.notify()
+        updates.append(json.loads((yield connection.read_message())))
+        connection.close()
+        return updates, message
+    block_hash = api.db_query(db, 'SELECT block_hash FROM blocks ORDER BY block_index DESC LIMIT 1')[0]['block_hash']
+    try:
+        updates, message = ioloop.IOLoop().run_sync(subscribe, timeout=10)
+        assert updates[0]['messages'] == messages[-1:] and 'mempool' in updates[0]
+        assert updates[1] == {'messages': [message], 'last': last + 1, 'block_hash': block_hash}
+    finally:
+        db.cursor().execute('''DELETE FROM messages WHERE message_index > ?''', (last,))
+
+    # Reorganisation, under a WebSocket: the last block with messages is replaced.
+    fork = messages[-1]['block_index']
+    blocks = api.db_query(db, 'SELECT * FROM blocks WHERE block_index >= ?', (fork,))
+    valid = max(message['message_index'] for message in messages if message['block_index'] < fork)
+    replacements = [dict(messages[-1], message_index=valid + 1, command='reorg', category=None, bindings=json.dumps({'block_index': fork})),
+                    dict(messages[-1], message_index=valid + 2)]
+    replacement_hash = 'f' * 64
+    @gen.coroutine
+    def reorganise():
+        request = httpclient.HTTPRequest('ws://{}:{}/subscribe/websocket'.format(config.RPC_HOST, config.RPC_PORT),
+                                         auth_username=config.RPC_USER, auth_password=config.RPC_PASSWORD)
+        connection = yield websocket.websocket_connect(request)
+        updates = [json.loads((yield connection.read_message()))]
+        with db:
+            cursor = db.cursor()
+            cursor.execute('''DELETE FROM messages WHERE message_index > ?''', (valid,))
+            cursor.execute('''DELETE FROM blocks WHERE block_index >= ?''', (fork,))
+            cursor.execute('''INSERT INTO blocks VALUES(:block_index, :block_hash, :block_time, :previous_block_hash, :difficulty, :ledger_hash, :txlist_hash)''',
+                           dict(blocks[0], block_hash=replacement_hash))
+            for message in replacements:
+                cursor.execute('''INSERT INTO messages VALUES(:message_index, :block_index, :command, :category, :bindings, :timestamp)''', message)
+            cursor.close()
+        notify.LEDGER.notify()
+        updates.append(json.loads((yield connection.read_message())))
+        connection.close()
+        return updates
+    try:
+        updates = ioloop.IOLoop().run_sync(reorganise, timeout=10)
+        assert updates[0]['last'] == last and updates[0]['block_hash'] == block_hash
+        assert updates[1] == {'rewind': valid, 'messages': replacements, 'last': valid + 2, 'block_hash': replacement_hash}
+        # A long‐poll that resumes from before the reorganisation.
+        update = requests.get(url, params={'after': last, 'block_hash': block_hash, 'timeout': 5}, auth=auth).json()
+        assert update['rewind'] == valid and update['messages'] == replacements
+        # And from after it.
+        update = requests.get(url, params={'after': valid + 2, 'block_hash': replacement_hash, 'timeout': 0}, auth=auth).json()
+        assert 'rewind' not in update and update['messages'] == []
+    finally:
+        with db:
+            cursor = db.cursor()
+            cursor.execute('''DELETE FROM messages WHERE message_index > ?''', (valid,))
+            cursor.execute('''DELETE FROM blocks WHERE block_index >= ?''', (fork,))
+            for block in blocks:
+                cursor.execute('''INSERT INTO blocks VALUES(:block_index, :block_hash, :block_time, :previous_block_hash, :difficulty, :ledger_hash, :txlist_hash)''', block)
+            for message in messages:
+                if message['message_index'] > valid:
+                    cursor.execute('''INSERT INTO messages VALUES(:message_index, :block_index, :command, :category, :bindings, :timestamp)''', message)
+            cursor.close()
+        db.close()
+
+def test_jsonrpc():
+    db = database.get_connection(read_only=True)
+    url = 'http://{}:{}/api/'.format(config.RPC_HOST, config.RPC_PORT)
+    auth = (config.RPC_USER, config.RPC_PASSWORD)
+    def call(method, params={}):
+        payload = {'method': method, 'params': params, 'jsonrpc': '2.0', 'id': 0}
+        return requests.post(url, data=json.dumps(payload), auth=auth).json()
+    assert call('get_credits', {'limit': 5})['result'] == api.get_rows(db, table='credits', limit=5)
+    assert call('get_credits', [5])['code'] == -32600
+    assert requests.post(url, data='{', auth=auth).json()['code'] == -32600
+    assert requests.post(url, data='{}').status_code == 401
+    response = requests.options(url)
+    assert response.status_code == 204 and response.headers['Access-Control-Allow-Origin'] == '*'
+
+    # A slow call to the backend doesn’t hold up the others.
+    def create_slow():
+        time.sleep(2)
+        return 'slow'
+    api.dispatcher['create_slow'] = create_slow
+    try:
+        start = time.time()
+        slow_calls = [threading.Thread(target=call, args=('create_slow',)) for i in range(api.API_BACKEND_THREADS)]
+        for slow_call in slow_calls:
+            slow_call.start()
+        time.sleep(0.5)
+        assert call('get_xcp_supply')['result'] == util.xcp_supply(db)
+        assert time.time() - start < 1.5
+        for slow_call in slow_calls:
+            slow_call.join()
+    finally:
+        del api.dispatcher['create_slow']
+        db.close()
+
+def test_compact_transaction():
+    rawtransactions_db = apsw.Connection(CURR_DIR + '/fixtures/rawtransactions.db')
+    cursor = rawtransactions_db.cursor()
+    for (tx_hex,) in cursor.execute('''SELECT tx_hex FROM raw_transactions'''):
+        ctx = blocks.backend.deserialize(tx_hex)
+        compact = blocks.CompactTransaction.from_bytes(bytes.fromhex(tx_hex))
+        assert compact.GetHash() == ctx.GetHash()
+        assert compact.tx_hash == bitcoinlib.core.b2lx(ctx.GetHash())
+        assert compact.is_coinbase() == ctx.is_coinbase()
+        assert compact.nLockTime == ctx.nLockTime
+        assert [(vin.prevout.hash, vin.prevout.n) for vin in compact.vin] == [(vin.prevout.hash, vin.prevout.n) for vin in ctx.vin]
+        assert [bytes(vin.scriptSig) for vin in compact.vin] == [bytes(vin.scriptSig) for vin in ctx.vin]
+        assert [(vout.nValue, vout.scriptPubKey) for vout in compact.vout] == [(vout.nValue, vout.scriptPubKey) for vout in ctx.vout]
+        assert blocks.get_tx_info(compact, DP['default_block']) == blocks.get_tx_info(ctx, DP['default_block'])
+    cursor.close()
+    rawtransactions_db.close()
+
+def test_outputs_index():
+    path = os.path.join(tempfile.mkdtemp(), 'outputs.db')
+    outputs_index = blocks.OutputsIndex(path)
+    tx_hash = b'\x01' * 32
+    outputs_index.add([(tx_hash, 0, 5430, b'\x51'), (tx_hash, 1, 7800, b'\x52')])
+    assert outputs_index.get(tx_hash, 1) == (7800, b'\x52')
+    assert outputs_index.get(tx_hash, 2) is None
+    assert outputs_index.get(b'\x02' * 32, 0) is None
+
+    # Kept across connections, and replaced when added again.
+    outputs_index.close()
+    outputs_index = blocks.OutputsIndex(path)
+    assert outputs_index.get(tx_hash, 0) == (5430, b'\x51')
+    outputs_index.add([(tx_hash, 0, 1000, b'\x53')])
+    assert outputs_index.get(tx_hash, 0) == (1000, b'\x53')
+    outputs_index.close(remove=True)
+    assert not os.path.exists(path)
+    shutil.rmtree(os.path.dirname(path))
+
+def test_block_files():
+    rawtransactions_db = apsw.Connection(CURR_DIR + '/fixtures/rawtransactions.db')
+    txs = [bytes.fromhex(tx_hex) for (tx_hex,) in rawtransactions_db.cursor().execute('''SELECT tx_hex FROM raw_transactions LIMIT 4''')]
+    rawtransactions_db.close()
+    def get_block(tx):
+        header = struct.pack('<i32s32sIII', 2, b'\x00' * 32, b'\x00' * 32, 0, 0, 0)
+        block = header + bytes([1]) + tx
+        return struct.pack('<iI', 118034699, len(block)) + block
+
+    # Synthetic block files: two blocks in the first one, one in the others.
+    blocks_dir = tempfile.mkdtemp()
+    for file_num, block_txs in enumerate([txs[:2], txs[2:3], txs[3:]]):
+        with open(os.path.join(blocks_dir, 'blk%05d.dat' % file_num), 'wb') as block_file:
+            for tx in block_txs:
+                block_file.write(get_block(tx))
+    second_pos = len(get_block(txs[0]))
+    def get_tx_hash(file_num, pos):
+        return block_parser.read_compact_block_at(file_num, pos, 0)['transactions'][0].GetHash()
+    def get_hash(tx):
+        return blocks.CompactTransaction.from_bytes(tx).GetHash()
+
+    block_parser = blocks.BlockchainParser(blocks_dir, max_open_files=2)
+    try:
+        compact_tx = block_parser.read_compact_block_at(0, 0, 0)['transactions'][0]
+        assert get_tx_hash(1, 0) == get_hash(txs[2])
+        assert list(block_parser.block_files) == [0, 1]
+        assert get_tx_hash(0, second_pos) == get_hash(txs[1])
+        assert list(block_parser.block_files) == [1, 0]
+        # The current file is kept the most recently used.
+        block_parser.map_block_file(1)
+        assert get_tx_hash(0, 0) == get_hash(txs[0])
+        assert list(block_parser.block_files) == [1, 0]
+        # Over the limit, the least recently used file is closed.
+        evicted = block_parser.block_files[1]
+        assert get_tx_hash(2, 0) == get_hash(txs[3])
+        assert list(block_parser.block_files) == [0, 2]
+        assert evicted[0].closed and evicted[1].closed
+        assert get_tx_hash(1, 0) == get_hash(txs[2])
+        assert list(block_parser.block_files) == [2, 1]
+        # Transactions don’t depend on the file staying mapped.
+        assert bytes(compact_tx.data) == txs[0] and compact_tx.GetHash() == get_hash(txs[0])
+    finally:
+        block_parser.close()
+        shutil.rmtree(blocks_dir)
+
+def test_cached_raw_transactions(monkeypatch):
+    class Proxy(object):
+        def __init__(self):
+            self.batches = []
+        def _batch(self, calls):
+            self.batches.append([call['params'][0] for call in calls])
+            return [{'id': call['id'], 'result': None, 'error': {'code': -5, 'message': 'No information available about transaction'}}
+                    if call['params'][0] == 'missing' else {'id': call['id'], 'result': 'hex_' + call['params'][0], 'error': None}
+                    for call in reversed(calls)]   # In any order.
+    proxy = Proxy()
+    monkeypatch.setattr(blocks.backend, 'get_proxy', lambda: proxy)
+    monkeypatch.setattr(blocks.backend, 'raw_transactions_cache', collections.OrderedDict())
+    monkeypatch.setattr(config, 'BACKEND_RPC_BATCH_SIZE', 2)
+    monkeypatch.setattr(config, 'BACKEND_RAW_TRANSACTIONS_CACHE_SIZE', 3)
+
+    # Fetched once each, in batches; what the backend can’t find is left out.
+    raw_transactions = blocks.backend.get_cached_raw_transactions(['a', 'b', 'a', 'missing', 'c'])
+    assert proxy.batches == [['a', 'b'], ['missing', 'c']]
+    assert raw_transactions == {'a': 'hex_a', 'b': 'hex_b', 'c': 'hex_c'}
+    assert list(blocks.backend.raw_transactions_cache) == ['b', 'a', 'c']   # In order of last request.
+
+    # Cached transactions aren’t fetched again, and the least recently used go first.
+    raw_transactions = blocks.backend.get_cached_raw_transactions(['a', 'd'])
+    assert proxy.batches[2:] == [['d']]
+    assert raw_transactions == {'a': 'hex_a', 'd': 'hex_d'}
+    assert list(blocks.backend.raw_transactions_cache) == ['c', 'a', 'd']
+    assert blocks.backend.get_cached_raw_transactions(['missing']) == {}
+    assert proxy.batches[3:] == [['missing']]
+
+def test_block_fetcher(monkeypatch):
+    class Proxy(object):
+        def getblockcount(self):
+            return 310000   # Shorter than the chain parsed.
+    monkeypatch.setattr(blocks.backend, 'get_proxy', lambda: Proxy())
+    monkeypatch.setattr(config, 'BACKEND_PREFETCH_QUEUE_SIZE', 3)
+    fetcher = blocks.BlockFetcher(310005)
+    assert fetcher.queue.maxsize == 3
+    fetcher.start()
+    assert fetcher.get(310005) is None
+    fetcher.stop()
+    fetcher.join()
+    with pytest.raises(blocks.backend.BitcoindError):
+        fetcher.get(310005)
+
+def test_worker_pool():
+    # Spawned workers get the configuration too.
+    pool = multiprocessing.get_context('spawn').Pool(1, initializer=blocks.init_worker, initargs=(blocks.get_worker_settings(),))
+    settings = pool.apply(blocks.get_worker_settings)
+    pool.close()
+    pool.join()
+    assert settings == blocks.get_worker_settings()
+    assert settings['TESTNET'] and settings['DATABASE'] == config.DATABASE
+
+    # At most `window` tasks in flight.
+    pool = blocks.get_worker_pool(2)
+    submitted = []
+    def tasks():
+        for task in range(-10, 0):
+            submitted.append(task)
+            yield task
+    results = blocks.imap_bounded(pool, abs, tasks(), 3)
+    assert next(results) == 10 and len(submitted) == 3
+    assert list(results) == list(range(9, 0, -1))
+    pool.close()
+    pool.join()
+
+def test_api_status_poller(monkeypatch):
+    db = database.get_connection(read_only=True)
+    block_count = util.last_block(db)['block_index']
+    db.close()
+    class Block(object):
+        nTime = time.time()
+    class Proxy(object):
+        def getblockcount(self):
+            return block_count
+        def getblockhash(self, block_index):
+            return b'\x00' * 32
+        def getblock(self, block_hash):
+            return Block
+    def get_offline(*args, **kwargs):
+        raise requests.exceptions.ConnectionError()
+    monkeypatch.setattr(api.backend, 'get_proxy', lambda: Proxy())
+    monkeypatch.setattr(check.requests, 'get', get_offline)    # No Internet access.
+    checked = threading.Event()
+    check_integrity = database.check_integrity
+    def check_integrity_once(db):
+        check_integrity(db)
+        checked.set()
+    monkeypatch.setattr(api.database, 'check_integrity', check_integrity_once)
+    monkeypatch.setattr(config, 'INTEGRITY_CHECK_INTERVAL', 0)
+    monkeypatch.setattr(api, 'current_api_status_code', -1)
+    def wait_for_status(code):
+        for attempt in range(50):
+            if api.current_api_status_code == code:
+                return True
+            time.sleep(0.1)
+        return False
+
+    # From a cold start, every check runs.
+    poller = api.APIStatusPoller()
+    poller.start()
+    try:
+        assert checked.wait(5)
+        assert wait_for_status(None)
+        # The backend falls behind.
+        Block.nTime = time.time() - 3 * 3600
+        poller.last_database_check = 0
+        assert wait_for_status(11)
+    finally:
+        poller.stop()
+        poller.join()
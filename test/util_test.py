@@ -6,7 +6,7 @@ from requests.auth import HTTPBasicAuth
 CURR_DIR = os.path.dirname(os.path.realpath(os.path.join(os.getcwd(), os.path.expanduser(__file__))))
 sys.path.append(os.path.normpath(os.path.join(CURR_DIR, '..')))
 
-from lib import (config, api, util, exceptions, bitcoin, blocks, check, backend, database)
+from lib import (config, api, util, exceptions, bitcoin, blocks, check, backend, database, undolog)
 from lib.messages import (send, order, btcpay, issuance, broadcast, bet, dividend, burn, cancel, callback, rps, rpsresolve)
 import counterpartyd
 
@@ -172,7 +172,7 @@ def initialise_db(db):
     blocks.initialise(db)
     insert_block(db, config.BURN_START - 1)
 
-def run_scenario(scenario, rawtransactions_db):
+def run_scenario(scenario, rawtransactions_db, rollback_block_index=None):
     counterpartyd.set_options(database_file=':memory:', testnet=True, **COUNTERPARTYD_OPTIONS)
     config.PREFIX = b'TESTXXXX'
     util.FIRST_MULTISIG_BLOCK_TESTNET = 1
@@ -195,6 +195,8 @@ def run_scenario(scenario, rawtransactions_db):
 
     db = database.get_connection(read_only=False)
     initialise_db(db)
+    if rollback_block_index:
+        undolog.initialise(db, blocks.TABLES + ['balances'])
 
     raw_transactions = []
     for transaction in scenario:
@@ -207,6 +209,10 @@ def run_scenario(scenario, rawtransactions_db):
         else:
             create_next_block(db, block_index=config.BURN_START + transaction[1], parse_block=True)
 
+    if rollback_block_index:
+        blocks.rollback(db, rollback_block_index)
+        undolog.clear(db, blocks.TABLES + ['balances'])
+
     dump = dump_database(db)
     log = logger_buff.getvalue()
 
@@ -284,6 +290,8 @@ def exec_tested_method(tx_name, method, tested_method, inputs, counterpartyd_db)
             return binascii.hexlify(tested_method(*inputs)).decode('utf-8')
         else:
             return tested_method(*inputs)
+    elif tx_name == 'blocks':
+        return tested_method(*inputs)
     else:
         return tested_method(counterpartyd_db, *inputs)
 